@@ -1,6 +1,14 @@
 from django.contrib import admin
 
-from boogiestats.boogie_api.models import Player, Score, Song
+from boogiestats.boogie_api.models import (
+    ArchivedScore,
+    Player,
+    Score,
+    ScoreJudgments,
+    SiteStatistics,
+    Song,
+)
+from boogiestats.boogie_api.paginators import EstimatedCountPaginator
 
 
 class PlayerAdmin(admin.ModelAdmin):
@@ -12,12 +20,38 @@ class PlayerAdmin(admin.ModelAdmin):
     )
 
 
+class ScoreJudgmentsInline(admin.StackedInline):
+    model = ScoreJudgments
+    can_delete = False
+
+
 class ScoreAdmin(admin.ModelAdmin):
-    # we need to exclude foreign models, otherwise the admin won't load in sensible time
-    readonly_fields = (
+    # foreign models are edited by their ids, otherwise the admin won't load in sensible time
+    raw_id_fields = (
         "song",
         "player",
     )
+    inlines = (ScoreJudgmentsInline,)
+    list_display = ("id", "submission_date", "player", "song", "itg_score", "ex_score", "gs_status")
+    list_select_related = ("player", "song")
+    list_filter = ("gs_status",)
+    # there are too many scores to count them on every page, see `EstimatedCountPaginator`
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class ArchivedScoreAdmin(admin.ModelAdmin):
+    list_display = ("id", "submission_date", "player", "song", "itg_score", "ex_score")
+    list_select_related = ("player", "song")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # archived scores are never modified, they're only moved in by `archive_scores`
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 class SongAdmin(admin.ModelAdmin):
@@ -39,6 +73,17 @@ class SongAdmin(admin.ModelAdmin):
     )
 
 
+class SiteStatisticsAdmin(admin.ModelAdmin):
+    # the only row is maintained by the application, see `recompute_site_statistics`
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 admin.site.register(Player, PlayerAdmin)
 admin.site.register(Score, ScoreAdmin)
 admin.site.register(Song, SongAdmin)
+admin.site.register(ArchivedScore, ArchivedScoreAdmin)
+admin.site.register(SiteStatistics, SiteStatisticsAdmin)
@@ -0,0 +1,156 @@
+"""Cold archive for superseded scores and a reader that merges archived scores back with the current ones."""
+
+import datetime
+import heapq
+import itertools
+from collections import Counter
+from functools import cmp_to_key
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+from boogiestats.boogie_api.choices import GSStatus
+from boogiestats.boogie_api.models import ArchivedScore, Player, Score
+
+ARCHIVE_CHUNK_SIZE = 5_000
+
+
+def archivable_scores(older_than: datetime.datetime):
+    """Scores that don't matter for leaderboards anymore and aren't referenced by any other object."""
+    latest_scores = Player.objects.filter(latest_score__isnull=False).values("latest_score_id")
+
+    return Score.objects.filter(
+        is_itg_top=False, is_ex_top=False, gs_status=GSStatus.OK, submission_date__lt=older_than
+    ).exclude(id__in=latest_scores)
+
+
+def archive_scores(older_than: datetime.datetime, chunk_size: int = ARCHIVE_CHUNK_SIZE) -> int:
+    """Moves archivable scores to `ArchivedScore` in chunks, each chunk in its own transaction."""
+    archived = 0
+    last_id = 0
+
+    while chunk := list(
+        archivable_scores(older_than)
+        .filter(id__gt=last_id)
+        .order_by("id")
+        .select_related("judgment_counts")[:chunk_size]
+    ):
+        with transaction.atomic():
+            ArchivedScore.objects.bulk_create([ArchivedScore.from_score(score) for score in chunk])
+            Score.objects.filter(id__in=[score.id for score in chunk]).delete()
+
+        archived += len(chunk)
+        last_id = chunk[-1].id
+
+    return archived
+
+
+class ScoreHistory:
+    """
+    Read-only, queryset-like view over both current and archived scores.
+
+    It supports just enough for views and `Paginator`: filtering, ordering, counting, slicing and a few aggregates.
+    Slices are merged from both sources by fetching only the ordering keys up to the end of the slice,
+    so model instances are only created for the returned rows.
+    """
+
+    def __init__(self, current, archived, ordering=("-id",)):
+        self.current = current
+        self.archived = archived
+        self.ordering = tuple(ordering)
+
+    @classmethod
+    def of(cls, *args, **kwargs) -> "ScoreHistory":
+        return cls(Score.objects.filter(*args, **kwargs), ArchivedScore.objects.filter(*args, **kwargs))
+
+    def _clone(self, current=None, archived=None, ordering=None) -> "ScoreHistory":
+        return ScoreHistory(
+            self.current if current is None else current,
+            self.archived if archived is None else archived,
+            self.ordering if ordering is None else ordering,
+        )
+
+    def filter(self, *args, **kwargs) -> "ScoreHistory":
+        return self._clone(self.current.filter(*args, **kwargs), self.archived.filter(*args, **kwargs))
+
+    def select_related(self, *fields) -> "ScoreHistory":
+        return self._clone(self.current.select_related(*fields), self.archived.select_related(*fields))
+
+    def prefetch_related(self, *lookups) -> "ScoreHistory":
+        return self._clone(self.current.prefetch_related(*lookups), self.archived.prefetch_related(*lookups))
+
+    def order_by(self, *ordering) -> "ScoreHistory":
+        if not any(field.lstrip("-") == "id" for field in ordering):
+            ordering = (*ordering, "id")  # make the merge deterministic
+
+        return self._clone(ordering=ordering)
+
+    @property
+    def ordered(self):
+        return bool(self.ordering)
+
+    def count(self) -> int:
+        return self.current.count() + self.archived.count()
+
+    def __len__(self):
+        return self.count()
+
+    def first(self):
+        page = self[:1]
+        return page[0] if page else None
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self[key : key + 1][0]
+
+        start = key.start or 0
+        stop = key.stop if key.stop is not None else self.count()
+        merged = heapq.merge(
+            self._keys(self.current, stop, is_current=True),
+            self._keys(self.archived, stop, is_current=False),
+            key=cmp_to_key(self._compare),
+        )
+
+        return self._fetch(list(itertools.islice(merged, start, stop)))
+
+    def _keys(self, queryset, limit, is_current):
+        fields = {field.lstrip("-") for field in self.ordering}
+        for row in queryset.order_by(*self.ordering).values(*fields)[:limit]:
+            row["is_current"] = is_current
+            yield row
+
+    def _compare(self, a, b):
+        for field in self.ordering:
+            name = field.lstrip("-")
+            if a[name] != b[name]:
+                result = -1 if a[name] < b[name] else 1
+                return -result if field.startswith("-") else result
+
+        return 0
+
+    def _fetch(self, keys):
+        current_ids = [key["id"] for key in keys if key["is_current"]]
+        archived_ids = [key["id"] for key in keys if not key["is_current"]]
+        current = self.current.select_related("judgment_counts").in_bulk(current_ids)
+        archived = self.archived.in_bulk(archived_ids)
+
+        return [(current if key["is_current"] else archived)[key["id"]] for key in keys]
+
+    def count_distinct_songs(self) -> int:
+        return self.current.values_list("song_id").union(self.archived.values_list("song_id")).count()
+
+    def plays_per(self, field) -> Counter:
+        """Number of scores grouped by the given field, e.g. `submission_day` or `song_id`."""
+        plays = Counter()
+        for queryset in (self.current, self.archived):
+            for row in queryset.order_by().values(field).annotate(plays=Count("id")):
+                plays[row[field]] += row["plays"]
+
+        return plays
+
+    def judgment_sums(self, *names) -> dict:
+        current = self.current.aggregate(**{name: Coalesce(Sum(f"judgment_counts__{name}"), 0) for name in names})
+        archived = self.archived.aggregate(**{name: Coalesce(Sum(name), 0) for name in names})
+
+        return {name: current[name] + archived[name] for name in names}
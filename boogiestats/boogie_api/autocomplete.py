@@ -0,0 +1,156 @@
+"""
+In-memory prefix indexes of songs and players for autocompletion, see `api/v1/autocomplete/`.
+
+Indexes are built in every process from the database. Once they're older than `BS_AUTOCOMPLETE_INDEX_TTL_SECONDS`,
+they're rebuilt in a background thread while the stale index keeps serving lookups.
+"""
+
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Iterable, NamedTuple, Optional
+
+from django.conf import settings
+from django.db import connection
+
+from boogiestats.boogie_api.models import Player, Song
+from boogiestats.boogie_api.utils import get_display_name
+
+PRECOMPUTED_PREFIX_LENGTH = 3  # shorter prefixes match too many keys to rank them on every lookup
+MAX_PREFIX = "\U0010ffff"
+SONG_INFO_FIELDS = ("title", "titletranslit", "subtitle", "subtitletranslit", "artist", "artisttranslit", "steps_type")
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+def _word_suffixes(key: str) -> Iterable[str]:
+    """The key itself and its parts starting with every following word, so that words in the middle match too."""
+    yield key
+    for i, char in enumerate(key):
+        if char == " ":
+            yield key[i + 1 :]
+
+
+class PrefixIndex:
+    """
+    Top-ranked values whose keys have words starting with a given prefix.
+
+    Results of short prefixes are precomputed, longer ones are looked up with a binary search over sorted keys and
+    ranked on the fly, there are few keys sharing them.
+    """
+
+    def __init__(self, entries: Iterable[tuple[Iterable[str], int, Any]], max_results: int):
+        self.max_results = max_results
+        self._ranks = []
+        self._values = []
+        keyed = set()
+        for keys, rank, value in entries:
+            for key in keys:
+                keyed.update((suffix, len(self._values)) for suffix in _word_suffixes(normalize(key or "")) if suffix)
+            self._ranks.append(rank)
+            self._values.append(value)
+
+        keyed = sorted(keyed)
+        self._keys = [key for key, _ in keyed]
+        self._ids = [i for _, i in keyed]
+
+        short_prefixes = {}
+        for key, i in keyed:
+            for n in range(1, min(len(key), PRECOMPUTED_PREFIX_LENGTH) + 1):
+                short_prefixes.setdefault(key[:n], set()).add(i)
+        self._short_prefixes = {prefix: self._top(ids) for prefix, ids in short_prefixes.items()}
+
+    def __len__(self):
+        return len(self._values)
+
+    def _top(self, ids: Iterable[int]) -> list[int]:
+        return heapq.nlargest(self.max_results, set(ids), key=lambda i: (self._ranks[i], -i))
+
+    def lookup(self, prefix: str, limit: Optional[int] = None) -> list:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+            ids = self._short_prefixes.get(prefix, [])
+        else:
+            start = bisect_left(self._keys, prefix)
+            end = bisect_left(self._keys, prefix + MAX_PREFIX, lo=start)
+            ids = self._top(self._ids[start:end])
+
+        return [self._values[i] for i in ids[: limit or self.max_results]]
+
+
+class AutocompleteIndex(NamedTuple):
+    songs: PrefixIndex
+    players: PrefixIndex
+    built_at: float
+
+    @staticmethod
+    def build(max_results: int) -> "AutocompleteIndex":
+        songs = (
+            Song.objects.filter(metadata__isnull=False)
+            .order_by("hash")
+            .values_list("hash", "number_of_scores", *(f"metadata__info__{field}" for field in SONG_INFO_FIELDS))
+            .iterator(chunk_size=10_000)
+        )
+        players = (
+            Player.objects.order_by("id")
+            .values_list("id", "name", "machine_tag", "num_scores")
+            .iterator(chunk_size=10_000)
+        )
+
+        return AutocompleteIndex(
+            songs=PrefixIndex((_song_entry(*song) for song in songs), max_results),
+            players=PrefixIndex(
+                (
+                    ((name, machine_tag), num_scores, (player_id, name, machine_tag, num_scores))
+                    for player_id, name, machine_tag, num_scores in players
+                ),
+                max_results,
+            ),
+            built_at=time.monotonic(),
+        )
+
+
+def _song_entry(song_hash, num_plays, *info_values):
+    chart_info = {field: value or "" for field, value in zip(SONG_INFO_FIELDS, info_values)}
+    keys = (chart_info["title"], chart_info["titletranslit"], chart_info["artist"], chart_info["artisttranslit"])
+    return keys, num_plays, (song_hash, get_display_name(chart_info), num_plays)
+
+
+_index: Optional[AutocompleteIndex] = None
+_rebuild_lock = threading.Lock()
+
+
+def get_autocomplete_index() -> AutocompleteIndex:
+    """Index of this process, built on first use and rebuilt in a background thread once it's expired."""
+    global _index
+
+    if _index is None:
+        with _rebuild_lock:
+            if _index is None:
+                _index = AutocompleteIndex.build(settings.BS_AUTOCOMPLETE_MAX_RESULTS)
+    elif time.monotonic() - _index.built_at >= settings.BS_AUTOCOMPLETE_INDEX_TTL_SECONDS:
+        if _rebuild_lock.acquire(blocking=False):  # requests keep using the stale index while it's rebuilt
+            threading.Thread(target=_rebuild, daemon=True).start()
+
+    return _index
+
+
+def _rebuild():
+    global _index
+
+    try:
+        _index = AutocompleteIndex.build(settings.BS_AUTOCOMPLETE_MAX_RESULTS)
+    finally:
+        connection.close()  # every thread gets its own connection
+        _rebuild_lock.release()
+
+
+def invalidate_autocomplete_index():
+    global _index
+    _index = None
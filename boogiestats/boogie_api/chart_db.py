@@ -0,0 +1,431 @@
+"""
+Access to the external chart database, see `BS_CHART_DB_PATH` and `BS_CHART_DB_INDEX_PATH`.
+
+Chart and pack info is read either from the JSON files of the database or from its compiled index
+(see `compile_chart_db` command) and cached in each process.
+"""
+
+import copy
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Collection, Iterable, Iterator, NamedTuple, Optional
+
+from django.conf import settings
+
+from boogiestats.boogie_api.metrics import (
+    CHART_DB_CACHE_BYTES,
+    CHART_DB_CACHE_ENTRIES,
+    CHART_DB_CACHE_REQUESTS,
+)
+
+CHART = "chart"
+PACK = "pack"
+INDEX_BATCH_SIZE = 500  # keeps `IN (...)` lists well below sqlite's variable limit
+INDEX_MMAP_SIZE = 1 << 30
+INSERT_BATCH_SIZE = 10_000
+INDEX_FORMAT_VERSION = 1  # stored in `PRAGMA user_version`, older indexes have no versions of entries
+
+
+class _Entry(NamedTuple):
+    value: Any
+    version: Any  # source specific, e.g. mtime of the file; None for missing entries
+    size: int
+    generation: int
+    checked_at: float
+
+
+class ChartDBCache:
+    """
+    Bounded LRU cache of parsed chart database entries, safe to share between threads.
+
+    Entries are keyed by (kind, name) and store the version they were loaded with. They're revalidated against
+    the source at most once per `revalidate_seconds`, so changes are picked up without restarting the process,
+    and all of them are dropped at once by `invalidate`, e.g. after the whole database has been replaced.
+    Missing entries are cached as well, most of the played charts don't have to be in the database.
+    Callers get copies of cached values, so they're free to modify them.
+    """
+
+    def __init__(self, max_entries: int, revalidate_seconds: float):
+        self.max_entries = max_entries
+        self.revalidate_seconds = revalidate_seconds
+        self.generation = 0
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, name: str, source) -> Any:
+        return self.get_many(kind, [name], source)[name]
+
+    def get_many(self, kind: str, names: Iterable[str], source) -> dict[str, Any]:
+        now = time.monotonic()
+        values = {}
+        missing = []
+
+        with self._lock:
+            for name in names:
+                if (entry := self._valid_entry((kind, source.key, name), source, now)) is not None:
+                    values[name] = entry.value
+                else:
+                    missing.append(name)
+
+        CHART_DB_CACHE_REQUESTS.labels(kind=kind, result="hit").inc(len(values))
+        if missing:
+            CHART_DB_CACHE_REQUESTS.labels(kind=kind, result="miss").inc(len(missing))
+            # entries are loaded outside the lock, at worst two threads will load the same entry concurrently
+            generation = self.generation
+            loaded = source.load_many(kind, missing)
+            with self._lock:
+                for name, (text, version) in loaded.items():
+                    value = json.loads(text) if text is not None else None
+                    values[name] = value
+                    if generation == self.generation:
+                        self._store((kind, source.key, name), _Entry(value, version, len(text or ""), generation, now))
+                self._update_metrics()
+
+        return {name: copy.copy(value) for name, value in values.items()}
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._size = 0
+            self._update_metrics()
+
+    def discard(self, kind: str, names: Iterable[str]):
+        """Drops cached entries of the given names from all sources."""
+        names = set(names)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == kind and key[2] in names]:
+                self._size -= self._entries.pop(key).size
+            self._update_metrics()
+
+    def _valid_entry(self, key, source, now) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None or entry.generation != self.generation:
+            return None
+
+        if now - entry.checked_at >= self.revalidate_seconds:
+            if source.version(key[0], key[2]) != entry.version:
+                return None
+            entry = self._entries[key] = entry._replace(checked_at=now)
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key, entry):
+        if old_entry := self._entries.pop(key, None):
+            self._size -= old_entry.size
+
+        self._entries[key] = entry
+        self._size += entry.size
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+
+    def _update_metrics(self):
+        CHART_DB_CACHE_ENTRIES.set(len(self._entries))
+        CHART_DB_CACHE_BYTES.set(self._size)
+
+
+class ChartDBFiles:
+    """Chart database as a tree of JSON files, entries are versioned with their mtimes."""
+
+    def __init__(self, path: os.PathLike):
+        self.key = f"files:{path}"
+        self.path = Path(path)
+
+    def _path(self, kind: str, name: str) -> Optional[Path]:
+        if kind == CHART:
+            base_path, relative_path = self.path / "charts", f"{name[:2]}/{name[2:]}.json"
+        else:
+            base_path, relative_path = self.path / "packs", f"{name}.json"
+
+        # normalized paths are checked instead of resolved ones, `resolve` would hit the filesystem on every call
+        base_path = Path(os.path.normpath(base_path))
+        path = Path(os.path.normpath(base_path / relative_path))
+        return path if path.is_relative_to(base_path) else None
+
+    def version(self, kind: str, name: str) -> Optional[int]:
+        try:
+            return self._path(kind, name).stat().st_mtime_ns
+        except (AttributeError, OSError):
+            return None
+
+    def load_many(self, kind: str, names: list[str]) -> dict[str, tuple[Optional[str], Any]]:
+        loaded = {}
+        for name in names:
+            version = self.version(kind, name)
+            text = self._path(kind, name).read_text() if version is not None else None
+            loaded[name] = text, version
+
+        return loaded
+
+
+class ChartDBIndex:
+    """
+    Chart database compiled into a single sqlite file by `compile_chart_db`.
+
+    Every thread uses its own memory-mapped, read-only connection, so processes share the file through the OS page
+    cache. Every entry has its own version, which is bumped when `update_chart_db_index` changes the entry in place,
+    so only the changed entries are reloaded. When the whole file is replaced, connections are reopened.
+    """
+
+    def __init__(self, path: os.PathLike, revalidate_seconds: float):
+        self.key = f"index:{path}"
+        self.path = Path(path)
+        self.revalidate_seconds = revalidate_seconds
+        self._local = threading.local()
+        self._identity = None
+        self._checked_at = float("-inf")
+
+    @property
+    def identity(self) -> Optional[tuple]:
+        now = time.monotonic()
+        if now - self._checked_at >= self.revalidate_seconds:
+            try:
+                stat = self.path.stat()
+                self._identity = stat.st_dev, stat.st_ino  # in place updates keep it, replacing the file doesn't
+            except OSError:
+                self._identity = None
+            self._checked_at = now
+
+        return self._identity
+
+    def version(self, kind: str, name: str) -> Any:
+        if (connection := self._connection()) is None:
+            return None
+        if not self._local.versioned:
+            return self.identity
+
+        table = "charts" if kind == CHART else "packs"
+        row = connection.execute(f"SELECT version FROM {table} WHERE name = ?", (name,)).fetchone()  # nosec
+        return row[0] if row is not None else None
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        identity = self.identity
+        if getattr(self._local, "identity", None) != identity:
+            if connection := getattr(self._local, "connection", None):
+                connection.close()
+
+            self._local.connection = None
+            if identity is not None:
+                connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+                connection.execute(f"PRAGMA mmap_size = {INDEX_MMAP_SIZE}")
+                (format_version,) = connection.execute("PRAGMA user_version").fetchone()
+                self._local.connection = connection
+                self._local.versioned = format_version >= INDEX_FORMAT_VERSION
+            self._local.identity = identity
+
+        return self._local.connection
+
+    def load_many(self, kind: str, names: list[str]) -> dict[str, tuple[Optional[str], Any]]:
+        loaded = {name: (None, None) for name in names}
+        if (connection := self._connection()) is None:
+            return loaded
+
+        table = "charts" if kind == CHART else "packs"
+        version = "version" if self._local.versioned else "NULL"
+        for i in range(0, len(names), INDEX_BATCH_SIZE):
+            batch = names[i : i + INDEX_BATCH_SIZE]
+            placeholders = ", ".join("?" * len(batch))
+            for name, text, entry_version in connection.execute(
+                f"SELECT name, info, {version} FROM {table} WHERE name IN ({placeholders})", batch  # nosec
+            ):
+                loaded[name] = text, entry_version
+
+        if not self._local.versioned:
+            loaded = {name: (text, self.identity) for name, (text, _) in loaded.items()}
+
+        return loaded
+
+    def recheck(self):
+        """Makes the next access check the identity of the file, e.g. right after it has been replaced."""
+        self._checked_at = float("-inf")
+
+    def chart_hashes(self) -> Iterator[str]:
+        if (connection := self._connection()) is not None:
+            yield from (name for (name,) in connection.execute("SELECT name FROM charts ORDER BY name"))
+
+
+_cache = ChartDBCache(settings.BS_CHART_DB_CACHE_SIZE, settings.BS_CHART_DB_CACHE_REVALIDATE_SECONDS)
+_indexes: dict[str, ChartDBIndex] = {}
+
+
+def _source():
+    if settings.BS_CHART_DB_INDEX_PATH is not None:
+        path = str(settings.BS_CHART_DB_INDEX_PATH)
+        if path not in _indexes:
+            _indexes[path] = ChartDBIndex(path, settings.BS_CHART_DB_CACHE_REVALIDATE_SECONDS)
+        return _indexes[path]
+
+    if settings.BS_CHART_DB_PATH is not None:
+        return ChartDBFiles(settings.BS_CHART_DB_PATH)
+
+    return None
+
+
+def get_chart_info(hash_v3: str) -> dict | None:
+    """Chart info based on an external (optional) chart database"""
+    if (source := _source()) is None:
+        return None
+
+    return _cache.get(CHART, hash_v3, source)
+
+
+def get_chart_infos(hashes: Iterable[str]) -> dict[str, dict | None]:
+    """Chart info of many charts at once, fetched in batches when the chart database is compiled"""
+    if (source := _source()) is None:
+        return {hash_v3: None for hash_v3 in hashes}
+
+    return _cache.get_many(CHART, list(dict.fromkeys(hashes)), source)
+
+
+def get_pack_info(pack_name: str) -> list | None:
+    """Hashes of the charts in a pack based on an external (optional) chart database"""
+    if (source := _source()) is None:
+        return None
+
+    return _cache.get(PACK, pack_name, source)
+
+
+def iter_chart_hashes() -> Iterator[str] | None:
+    """All chart hashes of the compiled chart database, None when it's not configured"""
+    if isinstance(source := _source(), ChartDBIndex):
+        return source.chart_hashes()
+
+    return None
+
+
+def invalidate_chart_db_cache(chart_hashes: Iterable[str] = None, pack_names: Iterable[str] = None):
+    """
+    Drops cached chart and pack info of this process, to be called after it has updated the chart database itself.
+
+    When neither chart hashes nor pack names are given, everything is dropped. Other processes pick up the changes
+    when their entries are revalidated, see `BS_CHART_DB_CACHE_REVALIDATE_SECONDS`.
+    """
+    if chart_hashes is None and pack_names is None:
+        _cache.invalidate()
+    else:
+        _cache.discard(CHART, chart_hashes or ())
+        _cache.discard(PACK, pack_names or ())
+
+    for index in _indexes.values():
+        index.recheck()
+
+
+def compile_chart_db_index(chart_db_path: os.PathLike, index_path: os.PathLike) -> tuple[int, int]:
+    """
+    Compiles the JSON files of a chart database into a sqlite index, returns numbers of compiled charts and packs.
+
+    The index is built next to the target path and moved over it afterwards, so readers never see a partial file.
+    """
+    chart_db_path = Path(chart_db_path)
+    index_path = Path(index_path)
+    tmp_path = index_path.with_name(f".{index_path.name}.tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    version = time.time_ns()
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.execute("PRAGMA journal_mode = OFF")
+        with connection:
+            for table in ("charts", "packs"):
+                connection.execute(
+                    f"CREATE TABLE {table} (name TEXT PRIMARY KEY, info TEXT NOT NULL, version INTEGER NOT NULL)"
+                    " WITHOUT ROWID"
+                )
+            charts = _insert_entries(connection, "charts", chart_files(chart_db_path), version)
+            packs = _insert_entries(connection, "packs", pack_files(chart_db_path), version)
+        connection.execute(f"PRAGMA user_version = {INDEX_FORMAT_VERSION}")
+    finally:
+        connection.close()
+
+    os.replace(tmp_path, index_path)
+    return charts, packs
+
+
+def update_chart_db_index(
+    chart_db_path: os.PathLike, index_path: os.PathLike, chart_hashes: Collection[str], pack_names: Collection[str]
+) -> tuple[int, int]:
+    """
+    Updates given charts and packs of a compiled index with the JSON files of a chart database, entries without files
+    are deleted. Returns numbers of updated charts and packs.
+
+    Only the changed entries are read and written, in place and in a single transaction, and they get new versions,
+    so readers reload just them. Indexes compiled before entries had versions are compiled again instead.
+    """
+    connection = sqlite3.connect(index_path)
+    try:
+        (format_version,) = connection.execute("PRAGMA user_version").fetchone()
+        if format_version >= INDEX_FORMAT_VERSION:
+            source = ChartDBFiles(chart_db_path)
+            version = time.time_ns()
+            with connection:
+                charts = _update_entries(connection, "charts", source, CHART, chart_hashes, version)
+                packs = _update_entries(connection, "packs", source, PACK, pack_names, version)
+            return charts, packs
+    finally:
+        connection.close()
+
+    compile_chart_db_index(chart_db_path, index_path)
+    return len(chart_hashes), len(pack_names)
+
+
+def chart_files(chart_db_path: Path) -> Iterator[tuple[str, Path]]:
+    """(hash, path) of every chart file in the chart database"""
+    for prefix in sorted(os.scandir(Path(chart_db_path) / "charts"), key=lambda entry: entry.name):
+        if prefix.is_dir():
+            for entry in os.scandir(prefix.path):
+                if entry.name.endswith(".json"):
+                    yield prefix.name + entry.name.removesuffix(".json"), Path(entry.path)
+
+
+def pack_files(chart_db_path: Path) -> Iterator[tuple[str, Path]]:
+    """(name, path) of every pack file in the chart database"""
+    packs_path = Path(chart_db_path) / "packs"
+    if packs_path.is_dir():
+        for entry in os.scandir(packs_path):
+            if entry.name.endswith(".json"):
+                yield entry.name.removesuffix(".json"), Path(entry.path)
+
+
+def _read_entry(path: Path) -> str:
+    text = path.read_text()
+    try:
+        json.loads(text)  # fail early for broken files, readers expect valid JSON
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{path}: {e}") from e
+
+    return text
+
+
+def _insert_entries(connection, table, files, version) -> int:
+    inserted = 0
+    files = iter(files)
+    while batch := list(itertools.islice(files, INSERT_BATCH_SIZE)):
+        rows = [(name, _read_entry(path), version) for name, path in batch]
+
+        connection.executemany(f"INSERT INTO {table} VALUES (?, ?, ?)", rows)  # nosec: no user input
+        inserted += len(rows)
+
+    return inserted
+
+
+def _update_entries(connection, table, source, kind, names, version) -> int:
+    updated = 0
+    for name in names:
+        path = source._path(kind, name)
+        if path is not None and path.is_file():
+            row = (name, _read_entry(path), version)
+            connection.execute(f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?)", row)  # nosec: no user input
+        else:
+            connection.execute(f"DELETE FROM {table} WHERE name = ?", (name,))  # nosec: no user input
+        updated += 1
+
+    return updated
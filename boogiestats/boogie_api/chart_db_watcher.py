@@ -0,0 +1,42 @@
+"""Keeps everything derived from the chart database in sync with its changes, see `watch_chart_db` command."""
+
+import os
+from typing import Optional
+
+from redis import Redis
+
+from boogiestats.boogie_api.chart_db import (
+    compile_chart_db_index,
+    invalidate_chart_db_cache,
+    update_chart_db_index,
+)
+from boogiestats.boogie_api.chart_metadata import IngestResult, ingest_chart_metadata
+from boogiestats.boogie_api.search_cache import update_search_cache
+
+
+def refresh_chart_db(
+    chart_db_path: os.PathLike, index_path: Optional[os.PathLike] = None, redis_connection: Optional[Redis] = None
+) -> IngestResult:
+    """
+    Applies changes of the chart database to the chart metadata, pack summaries, compiled index (when given),
+    cached chart info of this process and song search cache (when given).
+
+    Changes are detected by comparing the files with the fingerprints stored by the previous ingestion, so the work
+    done is proportional to the number of changed charts and packs instead of the size of the whole database.
+    Other processes aren't notified, they reload changed entries when they revalidate them with their versions.
+    """
+    result = ingest_chart_metadata(chart_db_path)
+
+    if index_path is not None:
+        if not os.path.exists(index_path):
+            compile_chart_db_index(chart_db_path, index_path)
+        elif result.changed_charts or result.changed_packs:
+            update_chart_db_index(chart_db_path, index_path, result.changed_charts, result.changed_packs)
+
+    if result.changed_charts or result.changed_packs:  # the search cache is populated with fresh chart info below
+        invalidate_chart_db_cache(result.changed_charts, result.changed_packs)
+
+    if redis_connection is not None and result.changed_charts:
+        update_search_cache(redis_connection, result.changed_charts)
+
+    return result
@@ -0,0 +1,178 @@
+"""Ingestion of the external chart database into `ChartMetadata` and `PackSummary`."""
+
+import json
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from boogiestats.boogie_api.chart_db import chart_files, pack_files
+from boogiestats.boogie_api.models import ChartMetadata, PackSummary
+from boogiestats.boogie_api.search import index_songs
+
+INGEST_BATCH_SIZE = 500  # keeps `IN (...)` lists and upserts well below sqlite's variable limit
+UPDATED_FIELDS = [
+    field.name
+    for field in ChartMetadata._meta.get_fields()
+    if field.concrete and not field.primary_key  # every field but the primary key is updated on conflict
+]
+
+STEPS_TYPE_MAPPING = {"dance-single": "Singles", "dance-double": "Doubles", "dance-couple": "Couples"}
+STEPS_TYPE_ORDER = defaultdict(lambda: 999)
+STEPS_TYPE_ORDER.update({"dance-single": 0, "dance-double": 1})
+DIFF_ORDER = defaultdict(lambda: 999)
+DIFF_ORDER.update({"Beginner": 0, "Easy": 1, "Medium": 2, "Hard": 3, "Challenge": 4, "Edit": 5})
+SUMMARY_CHART_FIELDS = ("hash", "diff", "diff_number", "steps_type")
+PENDING_FINGERPRINT = ""  # marks packs whose charts have changed, they're rebuilt even if an ingestion is interrupted
+
+
+def diff_sort_key(x):
+    return STEPS_TYPE_ORDER[x["steps_type"]], int(x["diff_number"]), DIFF_ORDER[x["diff"]]
+
+
+@dataclass
+class IngestResult:
+    upserted: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    packs_rebuilt: int = 0
+    packs_deleted: int = 0
+    changed_charts: set[str] = field(default_factory=set)  # hashes of upserted and deleted charts
+    changed_packs: set[str] = field(default_factory=set)  # names of rebuilt and deleted packs
+
+
+def file_fingerprint(path: os.PathLike) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _packs_of(chart_info: dict) -> list[str]:
+    return chart_info.get("packs") or [chart_info["pack_name"]]
+
+
+def ingest_chart_metadata(chart_db_path: os.PathLike, batch_size: int = INGEST_BATCH_SIZE) -> IngestResult:
+    """
+    Brings `ChartMetadata` and `PackSummary` in sync with the chart database.
+
+    Only charts whose files have changed since the last ingestion are read and upserted, according to
+    the fingerprints (mtime and size) stored with the metadata. Metadata of removed charts is deleted.
+    Pack summaries are rebuilt only for the changed pack files and the packs of changed charts. Changed charts are
+    reindexed in the SQLite search index as well.
+
+    Every batch of charts is stored together with its search index entries and pending marks of its packs, so an
+    interrupted ingestion never leaves charts that look ingested but whose derived data is outdated.
+    """
+    result = IngestResult()
+    affected_packs = _ingest_charts(chart_db_path, batch_size, result)
+    _ingest_packs(chart_db_path, affected_packs, result)
+
+    return result
+
+
+def _ingest_charts(chart_db_path, batch_size, result) -> set[str]:
+    ingested = dict(ChartMetadata.objects.values_list("song_id", "fingerprint"))
+    changed = []
+    present = set()
+
+    for chart_hash, path in chart_files(chart_db_path):
+        present.add(chart_hash)
+        fingerprint = file_fingerprint(path)
+        if ingested.get(chart_hash) == fingerprint:
+            result.unchanged += 1
+        else:
+            changed.append((chart_hash, path, fingerprint))
+
+    removed = sorted(ingested.keys() - present)
+    affected_packs = set()
+
+    for i in range(0, len(changed), batch_size):
+        batch = [
+            ChartMetadata.from_chart_info(json.loads(path.read_text()), fingerprint)
+            for _, path, fingerprint in changed[i : i + batch_size]
+        ]
+        chart_hashes = [metadata.song_id for metadata in batch]
+        packs = set().union(*(_packs_of(metadata.info) for metadata in batch))
+        packs.update(*(_packs_of(info) for info in _ingested_infos(chart_hashes)))
+        with transaction.atomic():
+            PackSummary.objects.filter(name__in=packs).update(fingerprint=PENDING_FINGERPRINT)
+            ChartMetadata.objects.bulk_create(
+                batch, update_conflicts=True, unique_fields=["song"], update_fields=UPDATED_FIELDS
+            )
+            index_songs(chart_hashes)
+        affected_packs.update(packs)
+        result.upserted += len(batch)
+        result.changed_charts.update(metadata.song_id for metadata in batch)
+
+    for i in range(0, len(removed), batch_size):
+        batch = removed[i : i + batch_size]
+        packs = set().union(*(_packs_of(info) for info in _ingested_infos(batch)))
+        with transaction.atomic():
+            PackSummary.objects.filter(name__in=packs).update(fingerprint=PENDING_FINGERPRINT)
+            ChartMetadata.objects.filter(song_id__in=batch).delete()
+            index_songs(batch)
+        affected_packs.update(packs)
+    result.deleted = len(removed)
+    result.changed_charts.update(removed)
+
+    return affected_packs
+
+
+def _ingested_infos(chart_hashes):
+    return ChartMetadata.objects.filter(song_id__in=chart_hashes).values_list("info", flat=True)
+
+
+def _ingest_packs(chart_db_path, affected_packs, result):
+    ingested = dict(PackSummary.objects.values_list("name", "fingerprint"))
+    present = set()
+
+    for pack_name, path in pack_files(chart_db_path):
+        present.add(pack_name)
+        fingerprint = file_fingerprint(path)
+        if ingested.get(pack_name) != fingerprint or pack_name in affected_packs:
+            songs = build_pack_songs(json.loads(path.read_text()))
+            PackSummary.objects.update_or_create(name=pack_name, defaults={"songs": songs, "fingerprint": fingerprint})
+            result.packs_rebuilt += 1
+            result.changed_packs.add(pack_name)
+
+    removed = ingested.keys() - present
+    PackSummary.objects.filter(name__in=removed).delete()
+    result.packs_deleted = len(removed)
+    result.changed_packs.update(removed)
+
+
+def build_pack_songs(chart_hashes: list[str]) -> list[dict]:
+    """Groups charts of a pack into songs, sorted by their titles and artists, for `PackSummary.songs`."""
+    metadata = []
+    for i in range(0, len(chart_hashes), INGEST_BATCH_SIZE):
+        metadata.extend(ChartMetadata.objects.filter(song_id__in=chart_hashes[i : i + INGEST_BATCH_SIZE]))
+    metadata.sort(key=lambda m: (m.sort_title, m.sort_artist, m.song_id))
+    pack_info = {m.song_id: m.info for m in metadata}
+
+    songs = []
+    used_hashes = set()
+    for chart_info in pack_info.values():
+        if chart_info["hash"] in used_hashes:
+            continue
+
+        # the other diffs can exist in other packs
+        diffs = [pack_info[h] for h in chart_info["diffs"] if h in pack_info and h not in used_hashes]
+        if chart_info not in diffs:
+            diffs.append(chart_info)
+        used_hashes.update(diff["hash"] for diff in diffs)
+        diffs.sort(key=diff_sort_key)
+
+        diffs_split = defaultdict(list)
+        for diff in diffs:
+            steps_type_name = STEPS_TYPE_MAPPING.get(diff["steps_type"], diff["steps_type"])
+            diffs_split[steps_type_name].append({field: diff[field] for field in SUMMARY_CHART_FIELDS})
+
+        songs.append(
+            {
+                "title": diffs[0]["titletranslit"] or diffs[0]["title"],
+                "artist": diffs[0]["artisttranslit"] or diffs[0]["artist"],
+                "diffs_split": dict(diffs_split),
+            }
+        )
+
+    return songs
@@ -0,0 +1,49 @@
+"""
+Conditional responses (`If-None-Match` / `304 Not Modified`) for pages and GS leaderboards.
+
+ETags are hashes of cheap version stamps, e.g. the latest score of a player or the number of scores of a song, so
+they can be checked before any of the heavy work of a view is done.
+"""
+
+import functools
+import hashlib
+import pathlib
+from http.client import OK
+from typing import Callable
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+import boogiestats
+
+
+@functools.cache
+def code_version() -> int:
+    """Changes with every deployment, so that responses of older code and templates aren't reused."""
+    package = pathlib.Path(boogiestats.__file__).parent
+    return max(path.stat().st_mtime_ns for path in package.rglob("*") if path.suffix in (".py", ".html"))
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha256(repr((code_version(), *parts)).encode()).hexdigest()
+    return quote_etag(digest[:32])
+
+
+def conditional_response(
+    request: HttpRequest, etag: str, get_response: Callable[[], HttpResponse], **cache_control
+) -> HttpResponse:
+    """`304 Not Modified` if the client has the given ETag already, otherwise the response of `get_response()`."""
+    if request.method not in ("GET", "HEAD"):
+        return get_response()
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = get_response()
+        if response.status_code != OK:
+            return response
+
+    response.headers["ETag"] = etag
+    patch_cache_control(response, **cache_control)
+
+    return response
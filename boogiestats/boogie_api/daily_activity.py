@@ -0,0 +1,86 @@
+"""Rebuilding of `PlayerDailyActivity` rollups from current and archived scores."""
+
+from collections import Counter
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import Coalesce
+
+from boogiestats.boogie_api.managers import DAILY_ACTIVITY_JUDGMENTS
+from boogiestats.boogie_api.models import (
+    ArchivedScore,
+    Player,
+    PlayerDailyActivity,
+    Score,
+)
+
+TOP_SCORE_STARS = {
+    "one_star": Q(is_itg_top=True, itg_score__gte=9600, itg_score__lt=9800),
+    "two_stars": Q(is_itg_top=True, itg_score__gte=9800, itg_score__lt=9900),
+    "three_stars": Q(is_itg_top=True, itg_score__gte=9900, itg_score__lt=10000),
+    "four_stars": Q(is_itg_top=True, itg_score=10000),
+    "five_stars": Q(is_ex_top=True, ex_score=10000),
+}
+
+
+def players_without_daily_activity():
+    return Player.objects.filter(num_scores__gt=0, daily_activity__isnull=True)
+
+
+def rebuild_daily_activity(player_ids: Optional[Iterable[int]] = None) -> int:
+    """Rebuilds rollups of the given players, or all of them, each player in its own transaction."""
+    if player_ids is None:
+        player_ids = Player.objects.order_by("id").values_list("id", flat=True)
+
+    rebuilt = 0
+    for player_id in player_ids:
+        with transaction.atomic():
+            PlayerDailyActivity.objects.filter(player_id=player_id).delete()
+            PlayerDailyActivity.objects.bulk_create(_daily_activity_of(player_id))
+        rebuilt += 1
+
+    return rebuilt
+
+
+def _daily_activity_of(player_id: int) -> list[PlayerDailyActivity]:
+    days = {}
+    sources = (
+        (Score.objects.filter(player_id=player_id), "judgment_counts__", TOP_SCORE_STARS),
+        (ArchivedScore.objects.filter(player_id=player_id), "", {}),  # archived scores are never top
+    )
+    for scores, judgments_prefix, stars in sources:
+        rows = (
+            scores.order_by()
+            .values("submission_day")
+            .annotate(
+                plays=Count("id"),
+                first_submission=Min("submission_date"),
+                last_submission=Max("submission_date"),
+                **{name: Coalesce(Sum(f"{judgments_prefix}{name}"), 0) for name in DAILY_ACTIVITY_JUDGMENTS},
+                **{name: Count("id", filter=condition) for name, condition in stars.items()},
+            )
+        )
+        for row in rows:
+            day = row.pop("submission_day")
+            if activity := days.get(day):
+                _merge(activity, row)
+            else:
+                days[day] = PlayerDailyActivity(player_id=player_id, day=day, **row)
+
+    played_charts = (
+        Score.objects.filter(player_id=player_id)
+        .values_list("submission_day", "song_id")
+        .union(ArchivedScore.objects.filter(player_id=player_id).values_list("submission_day", "song_id"))
+    )
+    for day, charts_played in Counter(day for day, _ in played_charts).items():
+        days[day].charts_played = charts_played
+
+    return [days[day] for day in sorted(days)]
+
+
+def _merge(activity: PlayerDailyActivity, row: dict):
+    activity.first_submission = min(activity.first_submission, row.pop("first_submission"))
+    activity.last_submission = max(activity.last_submission, row.pop("last_submission"))
+    for name, value in row.items():
+        setattr(activity, name, getattr(activity, name) + value)
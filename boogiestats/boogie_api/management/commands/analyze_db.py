@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = "Updates statistics of the database, which are used by its query planner and for estimated counts"
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        self.stdout.write(f"Analyzed the database in {time.perf_counter() - start:.2f}s")
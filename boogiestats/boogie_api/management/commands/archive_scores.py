@@ -0,0 +1,21 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from boogiestats.boogie_api.archive import ARCHIVE_CHUNK_SIZE, archive_scores
+
+
+class Command(BaseCommand):
+    help = "Moves old superseded scores from the scores table to the archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=365)
+        parser.add_argument("--chunk-size", type=int, default=ARCHIVE_CHUNK_SIZE)
+
+    def handle(self, *args, older_than_days, chunk_size, **options):
+        start = time.perf_counter()
+        archived = archive_scores(now() - datetime.timedelta(days=older_than_days), chunk_size=chunk_size)
+
+        self.stdout.write(f"Archived {archived} scores in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from boogiestats.boogie_api.daily_activity import (
+    players_without_daily_activity,
+    rebuild_daily_activity,
+)
+
+
+class Command(BaseCommand):
+    help = "Builds daily activity rollups of players from their current and archived scores"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--player-id", type=int, action="append", dest="player_ids", help="can be repeated")
+        parser.add_argument(
+            "--only-missing", action="store_true", help="only build rollups of players with scores but no rollups"
+        )
+
+    def handle(self, *args, player_ids, only_missing, **options):
+        start = time.perf_counter()
+        if only_missing:
+            player_ids = list(players_without_daily_activity().values_list("id", flat=True))
+        rebuilt = rebuild_daily_activity(player_ids)
+
+        self.stdout.write(f"Built daily activity of {rebuilt} players in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from boogiestats.boogie_api.song_summaries import (
+    players_without_song_summaries,
+    rebuild_song_summaries,
+)
+
+
+class Command(BaseCommand):
+    help = "Builds per-song summaries of players from their current and archived scores"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--player-id", type=int, action="append", dest="player_ids", help="can be repeated")
+        parser.add_argument(
+            "--only-missing", action="store_true", help="only build summaries of players with scores but no summaries"
+        )
+
+    def handle(self, *args, player_ids, only_missing, **options):
+        start = time.perf_counter()
+        if only_missing:
+            player_ids = list(players_without_song_summaries().values_list("id", flat=True))
+        rebuilt = rebuild_song_summaries(player_ids)
+
+        self.stdout.write(f"Built song summaries of {rebuilt} players in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from boogiestats.boogie_api.chart_db import compile_chart_db_index
+
+
+class Command(BaseCommand):
+    help = "Compiles the chart database (BS_CHART_DB_PATH) into a single indexed file (BS_CHART_DB_INDEX_PATH)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", default=settings.BS_CHART_DB_INDEX_PATH, help="defaults to BS_CHART_DB_INDEX_PATH"
+        )
+
+    def handle(self, *args, output, **options):
+        if settings.BS_CHART_DB_PATH is None:
+            raise CommandError("BS_CHART_DB_PATH is not configured")
+        if output is None:
+            raise CommandError("BS_CHART_DB_INDEX_PATH is not configured, provide --output")
+
+        start = time.perf_counter()
+        try:
+            charts, packs = compile_chart_db_index(settings.BS_CHART_DB_PATH, output)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Compiling chart database failed: {e}") from e
+
+        self.stdout.write(
+            f"Compiled {charts} charts and {packs} packs into {output} in {time.perf_counter() - start:.2f}s"
+        )
@@ -0,0 +1,21 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from boogiestats.boogie_api.wrapped import generate_wrapped_snapshots, missing_snapshots
+
+
+class Command(BaseCommand):
+    help = "Stores wrapped pages of closed years of all players ahead of time, computing them in parallel processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, action="append", dest="years", help="can be repeated, all by default")
+        parser.add_argument("--workers", type=int, default=os.cpu_count())
+        parser.add_argument("--force", action="store_true", help="regenerate existing snapshots as well")
+
+    def handle(self, *args, years, workers, force, **options):
+        start = time.perf_counter()
+        generated = generate_wrapped_snapshots(missing_snapshots(years, force=force), workers=workers)
+
+        self.stdout.write(f"Generated {generated} wrapped snapshots in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from boogiestats.boogie_api.chart_metadata import (
+    INGEST_BATCH_SIZE,
+    ingest_chart_metadata,
+)
+
+
+class Command(BaseCommand):
+    help = "Updates chart metadata stored in the database with the changes in the chart database (BS_CHART_DB_PATH)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+
+    def handle(self, *args, batch_size, **options):
+        if settings.BS_CHART_DB_PATH is None:
+            self.stdout.write("BS_CHART_DB_PATH is not configured, there's nothing to ingest")
+            return
+
+        start = time.perf_counter()
+        try:
+            result = ingest_chart_metadata(settings.BS_CHART_DB_PATH, batch_size=batch_size)
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Ingesting chart database failed: {e!r}") from e
+
+        self.stdout.write(
+            f"Upserted {result.upserted}, deleted {result.deleted} and skipped {result.unchanged} unchanged charts,"
+            f" rebuilt {result.packs_rebuilt} and deleted {result.packs_deleted} packs"
+            f" in {time.perf_counter() - start:.2f}s"
+        )
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from boogiestats.boogie_api.player_search import rebuild_player_search_index
+from boogiestats.boogie_api.search import rebuild_search_index, sqlite_search_available
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the built-in SQLite song and player search indexes from scratch"
+
+    def handle(self, *args, **options):
+        if not sqlite_search_available():
+            raise CommandError("Built-in search indexes are only available with SQLite databases")
+
+        start = time.perf_counter()
+        rebuild_search_index()
+        rebuild_player_search_index()
+
+        self.stdout.write(f"Rebuilt song and player search indexes in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from boogiestats.boogie_api.recompute import (
+    DEFAULT_CHUNK_SIZE,
+    recompute_ex_scores,
+    rederive_ex_tops,
+)
+
+
+class Command(BaseCommand):
+    help = "Recomputes EX scores from stored judgments and re-derives EX tops, highscores and quints"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, chunk_size, **options):
+        start = time.perf_counter()
+        result = recompute_ex_scores(chunk_size=chunk_size)
+        recompute_duration = time.perf_counter() - start
+
+        self.stdout.write(
+            f"Recomputed {result.processed} scores in {recompute_duration:.2f}s"
+            f" ({result.processed / max(recompute_duration, 1e-9):.0f} scores/s), {result.changed} changed"
+        )
+
+        if result.changed:
+            start = time.perf_counter()
+            rederive_ex_tops(result.affected_songs, result.affected_players)
+            self.stdout.write(
+                f"Re-derived EX tops for {len(result.affected_songs)} songs"
+                f" and {len(result.affected_players)} players in {time.perf_counter() - start:.2f}s"
+            )
@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from boogiestats.boogie_api.models import SiteStatistics
+
+
+class Command(BaseCommand):
+    help = "Recomputes site-wide totals and recent activity shown on the index page from scratch"
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        statistics = SiteStatistics.recompute()
+
+        self.stdout.write(f"Recomputed site statistics ({statistics}) in {time.perf_counter() - start:.2f}s")
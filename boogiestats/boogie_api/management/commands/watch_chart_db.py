@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from boogiestats.boogie_api.chart_db_watcher import refresh_chart_db
+from boogiestats.boogie_api.utils import get_redis
+
+
+class Command(BaseCommand):
+    help = (
+        "Periodically applies changes of the chart database (BS_CHART_DB_PATH) to the chart metadata, "
+        "compiled index (BS_CHART_DB_INDEX_PATH) and search cache"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.BS_CHART_DB_WATCH_INTERVAL_SECONDS,
+            help="defaults to BS_CHART_DB_WATCH_INTERVAL_SECONDS",
+        )
+        parser.add_argument("--once", action="store_true", help="check for changes once and exit")
+
+    def handle(self, *args, interval, once, **options):
+        if settings.BS_CHART_DB_PATH is None:
+            raise CommandError("BS_CHART_DB_PATH is not configured")
+
+        while True:
+            start = time.monotonic()
+            self.refresh(once)
+            if once:
+                return
+
+            time.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+    def refresh(self, once):
+        start = time.perf_counter()
+        try:
+            result = refresh_chart_db(settings.BS_CHART_DB_PATH, settings.BS_CHART_DB_INDEX_PATH, get_redis())
+        except (OSError, ValueError, KeyError) as e:
+            if once:
+                raise CommandError(f"Refreshing chart database failed: {e!r}") from e
+            self.stderr.write(f"Refreshing chart database failed, will retry: {e!r}")
+            return
+
+        if result.changed_charts or result.changed_packs or once:
+            self.stdout.write(
+                f"Refreshed {len(result.changed_charts)} charts and {len(result.changed_packs)} packs"
+                f" in {time.perf_counter() - start:.2f}s"
+            )
@@ -17,6 +17,12 @@ from tenacity import (
 
 from boogiestats.boogie_api.choices import GSStatus
 from boogiestats.boogie_api.metrics import SCORE_CREATION_ATTEMPTS, SCORES_CREATED
+from boogiestats.boogie_api.page_cache import (
+    FEED_TAG,
+    invalidate_pages,
+    player_tag,
+    song_tag,
+)
 from boogiestats.boogie_api.utils import score_to_star_field
 
 if TYPE_CHECKING:
@@ -42,6 +48,9 @@ JUDGMENTS_MAP = {
 }
 
 
+DAILY_ACTIVITY_JUDGMENTS = ("fantastics_plus", "fantastics", "excellents", "greats", "decents", "way_offs", "misses")
+
+
 def _score_creation_before_sleep(retry_state: RetryCallState):
     logger.warning(
         "Score creation locked, retrying (attempt %d)",
@@ -74,6 +83,7 @@ class ScoreManager(models.Manager):
                 result = self._create_atomic(song, player, itg_score, comment, rate, gs_status, used_cmod, judgments)
 
         song.update_search_cache()
+        invalidate_pages(player_tag(player.id), song_tag(song.hash), FEED_TAG)
 
         attempt_number = attempt.retry_state.attempt_number
         SCORE_CREATION_ATTEMPTS.labels(str(attempt_number)).inc()
@@ -115,6 +125,8 @@ class ScoreManager(models.Manager):
 
         self._update_song(score_object, song)
         self._update_player(score_object, player, previous_itg_top, new_is_itg_top, new_is_ex_top)
+        self._update_daily_activity(score_object, player, previous_itg_top, new_is_itg_top, new_is_ex_top)
+        player.song_summaries.record_score(score_object, new_is_itg_top, new_is_ex_top)
 
         return score_object
 
@@ -201,6 +213,72 @@ class ScoreManager(models.Manager):
         # It's safe in this case because we do db-side updates
         type(player).objects.filter(pk=player.pk).update(**attrs)
 
+    def _update_daily_activity(self, score_object, player, previous_itg_top, itg_improved, ex_improved):
+        new_chart = not (
+            self.filter(player=player, song_id=score_object.song_id, submission_day=score_object.submission_day)
+            .exclude(pk=score_object.pk)
+            .exists()
+        )  # scores that have just been submitted are never archived
+        player.daily_activity.record_score(score_object, new_chart, previous_itg_top, itg_improved, ex_improved)
+
+
+class PlayerDailyActivityManager(models.Manager):
+    def record_score(self, score, new_chart, previous_itg_top, itg_improved, ex_improved):
+        """
+        Adds a new score to the rollup of its day, it's meant to be used on a related manager of the score's player.
+
+        Stars are counted from top scores only, like in `Player`, so an improved score takes a star away from the day
+        of the previous top score.
+        """
+        judgments = {name: getattr(score, name) for name in DAILY_ACTIVITY_JUDGMENTS}
+        stars = {}
+        if itg_improved and (star_field := score_to_star_field(score)):
+            stars[star_field] = 1
+        if ex_improved and score.ex_score == 10_000:
+            stars["five_stars"] = 1
+
+        updated = self.filter(day=score.submission_day).update(
+            plays=F("plays") + 1,
+            charts_played=F("charts_played") + int(new_chart),
+            last_submission=score.submission_date,
+            **{name: F(name) + value for name, value in (judgments | stars).items()},
+        )
+        if not updated:
+            self.create(
+                day=score.submission_day,
+                plays=1,
+                charts_played=1,
+                first_submission=score.submission_date,
+                last_submission=score.submission_date,
+                **judgments,
+                **stars,
+            )
+
+        if itg_improved and previous_itg_top is not None and (star_field := score_to_star_field(previous_itg_top)):
+            self.filter(day=previous_itg_top.submission_day).update(**{star_field: F(star_field) - 1})
+
+
+class PlayerSongSummaryManager(models.Manager):
+    def record_score(self, score, itg_improved, ex_improved):
+        """Adds a new score to the summary of its song, it's meant to be used on a related manager of the player."""
+        top_scores = {}
+        if itg_improved:
+            top_scores.update(best_itg_score=score.itg_score, itg_top_score=score)
+        if ex_improved:
+            top_scores.update(best_ex_score=score.ex_score, ex_top_score=score)
+
+        updated = self.filter(song_id=score.song_id).update(
+            num_plays=F("num_plays") + 1, last_played=score.submission_date, **top_scores
+        )
+        if not updated:
+            self.create(
+                song_id=score.song_id,
+                num_plays=1,
+                first_played=score.submission_date,
+                last_played=score.submission_date,
+                **top_scores,
+            )
+
 
 class PlayerManager(models.Manager):
     def create(self, gs_api_key, machine_tag, **kwargs):
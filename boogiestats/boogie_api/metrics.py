@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 from prometheus_client.utils import INF
 
 DURATION_BUCKETS = [
@@ -58,3 +58,20 @@ SCORE_CREATION_ATTEMPTS = Counter(
     labelnames=["attempt"],
 )
 SCORES_CREATED = Counter("boogiestats_scores_created_total", "Number of scores created")
+
+CHART_DB_CACHE_REQUESTS = Counter(
+    "boogiestats_chart_db_cache_requests_total",
+    "Number of chart database cache lookups",
+    labelnames=["kind", "result"],
+)
+CHART_DB_CACHE_ENTRIES = Gauge("boogiestats_chart_db_cache_entries", "Number of cached chart database files")
+CHART_DB_CACHE_BYTES = Gauge(
+    "boogiestats_chart_db_cache_bytes",
+    "Approximate size of cached chart database files, as their size on disk",
+)
+
+PAGE_CACHE_REQUESTS = Counter(
+    "boogiestats_page_cache_requests_total",
+    "Number of anonymous page requests served from the page cache (hit) or rendered (miss)",
+    labelnames=["view", "result"],
+)
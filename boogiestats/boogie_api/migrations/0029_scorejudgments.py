@@ -0,0 +1,98 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+CHUNK_SIZE = 10_000
+JUDGMENT_FIELDS = (
+    "misses",
+    "way_offs",
+    "decents",
+    "greats",
+    "excellents",
+    "fantastics",
+    "fantastics_plus",
+    "total_steps",
+    "total_rolls",
+    "total_holds",
+    "total_mines",
+    "rolls_held",
+    "holds_held",
+    "mines_hit",
+)
+
+
+def move_judgments_to_side_table(apps, schema_editor):
+    Score = apps.get_model("boogie_api", "Score")
+    ScoreJudgments = apps.get_model("boogie_api", "ScoreJudgments")
+
+    last_id = 0
+    while rows := list(
+        Score.objects.filter(has_judgments=True, id__gt=last_id)
+        .order_by("id")
+        .values_list("id", *JUDGMENT_FIELDS)[:CHUNK_SIZE]
+    ):
+        ScoreJudgments.objects.bulk_create(
+            [ScoreJudgments(score_id=row[0], **dict(zip(JUDGMENT_FIELDS, row[1:]))) for row in rows]
+        )
+        last_id = rows[-1][0]
+
+
+def move_judgments_back_to_scores(apps, schema_editor):
+    Score = apps.get_model("boogie_api", "Score")
+    ScoreJudgments = apps.get_model("boogie_api", "ScoreJudgments")
+
+    last_id = 0
+    while rows := list(
+        ScoreJudgments.objects.filter(score_id__gt=last_id)
+        .order_by("score_id")
+        .values_list("score_id", *JUDGMENT_FIELDS)[:CHUNK_SIZE]
+    ):
+        Score.objects.bulk_update(
+            [Score(id=row[0], **dict(zip(JUDGMENT_FIELDS, row[1:]))) for row in rows],
+            JUDGMENT_FIELDS,
+            batch_size=500,
+        )
+        last_id = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boogie_api", "0028_alter_player_gs_integration_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScoreJudgments",
+            fields=[
+                (
+                    "score",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="judgment_counts",
+                        serialize=False,
+                        to="boogie_api.score",
+                    ),
+                ),
+                ("misses", models.PositiveIntegerField(default=0)),
+                ("way_offs", models.PositiveIntegerField(default=0)),
+                ("decents", models.PositiveIntegerField(default=0)),
+                ("greats", models.PositiveIntegerField(default=0)),
+                ("excellents", models.PositiveIntegerField(default=0)),
+                ("fantastics", models.PositiveIntegerField(default=0)),
+                ("fantastics_plus", models.PositiveIntegerField(default=0)),
+                ("total_steps", models.PositiveIntegerField(default=0)),
+                ("total_rolls", models.PositiveIntegerField(default=0)),
+                ("total_holds", models.PositiveIntegerField(default=0)),
+                ("total_mines", models.PositiveIntegerField(default=0)),
+                ("rolls_held", models.PositiveIntegerField(default=0)),
+                ("holds_held", models.PositiveIntegerField(default=0)),
+                ("mines_hit", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "score judgments",
+            },
+        ),
+        migrations.RunPython(move_judgments_to_side_table, move_judgments_back_to_scores),
+        *(migrations.RemoveField(model_name="score", name=name) for name in JUDGMENT_FIELDS),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import boogiestats.boogie_api.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boogie_api", "0029_scorejudgments"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedScore",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("submission_date", models.DateTimeField(db_index=True)),
+                ("submission_day", models.DateField()),
+                ("itg_score", models.PositiveIntegerField()),
+                ("ex_score", models.PositiveIntegerField()),
+                (
+                    "gs_status",
+                    models.IntegerField(
+                        choices=[
+                            (1, "OK"),
+                            (2, "An error occurred during submission (GS might have accepted the score)"),
+                            (3, "Submission was skipped"),
+                        ]
+                    ),
+                ),
+                ("comment", models.CharField(blank=True, max_length=200)),
+                ("used_cmod", models.BooleanField()),
+                ("rate", models.PositiveIntegerField()),
+                ("has_judgments", models.BooleanField()),
+                ("misses", models.PositiveIntegerField(default=0)),
+                ("way_offs", models.PositiveIntegerField(default=0)),
+                ("decents", models.PositiveIntegerField(default=0)),
+                ("greats", models.PositiveIntegerField(default=0)),
+                ("excellents", models.PositiveIntegerField(default=0)),
+                ("fantastics", models.PositiveIntegerField(default=0)),
+                ("fantastics_plus", models.PositiveIntegerField(default=0)),
+                ("total_steps", models.PositiveIntegerField(default=0)),
+                ("total_rolls", models.PositiveIntegerField(default=0)),
+                ("total_holds", models.PositiveIntegerField(default=0)),
+                ("total_mines", models.PositiveIntegerField(default=0)),
+                ("rolls_held", models.PositiveIntegerField(default=0)),
+                ("holds_held", models.PositiveIntegerField(default=0)),
+                ("mines_hit", models.PositiveIntegerField(default=0)),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_scores",
+                        to="boogie_api.player",
+                    ),
+                ),
+                (
+                    "song",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_scores",
+                        to="boogie_api.song",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["player", "submission_day"], name="boogie_api__player__4f90f4_idx")],
+            },
+            bases=(boogiestats.boogie_api.models.GSSubmissionMixin, models.Model),
+        ),
+    ]
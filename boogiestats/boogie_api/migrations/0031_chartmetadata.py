@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boogie_api", "0030_archivedscore"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChartMetadata",
+            fields=[
+                (
+                    "song",
+                    models.OneToOneField(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="metadata",
+                        serialize=False,
+                        to="boogie_api.song",
+                    ),
+                ),
+                ("sort_title", models.TextField(db_index=True)),
+                ("sort_artist", models.TextField()),
+                ("pack_name", models.TextField(db_index=True)),
+                ("steps_type", models.CharField(max_length=32)),
+                ("diff", models.CharField(max_length=32)),
+                ("diff_number", models.PositiveSmallIntegerField(db_index=True)),
+                ("info", models.JSONField()),
+                ("fingerprint", models.CharField(max_length=64)),
+            ],
+            options={
+                "verbose_name_plural": "chart metadata",
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boogie_api", "0031_chartmetadata"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PackSummary",
+            fields=[
+                ("name", models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ("songs", models.JSONField()),
+                ("fingerprint", models.CharField(max_length=64)),
+            ],
+            options={
+                "verbose_name_plural": "pack summaries",
+            },
+        ),
+    ]
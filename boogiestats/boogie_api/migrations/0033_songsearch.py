@@ -0,0 +1,35 @@
+from django.db import migrations
+
+TEXT_FIELDS = ("title", "titletranslit", "subtitle", "subtitletranslit", "artist", "artisttranslit", "pack_name")
+TAG_FIELDS = ("diff", "steps_type")
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    columns = ", ".join(("hash",) + TEXT_FIELDS + TAG_FIELDS + ("diff_number UNINDEXED",))
+    chart_info_columns = ", ".join(f"json_extract(m.info, '$.{field}')" for field in TEXT_FIELDS + TAG_FIELDS)
+    schema_editor.execute(f"CREATE VIRTUAL TABLE boogie_api_songsearch USING fts5({columns}, tokenize='trigram')")
+    schema_editor.execute(
+        f"""
+        INSERT INTO boogie_api_songsearch (hash, {", ".join(TEXT_FIELDS + TAG_FIELDS)}, diff_number)
+        SELECT s.hash, {chart_info_columns}, m.diff_number
+        FROM boogie_api_song s JOIN boogie_api_chartmetadata m ON m.song_id = s.hash
+        """
+    )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE boogie_api_songsearch")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("boogie_api", "0032_packsummary"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table, elidable=False),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+TABLES = {
+    "boogie_api_playersearch": "tokenize='trigram'",
+    "boogie_api_playersearchprefix": "tokenize='unicode61', prefix='1 2'",
+}
+
+
+def create_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    for table, options in TABLES.items():
+        schema_editor.execute(f"CREATE VIRTUAL TABLE {table} USING fts5(name, machine_tag, {options})")
+        schema_editor.execute(
+            f"INSERT INTO {table} (rowid, name, machine_tag) SELECT id, name, machine_tag FROM boogie_api_player"
+        )
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for table in TABLES:
+            schema_editor.execute(f"DROP TABLE {table}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("boogie_api", "0033_songsearch"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables, elidable=False),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:28
+
+from django.db import migrations, models
+
+RECENT_ACTIVITY_SIZE = 5
+
+
+def compute_site_statistics(apps, schema_editor):
+    Song = apps.get_model("boogie_api", "Song")
+    Score = apps.get_model("boogie_api", "Score")
+    ArchivedScore = apps.get_model("boogie_api", "ArchivedScore")
+    Player = apps.get_model("boogie_api", "Player")
+    SiteStatistics = apps.get_model("boogie_api", "SiteStatistics")
+
+    SiteStatistics.objects.create(
+        num_songs=Song.objects.count(),
+        num_scores=Score.objects.count() + ArchivedScore.objects.count(),
+        num_players=Player.objects.count(),
+        recent_players=list(
+            Player.objects.filter(latest_score__isnull=False)
+            .order_by("-latest_score__submission_date")
+            .values_list("id", flat=True)[:RECENT_ACTIVITY_SIZE]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boogie_api", "0034_playersearch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SiteStatistics",
+            fields=[
+                ("id", models.PositiveSmallIntegerField(default=1, editable=False, primary_key=True, serialize=False)),
+                ("num_songs", models.PositiveBigIntegerField(default=0)),
+                ("num_scores", models.PositiveBigIntegerField(default=0)),
+                ("num_players", models.PositiveBigIntegerField(default=0)),
+                ("recent_players", models.JSONField(blank=True, default=list)),
+            ],
+            options={
+                "verbose_name_plural": "site statistics",
+            },
+        ),
+        migrations.RunPython(compute_site_statistics, migrations.RunPython.noop),
+    ]
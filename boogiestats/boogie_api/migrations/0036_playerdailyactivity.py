@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boogie_api", "0035_sitestatistics"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlayerDailyActivity",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("plays", models.PositiveIntegerField(default=0)),
+                ("charts_played", models.PositiveIntegerField(default=0)),
+                ("one_star", models.PositiveIntegerField(default=0)),
+                ("two_stars", models.PositiveIntegerField(default=0)),
+                ("three_stars", models.PositiveIntegerField(default=0)),
+                ("four_stars", models.PositiveIntegerField(default=0)),
+                ("five_stars", models.PositiveIntegerField(default=0)),
+                ("fantastics_plus", models.PositiveBigIntegerField(default=0)),
+                ("fantastics", models.PositiveBigIntegerField(default=0)),
+                ("excellents", models.PositiveBigIntegerField(default=0)),
+                ("greats", models.PositiveBigIntegerField(default=0)),
+                ("decents", models.PositiveBigIntegerField(default=0)),
+                ("way_offs", models.PositiveBigIntegerField(default=0)),
+                ("misses", models.PositiveBigIntegerField(default=0)),
+                ("first_submission", models.DateTimeField()),
+                ("last_submission", models.DateTimeField()),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_activity",
+                        to="boogie_api.player",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "player daily activity",
+                "constraints": [models.UniqueConstraint(fields=("player", "day"), name="unique_player_day")],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boogie_api", "0036_playerdailyactivity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WrappedSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("year", models.PositiveSmallIntegerField()),
+                ("data", models.JSONField()),
+                ("generated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="wrapped_snapshots",
+                        to="boogie_api.player",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("player", "year"), name="unique_player_year")],
+            },
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boogie_api", "0037_wrappedsnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlayerSongSummary",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("num_plays", models.PositiveIntegerField(default=0)),
+                ("first_played", models.DateTimeField()),
+                ("last_played", models.DateTimeField()),
+                ("best_itg_score", models.PositiveIntegerField(default=0)),
+                ("best_ex_score", models.PositiveIntegerField(default=0)),
+                (
+                    "ex_top_score",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="ex_top_summary",
+                        to="boogie_api.score",
+                    ),
+                ),
+                (
+                    "itg_top_score",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="itg_top_summary",
+                        to="boogie_api.score",
+                    ),
+                ),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="song_summaries",
+                        to="boogie_api.player",
+                    ),
+                ),
+                (
+                    "song",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="player_summaries",
+                        to="boogie_api.song",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "player song summaries",
+                "indexes": [
+                    models.Index(fields=["player", "-num_plays", "song"], name="boogie_api__player__5dc211_idx"),
+                    models.Index(fields=["player", "-best_itg_score"], name="boogie_api__player__d8ab70_idx"),
+                    models.Index(fields=["player", "-best_ex_score"], name="boogie_api__player__e1a65c_idx"),
+                    models.Index(fields=["song", "-best_itg_score"], name="boogie_api__song_id_233fff_idx"),
+                    models.Index(fields=["song", "-best_ex_score"], name="boogie_api__song_id_1972f0_idx"),
+                ],
+                "constraints": [models.UniqueConstraint(fields=("player", "song"), name="unique_player_song")],
+            },
+        ),
+    ]
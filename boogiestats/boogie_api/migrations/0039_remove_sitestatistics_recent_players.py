@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:26
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boogie_api", "0038_playersongsummary"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="sitestatistics",
+            name="recent_players",
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+from django.db.models import Count, Max, Min
+
+PLAYERS_BATCH_SIZE = 100
+
+
+def backfill_song_summaries(apps, schema_editor):
+    """Same as `backfill_song_summaries --only-missing`, leaderboards read nothing but summaries."""
+    Player = apps.get_model("boogie_api", "Player")
+    Score = apps.get_model("boogie_api", "Score")
+    ArchivedScore = apps.get_model("boogie_api", "ArchivedScore")
+    PlayerSongSummary = apps.get_model("boogie_api", "PlayerSongSummary")
+
+    player_ids = list(Player.objects.filter(song_summaries__isnull=True).order_by("id").values_list("id", flat=True))
+    for i in range(0, len(player_ids), PLAYERS_BATCH_SIZE):
+        batch = player_ids[i : i + PLAYERS_BATCH_SIZE]
+        summaries = {}
+        for model in (Score, ArchivedScore):
+            rows = (
+                model.objects.filter(player_id__in=batch)
+                .order_by()
+                .values("player_id", "song_id")
+                .annotate(
+                    num_plays=Count("id"), first_played=Min("submission_date"), last_played=Max("submission_date")
+                )
+            )
+            for row in rows:
+                if summary := summaries.get((row["player_id"], row["song_id"])):
+                    summary.num_plays += row["num_plays"]
+                    summary.first_played = min(summary.first_played, row["first_played"])
+                    summary.last_played = max(summary.last_played, row["last_played"])
+                else:
+                    summaries[row["player_id"], row["song_id"]] = PlayerSongSummary(**row)
+
+        for score_type in ("itg", "ex"):  # archived scores are never top
+            top_scores = Score.objects.filter(player_id__in=batch, **{f"is_{score_type}_top": True}).values_list(
+                "player_id", "song_id", "id", f"{score_type}_score"
+            )
+            for player_id, song_id, score_id, value in top_scores:
+                setattr(summaries[player_id, song_id], f"{score_type}_top_score_id", score_id)
+                setattr(summaries[player_id, song_id], f"best_{score_type}_score", value)
+
+        PlayerSongSummary.objects.bulk_create([summaries[key] for key in sorted(summaries)], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boogie_api", "0039_remove_sitestatistics_recent_players"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_song_summaries, migrations.RunPython.noop),
+    ]
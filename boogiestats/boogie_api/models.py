@@ -1,23 +1,39 @@
+import json
 import math
 from hashlib import sha256
-from typing import Optional
+from typing import Iterable, Optional
 
 import requests
 from django.contrib.auth.models import User
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinLengthValidator, RegexValidator
-from django.db import models
-from django.db.models import Count
+from django.db import models, transaction
+from django.db.models import Count, F, Q
 from django.db.models.signals import m2m_changed
 from django.utils.functional import cached_property
 from django.utils.safestring import mark_safe
 from django.utils.timezone import now
 from redis import Redis
 
+from boogiestats.boogie_api.chart_db import get_chart_info, get_chart_infos
 from boogiestats.boogie_api.choices import GSIntegration, GSStatus, LeaderboardSource
-from boogiestats.boogie_api.managers import PlayerManager, ScoreManager
-from boogiestats.boogie_api.utils import get_chart_info, get_display_name, get_redis
+from boogiestats.boogie_api.managers import (
+    DAILY_ACTIVITY_JUDGMENTS,
+    PlayerDailyActivityManager,
+    PlayerManager,
+    PlayerSongSummaryManager,
+    ScoreManager,
+)
+from boogiestats.boogie_api.page_cache import (
+    FEED_TAG,
+    invalidate_pages,
+    player_tag,
+    score_tag,
+)
+from boogiestats.boogie_api.player_search import index_player
+from boogiestats.boogie_api.search import index_song_if_missing
+from boogiestats.boogie_api.utils import get_display_name, get_redis
 from boogiestats.boogiestats.exceptions import Managed404Error
 
 MAX_LEADERBOARD_RIVALS = 3
@@ -41,6 +57,59 @@ def make_leaderboard_entry(rank, score, score_type, is_rival=False, is_self=Fals
     }
 
 
+EX_WEIGHTS = {
+    "fa+": 3.5,
+    "fantastics": 3,
+    "excellents": 2,
+    "greats": 1,
+    "held": 1,
+    "mine": -1,
+}
+EX_JUDGMENT_FIELDS = (
+    "total_steps",
+    "total_holds",
+    "total_rolls",
+    "fantastics_plus",
+    "fantastics",
+    "excellents",
+    "greats",
+    "rolls_held",
+    "holds_held",
+    "mines_hit",
+)
+
+
+def calculate_ex_score(
+    *,
+    total_steps,
+    total_holds,
+    total_rolls,
+    fantastics_plus,
+    fantastics,
+    excellents,
+    greats,
+    rolls_held,
+    holds_held,
+    mines_hit,
+) -> int:
+    """EX score from raw judgment counts; shared by `Score.calculate_ex` and the bulk recomputation."""
+    total_possible = total_steps * EX_WEIGHTS["fa+"] + (total_holds + total_rolls) * EX_WEIGHTS["held"]
+    points = (
+        fantastics_plus * EX_WEIGHTS["fa+"]
+        + fantastics * EX_WEIGHTS["fantastics"]
+        + excellents * EX_WEIGHTS["excellents"]
+        + greats * EX_WEIGHTS["greats"]
+        + rolls_held * EX_WEIGHTS["held"]
+        + holds_held * EX_WEIGHTS["held"]
+        + mines_hit * EX_WEIGHTS["mine"]
+    )
+
+    try:
+        return int(max(0, math.floor(points / total_possible * 10_000)))
+    except ZeroDivisionError:
+        return 0
+
+
 class Song(models.Model):
     hash = models.CharField(max_length=16, primary_key=True, db_index=True)  # V3 GrooveStats hash 16 a-f0-9
     gs_ranked = models.BooleanField(default=False)
@@ -55,7 +124,13 @@ class Song(models.Model):
 
     def save(self, *args, **kwargs):
         self.full_clean()
-        return super().save(*args, **kwargs)
+        adding = self._state.adding
+        result = super().save(*args, **kwargs)
+
+        if adding:
+            SiteStatistics.record_song()
+
+        return result
 
     def get_leaderboard(self, num_entries, score_type, player=None):
         num_entries = min(MAX_LEADERBOARD_ENTRIES, num_entries)
@@ -75,13 +150,9 @@ class Song(models.Model):
 
         remaining_scores = max(0, num_entries - len(scores))
 
-        top_scores = (
-            self.scores.filter(**{f"is_{score_type}_top": True})
-            .exclude(pk__in=used_score_pks)
-            .order_by(f"-{score_type}_score", "submission_date", "id")[:remaining_scores]
-        )
+        top_scores = self._top_scores(score_type).exclude(**{f"{score_type}_top_score__in": used_score_pks})
 
-        for score in top_scores:
+        for score in top_scores[:remaining_scores]:
             rank = Score.rank(score, score_type)
             scores.append((score, make_leaderboard_entry(rank, score, score_type)))
 
@@ -92,20 +163,26 @@ class Song(models.Model):
 
         return [x[1] for x in sorted_scores]
 
+    def _top_scores(self, score_type) -> "TopScores":
+        """Top scores of players on this song, best first and earlier first in case of ties."""
+        top_score = f"{score_type}_top_score"
+        return TopScores(
+            self.player_summaries.filter(**{f"{top_score}__isnull": False})
+            .order_by(f"-best_{score_type}_score", f"{top_score}__submission_date", top_score)
+            .select_related(f"{top_score}__player"),
+            top_score,
+        )
+
     def get_highscore(self, player, score_type) -> (int, "Score"):
-        try:
-            highscore = self.scores.get(player=player, **{f"is_{score_type}_top": True})
-        except Score.DoesNotExist:
+        summary = self.player_summaries.filter(player=player).select_related(f"{score_type}_top_score").first()
+        highscore = summary and getattr(summary, f"{score_type}_top_score")
+        if highscore is None:
             return None, None
 
         return Score.rank(highscore, score_type), highscore
 
     def get_rival_highscores(self, player, score_type) -> [(int, "Score")]:
-        scores = (
-            self.scores.filter(**{f"is_{score_type}_top": True, "player__in": player.rivals.all()})
-            .order_by(f"-{score_type}_score", "submission_date", "id")[:MAX_LEADERBOARD_RIVALS]
-            .all()
-        )
+        scores = self._top_scores(score_type).filter(player__in=player.rivals.all())[:MAX_LEADERBOARD_RIVALS]
 
         return [(Score.rank(score, score_type), score) for score in scores]
 
@@ -113,6 +190,14 @@ class Song(models.Model):
     def chart_info(self):
         return get_chart_info(self.hash)
 
+    @staticmethod
+    def prefetch_chart_infos(songs: Iterable["Song"]):
+        """Loads chart info of all given songs in a single batch instead of one song at a time."""
+        songs = [song for song in songs if "chart_info" not in song.__dict__]
+        chart_infos = get_chart_infos(song.hash for song in songs)
+        for song in songs:
+            song.chart_info = chart_infos[song.hash]
+
     @property
     def display_name(self):
         final_name = self.hash
@@ -134,43 +219,67 @@ class Song(models.Model):
             self.gs_ranked = True
             self.save()
 
+    SEARCH_CACHE_FIELDS = (
+        "title",
+        "titletranslit",
+        "subtitle",
+        "subtitletranslit",
+        "artist",
+        "artisttranslit",
+        "diff",
+        "diff_number",
+        "steps_type",
+        "pack_name",
+    )
+
+    def search_cache_mapping(self, chart_info: dict) -> dict:
+        """
+        Fields of a `song:*` search cache hash, with a fingerprint of their values to detect changes.
+
+        Besides the searchable chart info, it holds everything shown on search results pages, so they don't have to hit
+        the database. Highscores should be loaded together with their players.
+        """
+        mapping = {k: v for k, v in chart_info.items() if k in Song.SEARCH_CACHE_FIELDS}
+        mapping |= {
+            "num_plays": self.number_of_scores,
+            "num_players": self.number_of_players,
+            "gs_ranked": int(self.gs_ranked),
+        }
+        for score_type in ("itg", "ex"):
+            highscore = getattr(self, f"{score_type}_highscore")
+            mapping |= {
+                f"{score_type}_highscore_id": highscore.id if highscore else "",
+                f"{score_type}_highscore": getattr(highscore, f"{score_type}_score") if highscore else "",
+                f"{score_type}_highscore_player_id": highscore.player_id if highscore else "",
+                f"{score_type}_highscore_player_name": highscore.player.name if highscore else "",
+            }
+        mapping["fingerprint"] = sha256(json.dumps(mapping, sort_keys=True).encode()).hexdigest()[:16]
+
+        return mapping
+
     def update_search_cache(self, redis_connection: Optional[Redis] = None) -> bool:
         """Updates song search cache when both redis and song metadata ara available."""
+        index_song_if_missing(self.hash)
 
         r = redis_connection or get_redis()
         if not r:
             return False
 
         if chart_info := self.chart_info:
-            chart_info["num_plays"] = self.number_of_scores
-
-            fields = (
-                "title",
-                "titletranslit",
-                "subtitle",
-                "subtitletranslit",
-                "artist",
-                "artisttranslit",
-                "diff",
-                "diff_number",
-                "steps_type",
-                "pack_name",
-                "num_plays",
-            )
-
-            r.hset(f"song:{self.hash}", mapping={k: v for k, v in chart_info.items() if k in fields})
+            r.hset(f"song:{self.hash}", mapping=self.search_cache_mapping(chart_info))
             return True
 
         return False
 
     def update_number_of_players_and_scores(self):
+        # archived scores are superseded attempts, so their players always have a current score for the song as well
         annotated_song = (
             Song.objects.filter(hash=self.hash)
             .annotate(num_scores=Count("scores"), num_players=Count("scores__player", distinct=True))
             .first()
         )
         self.number_of_players = annotated_song.num_players
-        self.number_of_scores = annotated_song.num_scores
+        self.number_of_scores = annotated_song.num_scores + self.archived_scores.count()
 
     def __str__(self):
         return f"{self.hash} - {self.display_name}"
@@ -273,9 +382,37 @@ class Player(models.Model):
         blank=True,
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_search_fields = instance.__dict__.get("name"), instance.__dict__.get("machine_tag")
+        return instance
+
     def save(self, *args, **kwargs):
         self.full_clean()
-        return super().save(*args, **kwargs)
+        adding = self._state.adding
+        result = super().save(*args, **kwargs)
+
+        if adding:
+            SiteStatistics.record_player()
+        invalidate_pages(player_tag(self.id), FEED_TAG)
+
+        loaded_search_fields = getattr(self, "_loaded_search_fields", None)
+        if loaded_search_fields != (self.name, self.machine_tag):
+            self._loaded_search_fields = self.name, self.machine_tag
+            index_player(self.id, self.name, self.machine_tag)
+            if loaded_search_fields is not None and loaded_search_fields[0] != self.name:
+                self.update_highscores_search_cache()
+
+        return result
+
+    def update_highscores_search_cache(self):
+        """Search cache holds names of highscore holders, it has to be updated when they change."""
+        songs = Song.objects.filter(Q(itg_highscore__player=self) | Q(ex_highscore__player=self)).select_related(
+            "itg_highscore__player", "ex_highscore__player"
+        )
+        for song in songs:
+            song.update_search_cache()
 
     @staticmethod
     def get_by_gs_api_key(gs_api_key) -> Optional["Player"]:
@@ -349,10 +486,77 @@ def validate_rivals(sender, **kwargs):
         raise ValidationError("You can't be your own rival")
 
 
+def invalidate_rivals_pages(sender, instance, action, pk_set, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_pages(player_tag(instance.id), *(player_tag(player_id) for player_id in pk_set or ()))
+
+
 m2m_changed.connect(validate_rivals, sender=Player.rivals.through)
+m2m_changed.connect(invalidate_rivals_pages, sender=Player.rivals.through)
+
+
+JUDGMENT_FIELDS = (
+    "misses",
+    "way_offs",
+    "decents",
+    "greats",
+    "excellents",
+    "fantastics",
+    "fantastics_plus",
+    "total_steps",
+    "total_rolls",
+    "total_holds",
+    "total_mines",
+    "rolls_held",
+    "holds_held",
+    "mines_hit",
+)
+
+
+def _judgment_accessor(name):
+    def getter(score):
+        if not score.has_judgments:
+            return 0
+
+        try:
+            return getattr(score.judgment_counts, name)
+        except ScoreJudgments.DoesNotExist:
+            return 0
+
+    def setter(score, value):
+        setattr(score._get_judgment_counts(create=True), name, value)
+
+    return property(getter, setter)
+
+
+class GSSubmissionMixin:
+    """GS submission helpers shared by current and archived scores."""
 
+    @property
+    def gs_submission_link(self):
+        if self.has_judgments:
+            gs_qr_prefix = "https://groovestats.com/QR/"
+            payload = (
+                f"{self.song_id}/"
+                f"T{self.total_steps:x}"
+                f"G{self.fantastics_plus:x}H{self.fantastics:x}"
+                f"I{self.excellents:x}J{self.greats:x}"
+                f"K{self.decents:x}L{self.way_offs:x}"
+                f"M{self.misses:x}"
+                f"H{self.holds_held:x}T{self.total_holds:x}"
+                f"R{self.rolls_held:x}T{self.total_rolls:x}"
+                f"M{self.mines_hit:x}T{self.total_mines:x}/"
+                f"F0R{self.rate:x}C{self.used_cmod:x}V3"
+            ).upper()
+            return gs_qr_prefix + payload
+        return f"https://groovestats.com/qr.php?h={self.song_id}&s={self.itg_score}&f=0&r={self.rate}&v=3"
 
-class Score(models.Model):
+    @property
+    def needs_gs_submission(self):
+        return self.gs_status != GSStatus.OK
+
+
+class Score(GSSubmissionMixin, models.Model):
     objects = ScoreManager()
     MAX_COMMENT_LENGTH = 200
     MAX_SCORE = 10_000
@@ -373,6 +577,82 @@ class Score(models.Model):
     rate = models.PositiveIntegerField(default=100, validators=[MaxValueValidator(MAX_RATE)])
 
     has_judgments = models.BooleanField(default=False)
+    # judgments are stored in a side table to keep score rows narrow for leaderboards and listings,
+    # these accessors make them transparent for templates and `calculate_ex`
+    misses = _judgment_accessor("misses")
+    way_offs = _judgment_accessor("way_offs")
+    decents = _judgment_accessor("decents")
+    greats = _judgment_accessor("greats")
+    excellents = _judgment_accessor("excellents")
+    fantastics = _judgment_accessor("fantastics")
+    fantastics_plus = _judgment_accessor("fantastics_plus")
+    total_steps = _judgment_accessor("total_steps")
+    total_rolls = _judgment_accessor("total_rolls")
+    total_holds = _judgment_accessor("total_holds")
+    total_mines = _judgment_accessor("total_mines")
+    rolls_held = _judgment_accessor("rolls_held")
+    holds_held = _judgment_accessor("holds_held")
+    mines_hit = _judgment_accessor("mines_hit")
+
+    def save(self, *args, **kwargs):
+        self.full_clean()
+        judgment_counts = self._get_judgment_counts(create=False) if self.has_judgments else None
+        if judgment_counts is not None:
+            judgment_counts.full_clean(exclude=["score"], validate_unique=False)
+
+        adding = self._state.adding
+        result = super().save(*args, **kwargs)
+
+        if judgment_counts is not None:
+            judgment_counts.score = self  # refresh the key, it wasn't known before the first save
+            judgment_counts.save()
+
+        if adding:
+            SiteStatistics.record_score()
+        else:  # new scores are announced by `ScoreManager.create`
+            invalidate_pages(score_tag(self.id), player_tag(self.player_id))
+
+        return result
+
+    def _get_judgment_counts(self, create):
+        """Returns judgment counts that have already been loaded or assigned, or creates them if requested."""
+        if not create and not Score.judgment_counts.is_cached(self):
+            return None
+
+        try:
+            return self.judgment_counts
+        except ScoreJudgments.DoesNotExist:
+            if not create:
+                return None
+
+        self.judgment_counts = ScoreJudgments(score=self)
+        return self.judgment_counts
+
+    @classmethod
+    def rank(cls, score, score_type):
+        """Position of a top score on the leaderboard of its song, counted from players' summaries."""
+        best_score = f"best_{score_type}_score"
+        top_score = f"{score_type}_top_score"
+        value = getattr(score, f"{score_type}_score")
+        ahead = Q(**{f"{best_score}__gt": value}) | Q(**{f"{top_score}__submission_date__lt": score.submission_date})
+        ahead |= Q(**{f"{top_score}__submission_date": score.submission_date, f"{top_score}__lt": score.id})
+
+        return (
+            PlayerSongSummary.objects.filter(ahead, song_id=score.song_id, **{f"{best_score}__gte": value}).count() + 1
+        )
+
+    def calculate_ex(self) -> int:
+        if not self.has_judgments:
+            return 0
+
+        return calculate_ex_score(**{field: getattr(self, field) for field in EX_JUDGMENT_FIELDS})
+
+    def __str__(self):
+        return f"{self.id} - {self.submission_date} - {self.itg_score/100}% - {self.ex_score/100}% EX - {self.song.display_name} - {self.player}"
+
+
+class ScoreJudgments(models.Model):
+    score = models.OneToOneField(Score, primary_key=True, on_delete=models.CASCADE, related_name="judgment_counts")
     misses = models.PositiveIntegerField(default=0)
     way_offs = models.PositiveIntegerField(default=0)
     decents = models.PositiveIntegerField(default=0)
@@ -388,74 +668,317 @@ class Score(models.Model):
     holds_held = models.PositiveIntegerField(default=0)
     mines_hit = models.PositiveIntegerField(default=0)
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        return super().save(*args, **kwargs)
+    class Meta:
+        verbose_name_plural = "score judgments"
+
+    def __str__(self):
+        return f"Judgments of score {self.score_id}"
+
+
+class ArchivedScore(GSSubmissionMixin, models.Model):
+    """
+    Superseded (non-top) scores moved out of `Score` by `archive_scores`.
+
+    Archived rows are self-contained and never modified: they keep the ids of the original scores and store judgments
+    inline.
+    They're never top scores and they never need GS submission, so they only matter for history and statistics.
+    """
+
+    is_itg_top = False
+    is_ex_top = False
+
+    song = models.ForeignKey(Song, on_delete=models.CASCADE, related_name="archived_scores")
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="archived_scores")
+    submission_date = models.DateTimeField(db_index=True)
+    submission_day = models.DateField()
+    itg_score = models.PositiveIntegerField()
+    ex_score = models.PositiveIntegerField()
+    gs_status = models.IntegerField(choices=GSStatus.choices)
+    comment = models.CharField(max_length=Score.MAX_COMMENT_LENGTH, blank=True)
+    used_cmod = models.BooleanField()
+    rate = models.PositiveIntegerField()
+
+    has_judgments = models.BooleanField()
+    misses = models.PositiveIntegerField(default=0)
+    way_offs = models.PositiveIntegerField(default=0)
+    decents = models.PositiveIntegerField(default=0)
+    greats = models.PositiveIntegerField(default=0)
+    excellents = models.PositiveIntegerField(default=0)
+    fantastics = models.PositiveIntegerField(default=0)
+    fantastics_plus = models.PositiveIntegerField(default=0)
+    total_steps = models.PositiveIntegerField(default=0)
+    total_rolls = models.PositiveIntegerField(default=0)
+    total_holds = models.PositiveIntegerField(default=0)
+    total_mines = models.PositiveIntegerField(default=0)
+    rolls_held = models.PositiveIntegerField(default=0)
+    holds_held = models.PositiveIntegerField(default=0)
+    mines_hit = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["player", "submission_day"])]
 
     @classmethod
-    def rank(cls, score, score_type):
-        return (
-            list(
-                cls.objects.filter(
-                    song=score.song,
-                    **{f"is_{score_type}_top": True, f"{score_type}_score__gte": getattr(score, f"{score_type}_score")},
-                )
-                .order_by(f"-{score_type}_score", "submission_date", "id")
-                .values_list("id", flat=True)
-            ).index(score.id)
-            + 1
+    def from_score(cls, score: Score) -> "ArchivedScore":
+        return cls(
+            id=score.id,
+            song_id=score.song_id,
+            player_id=score.player_id,
+            submission_date=score.submission_date,
+            submission_day=score.submission_day,
+            itg_score=score.itg_score,
+            ex_score=score.ex_score,
+            gs_status=score.gs_status,
+            comment=score.comment,
+            used_cmod=score.used_cmod,
+            rate=score.rate,
+            has_judgments=score.has_judgments,
+            **{name: getattr(score, name) for name in JUDGMENT_FIELDS},
         )
 
-    def calculate_ex(self) -> int:
-        if not self.has_judgments:
-            return 0
+    def __str__(self):
+        return f"{self.id} - {self.submission_date} - {self.itg_score/100}% - {self.ex_score/100}% EX (archived)"
 
-        weights = {
-            "fa+": 3.5,
-            "fantastics": 3,
-            "excellents": 2,
-            "greats": 1,
-            "held": 1,
-            "mine": -1,
-        }
-        total_possible = self.total_steps * weights["fa+"] + (self.total_holds + self.total_rolls) * weights["held"]
-        points = (
-            self.fantastics_plus * weights["fa+"]
-            + self.fantastics * weights["fantastics"]
-            + self.excellents * weights["excellents"]
-            + self.greats * weights["greats"]
-            + self.rolls_held * weights["held"]
-            + self.holds_held * weights["held"]
-            + self.mines_hit * weights["mine"]
+
+class ChartMetadata(models.Model):
+    """
+    Copy of the external chart database (see `BS_CHART_DB_PATH`) that can be used for sorting and filtering in SQL.
+
+    It's kept up to date by `ingest_chart_db`. Charts don't need to be played to have their metadata stored,
+    hence there's no constraint on the related song.
+    """
+
+    song = models.OneToOneField(
+        Song,
+        primary_key=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="metadata",
+    )
+    sort_title = models.TextField(db_index=True)  # lowercase title, transliterated when available
+    sort_artist = models.TextField()  # lowercase artist, transliterated when available
+    pack_name = models.TextField(db_index=True)
+    steps_type = models.CharField(max_length=32)
+    diff = models.CharField(max_length=32)
+    diff_number = models.PositiveSmallIntegerField(db_index=True)
+    info = models.JSONField()  # the whole chart info, as returned by `get_chart_info`
+    fingerprint = models.CharField(max_length=64)  # identifies the version of a chart file that has been ingested
+
+    class Meta:
+        verbose_name_plural = "chart metadata"
+
+    @classmethod
+    def from_chart_info(cls, chart_info: dict, fingerprint: str) -> "ChartMetadata":
+        return cls(
+            song_id=chart_info["hash"],
+            sort_title=(chart_info["titletranslit"] or chart_info["title"]).lower(),
+            sort_artist=(chart_info["artisttranslit"] or chart_info["artist"]).lower(),
+            pack_name=chart_info["pack_name"],
+            steps_type=chart_info["steps_type"],
+            diff=chart_info["diff"],
+            diff_number=int(chart_info["diff_number"]),
+            info=chart_info,
+            fingerprint=fingerprint,
         )
 
+    def __str__(self):
+        return f"{self.song_id} - {get_display_name(self.info)}"
+
+
+class PackSummary(models.Model):
+    """Contents of a pack page precomputed by `ingest_chart_db`: songs of a pack, sorted, with their charts grouped."""
+
+    name = models.CharField(max_length=255, primary_key=True)
+    # [{"title": ..., "artist": ..., "diffs_split": {"Singles": [{"hash": ..., "diff": ..., ...}, ...], ...}}, ...]
+    songs = models.JSONField()
+    fingerprint = models.CharField(max_length=64)  # identifies the version of a pack file that has been ingested
+
+    class Meta:
+        verbose_name_plural = "pack summaries"
+
+    def __str__(self):
+        return self.name
+
+
+class SiteStatistics(models.Model):
+    """
+    Totals shown on the index page, kept in a single row that's updated as songs, players and scores are created, so
+    that the page doesn't count whole tables. Objects deleted in the admin aren't tracked, `recompute_site_statistics`
+    fixes such drift.
+    """
+
+    SINGLETON_ID = 1
+    RECENT_ACTIVITY_SIZE = 5
+
+    id = models.PositiveSmallIntegerField(primary_key=True, default=SINGLETON_ID, editable=False)
+    num_songs = models.PositiveBigIntegerField(default=0)
+    num_scores = models.PositiveBigIntegerField(default=0)  # both current and archived, archiving doesn't change it
+    num_players = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "site statistics"
+
+    @classmethod
+    def get(cls) -> "SiteStatistics":
         try:
-            return int(max(0, math.floor(points / total_possible * 10_000)))
-        except ZeroDivisionError:
-            return 0
+            return cls.objects.get(pk=cls.SINGLETON_ID)
+        except cls.DoesNotExist:
+            return cls.recompute()
+
+    @classmethod
+    def recompute(cls) -> "SiteStatistics":
+        """Counts everything from scratch, it's slow on large databases."""
+        statistics, _ = cls.objects.update_or_create(
+            pk=cls.SINGLETON_ID,
+            defaults={
+                "num_songs": Song.objects.count(),
+                "num_scores": Score.objects.count() + ArchivedScore.objects.count(),
+                "num_players": Player.objects.count(),
+            },
+        )
+        return statistics
+
+    @classmethod
+    def record_song(cls):
+        cls._update(num_songs=F("num_songs") + 1)
+
+    @classmethod
+    def record_player(cls):
+        cls._update(num_players=F("num_players") + 1)
+
+    @classmethod
+    def record_score(cls):
+        """
+        Counts a new score with a single `UPDATE` once its transaction is committed, so submissions don't hold a lock
+        of the shared row. Failures are only logged, they mustn't make the already committed submission retried.
+        """
+        transaction.on_commit(lambda: cls._update(num_scores=F("num_scores") + 1), robust=True)
+
+    @classmethod
+    def recent_players(cls):
+        """Latest submitters, most recent first, found through the index of `Player.latest_score`."""
+        return Player.objects.filter(latest_score__isnull=False).order_by("-latest_score_id")[
+            : cls.RECENT_ACTIVITY_SIZE
+        ]
+
+    @classmethod
+    def _update(cls, **fields):
+        if not cls.objects.filter(pk=cls.SINGLETON_ID).update(**fields):
+            cls.recompute()  # the object that's just been created is counted as well
 
     def __str__(self):
-        return f"{self.id} - {self.submission_date} - {self.itg_score/100}% - {self.ex_score/100}% EX - {self.song.display_name} - {self.player}"
+        return f"{self.num_songs} songs, {self.num_scores} scores, {self.num_players} players"
+
+
+class PlayerDailyActivity(models.Model):
+    """
+    Rollup of a player's scores submitted on a day, both current and archived ones, for calendars and day views.
+
+    Rows are updated in the transaction that creates a score, `backfill_daily_activity` builds them from scratch.
+    """
+
+    objects = PlayerDailyActivityManager()
+
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="daily_activity")
+    day = models.DateField()
+    plays = models.PositiveIntegerField(default=0)
+    charts_played = models.PositiveIntegerField(default=0)
+    # stars of the top scores submitted on the day, like in `Player`
+    one_star = models.PositiveIntegerField(default=0)
+    two_stars = models.PositiveIntegerField(default=0)
+    three_stars = models.PositiveIntegerField(default=0)
+    four_stars = models.PositiveIntegerField(default=0)
+    five_stars = models.PositiveIntegerField(default=0)
+    fantastics_plus = models.PositiveBigIntegerField(default=0)
+    fantastics = models.PositiveBigIntegerField(default=0)
+    excellents = models.PositiveBigIntegerField(default=0)
+    greats = models.PositiveBigIntegerField(default=0)
+    decents = models.PositiveBigIntegerField(default=0)
+    way_offs = models.PositiveBigIntegerField(default=0)
+    misses = models.PositiveBigIntegerField(default=0)
+    first_submission = models.DateTimeField()
+    last_submission = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = "player daily activity"
+        constraints = [models.UniqueConstraint(fields=["player", "day"], name="unique_player_day")]
 
     @property
-    def gs_submission_link(self):
-        if self.has_judgments:
-            gs_qr_prefix = "https://groovestats.com/QR/"
-            payload = (
-                f"{self.song_id}/"
-                f"T{self.total_steps:x}"
-                f"G{self.fantastics_plus:x}H{self.fantastics:x}"
-                f"I{self.excellents:x}J{self.greats:x}"
-                f"K{self.decents:x}L{self.way_offs:x}"
-                f"M{self.misses:x}"
-                f"H{self.holds_held:x}T{self.total_holds:x}"
-                f"R{self.rolls_held:x}T{self.total_rolls:x}"
-                f"M{self.mines_hit:x}T{self.total_mines:x}/"
-                f"F0R{self.rate:x}C{self.used_cmod:x}V3"
-            ).upper()
-            return gs_qr_prefix + payload
-        return f"https://groovestats.com/qr.php?h={self.song_id}&s={self.itg_score}&f=0&r={self.rate}&v=3"
+    def total_steps(self):
+        return sum(getattr(self, name) for name in DAILY_ACTIVITY_JUDGMENTS)
 
     @property
-    def needs_gs_submission(self):
-        return self.gs_status != GSStatus.OK
+    def steps_hit(self):
+        return self.total_steps - self.misses
+
+    def __str__(self):
+        return f"{self.player_id} - {self.day} - {self.plays} plays"
+
+
+class WrappedSnapshot(models.Model):
+    """Summary of a player's closed year computed by `boogie_api.wrapped`, it's not updated when scores are modified."""
+
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="wrapped_snapshots")
+    year = models.PositiveSmallIntegerField()
+    data = models.JSONField()
+    generated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["player", "year"], name="unique_player_year")]
+
+    def __str__(self):
+        return f"{self.player_id} - {self.year}"
+
+
+class PlayerSongSummary(models.Model):
+    """
+    Player's plays of a song, current and archived ones, and their top scores, for leaderboards and player pages.
+
+    Rows are updated in the transaction that creates a score, `backfill_song_summaries` builds them from scratch.
+    """
+
+    objects = PlayerSongSummaryManager()
+
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="song_summaries")
+    song = models.ForeignKey(Song, on_delete=models.CASCADE, related_name="player_summaries")
+    num_plays = models.PositiveIntegerField(default=0)
+    first_played = models.DateTimeField()
+    last_played = models.DateTimeField()
+    best_itg_score = models.PositiveIntegerField(default=0)
+    best_ex_score = models.PositiveIntegerField(default=0)
+    itg_top_score = models.OneToOneField(
+        Score, null=True, blank=True, on_delete=models.SET_NULL, related_name="itg_top_summary"
+    )
+    ex_top_score = models.OneToOneField(
+        Score, null=True, blank=True, on_delete=models.SET_NULL, related_name="ex_top_summary"
+    )
+
+    class Meta:
+        verbose_name_plural = "player song summaries"
+        constraints = [models.UniqueConstraint(fields=["player", "song"], name="unique_player_song")]
+        indexes = [
+            models.Index(fields=["player", "-num_plays", "song"]),
+            models.Index(fields=["player", "-best_itg_score"]),
+            models.Index(fields=["player", "-best_ex_score"]),
+            models.Index(fields=["song", "-best_itg_score"]),
+            models.Index(fields=["song", "-best_ex_score"]),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id} - {self.song_id} - {self.num_plays} plays"
+
+
+class TopScores:
+    """Lazy, sliceable sequence of top scores backed by a queryset of `PlayerSongSummary`."""
+
+    def __init__(self, summaries, top_score_field):
+        self.summaries = summaries
+        self.top_score_field = top_score_field
+
+    def filter(self, *args, **kwargs) -> "TopScores":
+        return TopScores(self.summaries.filter(*args, **kwargs), self.top_score_field)
+
+    def exclude(self, *args, **kwargs) -> "TopScores":
+        return TopScores(self.summaries.exclude(*args, **kwargs), self.top_score_field)
+
+    def __getitem__(self, key):
+        return [getattr(summary, self.top_score_field) for summary in self.summaries[key]]
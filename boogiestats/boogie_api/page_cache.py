@@ -0,0 +1,118 @@
+"""
+Cache of whole pages for anonymous visitors, invalidated by tags of the objects that the pages show.
+
+Every tag has a version stored in the cache and keys of cached pages include versions of their tags, so invalidating
+a tag, e.g. when a player submits a score, just bumps its version and orphaned pages expire on their own. Invalidations
+reach other processes only through a shared cache backend, with the default per-process cache, pages of other processes
+stay stale for up to `BS_PAGE_CACHE_SECONDS`.
+"""
+
+import hashlib
+import time
+from http.client import OK
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+
+from boogiestats.boogie_api.metrics import PAGE_CACHE_REQUESTS
+
+FEED_TAG = "feed"  # lists of recent scores, players and songs
+LOCK_TIMEOUT_SECONDS = 10  # in case rendering fails and the lock is never released
+WAIT_FOR_RENDER_SECONDS = 2.0
+POLL_INTERVAL_SECONDS = 0.05
+
+
+def player_tag(player_id: int) -> str:
+    return f"player:{player_id}"
+
+
+def song_tag(song_hash: str) -> str:
+    return f"song:{song_hash}"
+
+
+def score_tag(score_id: int) -> str:
+    return f"score:{score_id}"
+
+
+def _tag_key(tag: str) -> str:
+    return f"page-tag:{hashlib.sha256(tag.encode()).hexdigest()}"  # song hashes aren't guaranteed to be key-safe
+
+
+def invalidate_pages(*tags: str):
+    """Invalidates cached pages with any of the given tags once the current transaction is committed."""
+    transaction.on_commit(lambda: cache.set_many({_tag_key(tag): time.time_ns() for tag in tags}, timeout=None))
+
+
+def _tag_versions(tags: list[str]) -> list:
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    if missing := [key for key in keys if key not in versions]:  # never invalidated or evicted, start a new version
+        for key in missing:
+            cache.add(key, time.time_ns(), timeout=None)
+        versions.update(cache.get_many(missing))
+
+    return [versions.get(key) for key in keys]
+
+
+def _page_key(request: HttpRequest, tags: list[str]) -> str:
+    cookies = (request.COOKIES.get("bs_leaderboard"), request.COOKIES.get("bs_theme"))  # both change the markup
+    identity = (request.get_full_path(), cookies, tags, _tag_versions(tags))
+    return f"page:{request.resolver_match.view_name}:{hashlib.sha256(repr(identity).encode()).hexdigest()}"
+
+
+def _wait_for_page(key: str):
+    deadline = time.monotonic() + WAIT_FOR_RENDER_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL_SECONDS)
+        if (response := cache.get(key)) is not None:
+            return response
+
+    return None
+
+
+def cached_page(request: HttpRequest, tags: list[str], get_response: Callable[[], HttpResponse]) -> HttpResponse:
+    """
+    Cached page or the response of `get_response()`, which is cached once it's rendered.
+
+    Only one request renders a missing page at a time, concurrent ones wait for it for a while instead of rendering
+    it too.
+    """
+    view_name = request.resolver_match.view_name
+    key = _page_key(request, tags)
+    lock_key = f"{key}:lock"
+    locked = False
+
+    if (response := cache.get(key)) is None:
+        locked = cache.add(lock_key, True, LOCK_TIMEOUT_SECONDS)
+        if not locked:
+            response = _wait_for_page(key)
+
+    if response is not None:
+        PAGE_CACHE_REQUESTS.labels(view_name, "hit").inc()
+        return get_conditional_response(request, etag=response.get("ETag"), response=response)
+
+    PAGE_CACHE_REQUESTS.labels(view_name, "miss").inc()
+    response = get_response()
+    if locked:
+        _store_when_rendered(request, response, key, lock_key)
+
+    return response
+
+
+def _store_when_rendered(request, response, key, lock_key):
+    def store(rendered):
+        try:
+            csrf_token_used = request.META.get("CSRF_COOKIE_NEEDS_UPDATE")  # pages with tokens are personal
+            if rendered.status_code == OK and not rendered.cookies and not csrf_token_used:
+                cache.set(key, rendered, settings.BS_PAGE_CACHE_SECONDS)
+        finally:
+            cache.delete(lock_key)
+
+    if getattr(response, "is_rendered", True):
+        store(response)
+    else:
+        response.add_post_render_callback(store)
@@ -0,0 +1,85 @@
+"""Pagination of huge tables, e.g. scores in the admin, without exact `COUNT(*)` queries."""
+
+from typing import Optional
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connection
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(model) -> Optional[int]:
+    """
+    Number of rows of the model's table according to the statistics of the database, `None` if there are none.
+
+    SQLite gathers them in `sqlite_stat1` with `django-admin analyze_db` and PostgreSQL in `pg_class.reltuples`
+    with (auto)vacuum and `ANALYZE`.
+    """
+    table = model._meta.db_table
+    if connection.vendor == "sqlite":
+        query = "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1"
+    elif connection.vendor == "postgresql":
+        query = "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass"
+    else:
+        return None
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(query, [table])
+            row = cursor.fetchone()
+    except DatabaseError:  # e.g. `sqlite_stat1` doesn't exist before the first `ANALYZE`
+        return None
+
+    if row is None:
+        return None
+
+    estimate = int(str(row[0]).split()[0])  # the first number of `sqlite_stat1.stat` is the number of rows
+    return estimate if estimate >= 0 else None  # -1 means that the table hasn't been analyzed yet
+
+
+def estimated_query_count(queryset: QuerySet) -> Optional[int]:
+    """Number of rows of a queryset estimated by the query planner of PostgreSQL, `None` on other databases."""
+    if connection.vendor != "postgresql":
+        return None
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+    except DatabaseError:
+        return None
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that counts exactly only up to `BS_ESTIMATED_COUNT_THRESHOLD` rows.
+
+    Whole tables above the threshold are counted from the statistics of the database and filtered querysets from
+    estimates of the query planner, so the last pages can be off, but every row can still be reached. Databases
+    without such estimates, e.g. SQLite, count filtered querysets above the threshold exactly.
+    """
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+
+        threshold = settings.BS_ESTIMATED_COUNT_THRESHOLD
+        if not self.object_list.query.where:
+            estimate = estimated_row_count(self.object_list.model)
+            if estimate is not None and estimate > threshold:
+                return estimate
+
+        count = self.object_list.order_by()[: threshold + 1].count()
+        if count <= threshold:
+            return count
+
+        estimate = estimated_query_count(self.object_list)
+        if estimate is None:
+            return super().count
+
+        return max(estimate, count)
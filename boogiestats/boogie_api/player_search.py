@@ -0,0 +1,68 @@
+"""
+Player search by name and machine tag backed by SQLite FTS5 indexes, with `icontains` lookups on other databases.
+
+Rows of both indexes use ids of the players as their rowids. The trigram index matches substrings of at least three
+characters, shorter terms are matched against prefixes of words with the prefix index instead.
+"""
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+TRIGRAM_TABLE = "boogie_api_playersearch"
+PREFIX_TABLE = "boogie_api_playersearchprefix"
+SEARCHED_FIELDS = ("name", "machine_tag")
+MIN_TRIGRAM_TERM_LENGTH = 3
+
+
+def player_search_available() -> bool:
+    return connection.vendor == "sqlite"
+
+
+def player_search_q(term: str, fields: tuple[str, ...] = ("name",)) -> Q:
+    """Filter of players whose fields contain the given term, an empty term matches everyone."""
+    term = term.strip()
+    if not term:
+        return Q()
+
+    if not player_search_available():
+        return Q.create([(f"{field}__icontains", term) for field in fields], connector=Q.OR)
+
+    columns = "{" + " ".join(fields) + "}"
+    if len(term) >= MIN_TRIGRAM_TERM_LENGTH:
+        table, expression = TRIGRAM_TABLE, f"{columns} : {_phrase(term)}"
+    else:
+        table, expression = PREFIX_TABLE, f"{columns} : {_phrase(term)} *"
+
+    return Q(id__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [expression]))  # nosec: no user input
+
+
+def index_player(player_id: int, name: str, machine_tag: str):
+    """Adds a player to the search indexes or updates their entries."""
+    if not player_search_available():
+        return
+
+    with connection.cursor() as cursor:
+        for table in (TRIGRAM_TABLE, PREFIX_TABLE):
+            cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [player_id])  # nosec: no user input
+            cursor.execute(
+                f"INSERT INTO {table} (rowid, name, machine_tag) VALUES (%s, %s, %s)",  # nosec: no user input
+                [player_id, name, machine_tag],
+            )
+
+
+def rebuild_player_search_index():
+    """Rebuilds both search indexes from all players."""
+    if not player_search_available():
+        return
+
+    with connection.cursor() as cursor:
+        for table in (TRIGRAM_TABLE, PREFIX_TABLE):
+            cursor.execute(f"DELETE FROM {table}")  # nosec: no user input
+            cursor.execute(
+                f"INSERT INTO {table} (rowid, name, machine_tag) SELECT id, name, machine_tag FROM boogie_api_player"  # nosec
+            )
+
+
+def _phrase(text):
+    return '"' + text.replace('"', '""') + '"'
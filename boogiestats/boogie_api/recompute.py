@@ -0,0 +1,148 @@
+"""Bulk recomputation of derived score data, e.g. after changing EX weights."""
+
+import itertools
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Window
+from django.db.models.functions import Coalesce, RowNumber
+
+from boogiestats.boogie_api.models import (
+    EX_JUDGMENT_FIELDS,
+    ArchivedScore,
+    Player,
+    PlayerDailyActivity,
+    PlayerSongSummary,
+    Score,
+    Song,
+    calculate_ex_score,
+)
+from boogiestats.boogie_api.rivals import invalidate_rivals_comparisons
+
+DEFAULT_CHUNK_SIZE = 10_000
+DERIVE_CHUNK_SIZE = 500  # keeps `IN (...)` lists well below sqlite's variable limit
+
+
+@dataclass
+class RecomputeResult:
+    processed: int = 0
+    changed: int = 0
+    affected_songs: set = field(default_factory=set)
+    affected_players: set = field(default_factory=set)
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def recompute_ex_scores(chunk_size: int = DEFAULT_CHUNK_SIZE) -> RecomputeResult:
+    """
+    Recomputes `ex_score` of every score with judgments, current and archived, and writes back only the ones that
+    have changed.
+
+    Scores are streamed as plain tuples in primary key order, so no model instances are created for rows
+    that didn't change. Scores whose judgment counts haven't been moved to `ScoreJudgments` yet are skipped, there's
+    nothing to recompute them from. Returns the songs and players affected by changes of current scores so that their
+    derived data can be fixed with `rederive_ex_tops`, archived scores are never top ones.
+    """
+    result = RecomputeResult()
+    scores = Score.objects.filter(has_judgments=True, judgment_counts__isnull=False)
+    _recompute_ex_scores(scores, "judgment_counts__", chunk_size, result)
+    _recompute_ex_scores(ArchivedScore.objects.filter(has_judgments=True), "", chunk_size, result)
+
+    return result
+
+
+def _recompute_ex_scores(scores, judgments_prefix, chunk_size, result):
+    columns = ("id", "song_id", "player_id", "ex_score", *(f"{judgments_prefix}{name}" for name in EX_JUDGMENT_FIELDS))
+    last_id = 0
+
+    while rows := list(scores.filter(id__gt=last_id).order_by("id").values_list(*columns)[:chunk_size]):
+        changed = []
+        for score_id, song_id, player_id, ex_score, *judgments in rows:
+            new_ex_score = calculate_ex_score(**dict(zip(EX_JUDGMENT_FIELDS, judgments)))
+            if new_ex_score != ex_score:
+                changed.append(scores.model(id=score_id, ex_score=new_ex_score))
+                if scores.model is Score:
+                    result.affected_songs.add(song_id)
+                    result.affected_players.add(player_id)
+
+        if changed:
+            with transaction.atomic():
+                scores.model.objects.bulk_update(changed, ["ex_score"], batch_size=DERIVE_CHUNK_SIZE)
+
+        result.processed += len(rows)
+        result.changed += len(changed)
+        last_id = rows[-1][0]
+
+
+def _rederive_is_ex_top(song_hashes):
+    """Marks the best EX score of every (song, player) pair as the top one; earlier scores win ties."""
+    scores = Score.objects.filter(song_id__in=song_hashes)
+    top_ids = list(
+        scores.annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F("song_id"), F("player_id")],
+                order_by=[F("ex_score").desc(), F("submission_date").asc(), F("id").asc()],
+            )
+        )
+        .filter(position=1)
+        .values_list("id", flat=True)
+    )
+    scores.filter(is_ex_top=True).exclude(id__in=top_ids).update(is_ex_top=False)
+    Score.objects.filter(id__in=top_ids, is_ex_top=False).update(is_ex_top=True)
+
+
+def _rederive_ex_highscores(song_hashes):
+    highscore = Score.objects.filter(song=OuterRef("pk"), is_ex_top=True).order_by("-ex_score", "submission_date", "id")
+    Song.objects.filter(hash__in=song_hashes).update(ex_highscore=Subquery(highscore.values("id")[:1]))
+
+
+def _rederive_ex_summaries(song_hashes):
+    top_score = Score.objects.filter(song=OuterRef("song"), player=OuterRef("player"), is_ex_top=True)
+    PlayerSongSummary.objects.filter(song_id__in=song_hashes).update(
+        ex_top_score=Subquery(top_score.values("id")[:1]),
+        best_ex_score=Coalesce(Subquery(top_score.values("ex_score")[:1]), 0),
+    )
+
+
+def _rederive_daily_five_stars(player_ids):
+    quints = (
+        Score.objects.filter(player=OuterRef("player"), submission_day=OuterRef("day"), is_ex_top=True, ex_score=10_000)
+        .values("player")
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    PlayerDailyActivity.objects.filter(player_id__in=player_ids).update(five_stars=Coalesce(Subquery(quints), 0))
+
+
+def _rederive_five_stars(player_ids):
+    quints = (
+        Score.objects.filter(player=OuterRef("pk"))
+        .values("player")
+        .annotate(n=Count("id", filter=Q(is_ex_top=True, ex_score=10_000)))
+        .values("n")
+    )
+    Player.objects.filter(id__in=player_ids).update(five_stars=Coalesce(Subquery(quints), 0))
+
+
+def rederive_ex_tops(song_hashes, player_ids):
+    """
+    Re-derives `is_ex_top`, `Song.ex_highscore`, EX tops of players' song summaries and players' quint counts, also
+    per day, for the given songs and players. Cached rival comparisons are dropped as well.
+    """
+    for chunk in _chunked(sorted(song_hashes), DERIVE_CHUNK_SIZE):
+        with transaction.atomic():
+            _rederive_is_ex_top(chunk)
+            _rederive_ex_highscores(chunk)
+            _rederive_ex_summaries(chunk)
+
+    for chunk in _chunked(sorted(player_ids), DERIVE_CHUNK_SIZE):
+        with transaction.atomic():
+            _rederive_five_stars(chunk)
+            _rederive_daily_five_stars(chunk)
+
+    invalidate_rivals_comparisons()
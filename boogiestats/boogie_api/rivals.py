@@ -0,0 +1,114 @@
+"""
+Comparison of a player with many rivals at once, over top scores of charts they have in common.
+
+Top scores of all participants on charts played by the player are loaded in a single query and joined in memory.
+Comparisons are cached until any participant submits a new score or scores are changed in bulk, e.g. by `recompute_ex`.
+"""
+
+import time
+from dataclasses import dataclass, field
+from hashlib import sha256
+from typing import Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+
+from boogiestats.boogie_api.models import Player, Score
+
+GENERATION_KEY = "rivals-generation"
+
+
+@dataclass
+class ChartComparison:
+    song_id: str
+    scores: list[Optional[tuple[int, int]]]  # (score id, score) of every participant, `None` when not played
+    best: int  # index of the participant with the best score, the lowest index (the player first) wins ties
+    delta: int  # score of the player minus the best score of rivals
+
+
+@dataclass
+class HeadToHead:
+    """Results of a participant against another one on the charts they've both played."""
+
+    common_charts: int = 0
+    wins: int = 0
+    losses: int = 0
+    total_delta: int = 0
+
+    @property
+    def ties(self):
+        return self.common_charts - self.wins - self.losses
+
+    @property
+    def mean_delta(self) -> Optional[float]:
+        return self.total_delta / self.common_charts if self.common_charts else None
+
+
+@dataclass
+class RivalsComparison:
+    participant_ids: list[int]  # the player is the first one
+    score_type: str
+    charts: list[ChartComparison] = field(default_factory=list)  # biggest deficits of the player first
+    matrix: list[list[HeadToHead]] = field(default_factory=list)  # `matrix[i][j]` is `i` against `j`
+
+
+def compare_with_rivals(player: Player, rivals: Sequence[Player], score_type: str) -> RivalsComparison:
+    """Cached `compute_rivals_comparison`, scores can't change without a change of participants' latest scores."""
+    participants = [player, *rivals]
+    generation = cache.get_or_set(GENERATION_KEY, 0, timeout=None)
+    version = f"{generation}/" + ",".join(f"{p.id}:{p.latest_score_id}" for p in participants)
+    cache_key = f"rivals-{score_type}-{sha256(version.encode()).hexdigest()}"
+
+    if (comparison := cache.get(cache_key)) is None:
+        comparison = compute_rivals_comparison([p.id for p in participants], score_type)
+        cache.set(cache_key, comparison, settings.BS_RIVALS_COMPARISON_CACHE_SECONDS)
+
+    return comparison
+
+
+def invalidate_rivals_comparisons():
+    """Drops all cached comparisons, e.g. after scores have been changed without new submissions."""
+    cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def compute_rivals_comparison(participant_ids: list[int], score_type: str) -> RivalsComparison:
+    indexes = {participant_id: i for i, participant_id in enumerate(participant_ids)}
+    is_top = f"is_{score_type}_top"
+    played_by_player = Score.objects.filter(player_id=participant_ids[0], **{is_top: True}).values("song_id")
+    top_scores = (
+        Score.objects.filter(player_id__in=participant_ids, song_id__in=played_by_player, **{is_top: True})
+        .order_by()
+        .values_list("song_id", "player_id", "id", f"{score_type}_score")
+    )
+
+    charts = {}
+    for song_id, player_id, score_id, value in top_scores:
+        charts.setdefault(song_id, [None] * len(participant_ids))[indexes[player_id]] = (score_id, value)
+
+    comparison = RivalsComparison(participant_ids, score_type)
+    comparison.matrix = [[HeadToHead() for _ in participant_ids] for _ in participant_ids]
+    for song_id, scores in charts.items():
+        played = [(i, score[1]) for i, score in enumerate(scores) if score is not None]
+        if len(played) < 2:
+            continue
+
+        _add_head_to_head(comparison.matrix, played)
+        best = max(played, key=lambda x: (x[1], -x[0]))[0]
+        best_rival_score = max(value for i, value in played if i)
+        comparison.charts.append(ChartComparison(song_id, scores, best, scores[0][1] - best_rival_score))
+
+    comparison.charts.sort(key=lambda chart: (chart.delta, chart.song_id))
+    return comparison
+
+
+def _add_head_to_head(matrix, played):
+    for i, i_value in played:
+        for j, j_value in played:
+            if i == j:
+                continue
+
+            head_to_head = matrix[i][j]
+            head_to_head.common_charts += 1
+            head_to_head.wins += i_value > j_value
+            head_to_head.losses += i_value < j_value
+            head_to_head.total_delta += i_value - j_value
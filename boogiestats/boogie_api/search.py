@@ -0,0 +1,294 @@
+"""
+Song search backends, RediSearch when redis is configured and a built-in SQLite FTS5 index otherwise.
+
+Both of them understand queries in the format produced by `SearchView._process_query`: `%fuzzy%` terms, `'quoted'`
+terms, `-negated` terms and `@field:value` filters, e.g. `@pack_name:itl`, `@steps_type:{dance\\-double}` or
+`@diff_number:[7,7]`. Searches return the total number of results and `SearchResult`s of the requested page, which
+hold everything shown on search results pages, so no further database queries are needed to render them.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from django.db import connection
+from redis import Redis, ResponseError
+from redis.commands.search.query import Query
+
+from boogiestats.boogie_api.utils import get_display_name, get_redis
+
+SEARCH_TABLE = "boogie_api_songsearch"
+TEXT_FIELDS = ("title", "titletranslit", "subtitle", "subtitletranslit", "artist", "artisttranslit", "pack_name")
+TAG_FIELDS = ("diff", "steps_type")
+NUMERIC_FIELDS = {"diff_number": "CAST(f.diff_number AS INTEGER)", "num_plays": "s.number_of_scores"}
+MIN_INDEXED_TERM_LENGTH = 3  # trigram tokenizer can't match shorter terms with MATCH, LIKE is used for them instead
+INDEX_BATCH_SIZE = 500
+
+# sort option -> (index field, ascending), sorting happens in the index
+SORT_OPTIONS = {"plays": ("num_plays", False), "difficulty": ("diff_number", True), "title": ("title", True)}
+DEFAULT_SORT = "plays"
+SQLITE_SORT_EXPRESSIONS = {
+    "num_plays": "s.number_of_scores",
+    "diff_number": "CAST(f.diff_number AS INTEGER)",
+    "title": "f.title COLLATE NOCASE",
+}
+
+TOKEN_RE = re.compile(r"-?@\w+:(?:\[[^\]]*\]|\{[^}]*\}|\S+)|\S+")
+RANGE_RE = re.compile(r"^\[\s*(\(?)\s*([-+]?(?:inf|[\d.]+))\s*[,\s]\s*(\(?)\s*([-+]?(?:inf|[\d.]+))\s*\]$")
+
+# columns of the results page, named like search cache fields
+_HIGHSCORE_COLUMNS = ", ".join(
+    f"{t}h.id AS {t}_highscore_id, {t}h.{t}_score AS {t}_highscore, "
+    f"{t}p.id AS {t}_highscore_player_id, {t}p.name AS {t}_highscore_player_name"
+    for t in ("itg", "ex")
+)
+SQLITE_RESULTS_COLUMNS = f"""
+    s.hash, {", ".join(f"f.{field}" for field in TEXT_FIELDS + TAG_FIELDS)}, f.diff_number,
+    s.number_of_scores AS num_plays, s.number_of_players AS num_players, s.gs_ranked, {_HIGHSCORE_COLUMNS}
+"""
+SQLITE_HIGHSCORE_JOINS = " ".join(
+    f"LEFT JOIN boogie_api_score {t}h ON {t}h.id = s.{t}_highscore_id "
+    f"LEFT JOIN boogie_api_player {t}p ON {t}p.id = {t}h.player_id"
+    for t in ("itg", "ex")
+)
+
+# played songs with their ingested chart info, the same way as the index is populated by its migration
+_CHART_INFO_COLUMNS = ", ".join(f"json_extract(m.info, '$.{field}')" for field in TEXT_FIELDS + TAG_FIELDS)
+INDEXED_SONGS_SQL = f"""
+    INSERT INTO {SEARCH_TABLE} (hash, {", ".join(TEXT_FIELDS + TAG_FIELDS)}, diff_number)
+    SELECT s.hash, {_CHART_INFO_COLUMNS}, m.diff_number
+    FROM boogie_api_song s JOIN boogie_api_chartmetadata m ON m.song_id = s.hash
+"""  # nosec: no user input
+
+
+class SearchError(Exception):
+    """Search failed, the message is meant to be shown to users."""
+
+
+@dataclass
+class SearchPlayer:
+    id: int
+    name: str
+
+
+@dataclass
+class SearchHighscore:
+    id: int
+    player: SearchPlayer
+    itg_score: Optional[int] = None
+    ex_score: Optional[int] = None
+
+
+@dataclass
+class SearchResult:
+    """Song of search results, with the same attributes as `Song` that search results pages use."""
+
+    hash: str
+    chart_info: dict
+    number_of_scores: int
+    number_of_players: int
+    gs_ranked: bool
+    itg_highscore: Optional[SearchHighscore]
+    ex_highscore: Optional[SearchHighscore]
+
+    @property
+    def display_name(self) -> str:
+        return get_display_name(self.chart_info)
+
+    @staticmethod
+    def from_fields(song_hash: str, fields: dict) -> "SearchResult":
+        """Result based on fields of a search cache entry, see `Song.search_cache_mapping`."""
+        return SearchResult(
+            hash=song_hash,
+            chart_info={field: fields.get(field) or "" for field in TEXT_FIELDS + TAG_FIELDS + ("diff_number",)},
+            number_of_scores=int(fields.get("num_plays") or 0),
+            number_of_players=int(fields.get("num_players") or 0),
+            gs_ranked=bool(int(fields.get("gs_ranked") or 0)),
+            itg_highscore=SearchResult._highscore(fields, "itg"),
+            ex_highscore=SearchResult._highscore(fields, "ex"),
+        )
+
+    @staticmethod
+    def _highscore(fields, score_type) -> Optional[SearchHighscore]:
+        if not fields.get(f"{score_type}_highscore_id"):
+            return None
+
+        player = SearchPlayer(
+            id=int(fields[f"{score_type}_highscore_player_id"]), name=fields[f"{score_type}_highscore_player_name"]
+        )
+        return SearchHighscore(
+            id=int(fields[f"{score_type}_highscore_id"]),
+            player=player,
+            **{f"{score_type}_score": int(fields[f"{score_type}_highscore"])},
+        )
+
+
+class RedisSearchBackend:
+    def __init__(self, r: Redis):
+        self.r = r
+
+    def search(self, query: str, offset: int, limit: int, sort: str = DEFAULT_SORT) -> tuple[int, list[SearchResult]]:
+        sort_field, ascending = SORT_OPTIONS[sort]
+        q = Query(query).paging(offset, limit).sort_by(sort_field, asc=ascending)
+        try:
+            results = self.r.ft("idx:song").search(q)
+        except ResponseError as e:
+            if "no such index" in str(e):
+                raise SearchError(
+                    "BoogieStats instance seems to be misconfigured. Consider letting your admin know about this."
+                ) from e
+            raise SearchError("Query syntax error. Consider removing/escaping special characters.") from e
+
+        return results.total, [
+            SearchResult.from_fields(document.id.removeprefix("song:"), document.__dict__) for document in results.docs
+        ]
+
+
+class SQLiteSearchBackend:
+    """
+    Search over an FTS5 table with trigram tokenizer, which matches substrings of the indexed fields.
+
+    The table holds chart info of played songs only, it's maintained by score submissions and chart metadata ingestion.
+    Songs and their highscores are joined to it, so a page of results is loaded with a single query.
+    """
+
+    def search(self, query: str, offset: int, limit: int, sort: str = DEFAULT_SORT) -> tuple[int, list[SearchResult]]:
+        where, params = self._where(query)
+        if where is None:
+            return 0, []
+
+        sort_field, ascending = SORT_OPTIONS[sort]
+        order_by = f"{SQLITE_SORT_EXPRESSIONS[sort_field]} {'ASC' if ascending else 'DESC'}, f.hash"
+        from_ = f"FROM {SEARCH_TABLE} f JOIN boogie_api_song s ON s.hash = f.hash"
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) {from_} WHERE {where}", params)  # nosec: only placeholders are user input
+            (total,) = cursor.fetchone()
+            cursor.execute(
+                f"SELECT {SQLITE_RESULTS_COLUMNS} {from_} {SQLITE_HIGHSCORE_JOINS}"  # nosec
+                f" WHERE {where} ORDER BY {order_by} LIMIT %s OFFSET %s",
+                (*params, limit, offset),
+            )
+            columns = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+
+        return total, [SearchResult.from_fields(row[0], dict(zip(columns, row))) for row in rows]
+
+    def _where(self, query: str) -> tuple[Optional[str], list]:
+        conditions = []
+        params = []
+        matches = []
+
+        for token in TOKEN_RE.findall(query):
+            negated = token.startswith("-") and len(token) > 1
+            condition, condition_params, match = self._condition(token[1:] if negated else token)
+            if match is not None and not negated:
+                matches.append(match)
+            elif match is not None:
+                conditions.append(f"f.hash NOT IN (SELECT hash FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s)")
+                params.append(match)
+            elif condition is not None:
+                conditions.append(f"NOT ({condition})" if negated else condition)
+                params.extend(condition_params)
+
+        if matches:
+            conditions.insert(0, f"f.{SEARCH_TABLE} MATCH %s")
+            params.insert(0, " AND ".join(matches))
+
+        return (" AND ".join(conditions) or None), params
+
+    def _condition(self, term: str) -> tuple[Optional[str], list, Optional[str]]:
+        """SQL condition with its params or an FTS5 match expression for a single term of a query."""
+        if not term.startswith("@"):
+            return self._text_condition(TEXT_FIELDS, term)
+
+        field, _, value = term[1:].partition(":")
+        if field in TEXT_FIELDS:
+            return self._text_condition((field,), value)
+        if field in TAG_FIELDS and value.startswith("{") and value.endswith("}"):
+            tags = [tag.replace("\\", "").strip().lower() for tag in value[1:-1].split("|")]
+            return f"lower(f.{field}) IN ({', '.join(['%s'] * len(tags))})", tags, None
+        if field in NUMERIC_FIELDS and (match := RANGE_RE.match(value)):
+            min_exclusive, min_value, max_exclusive, max_value = match.groups()
+            expression = NUMERIC_FIELDS[field]
+            min_operator = ">" if min_exclusive else ">="
+            max_operator = "<" if max_exclusive else "<="
+            condition = f"{expression} {min_operator} %s AND {expression} {max_operator} %s"
+            return condition, [float(min_value), float(max_value)], None
+
+        raise SearchError(f"Query syntax error. Unsupported filter: {term}")
+
+    @staticmethod
+    def _text_condition(fields, term) -> tuple[Optional[str], list, Optional[str]]:
+        text = term.strip("%'\"*")
+        if not text:
+            return None, [], None
+
+        if len(text) >= MIN_INDEXED_TERM_LENGTH:
+            return None, [], f'{{{" ".join(fields)}}} : {_phrase(text)}'
+
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        condition = " OR ".join(f"f.{field} LIKE %s ESCAPE '\\'" for field in fields)
+        return f"({condition})", [pattern] * len(fields), None
+
+
+def sqlite_search_available() -> bool:
+    return connection.vendor == "sqlite"
+
+
+def get_search_backend():
+    """Search backend of this instance, None when search is not available."""
+    if r := get_redis():
+        return RedisSearchBackend(r)
+
+    if sqlite_search_available():
+        return SQLiteSearchBackend()
+
+    return None
+
+
+def index_songs(song_hashes: list[str]):
+    """(Re)indexes given songs in the SQLite search index, songs without chart metadata are removed from it."""
+    if not sqlite_search_available():
+        return
+
+    with connection.cursor() as cursor:
+        for i in range(0, len(song_hashes), INDEX_BATCH_SIZE):
+            batch = song_hashes[i : i + INDEX_BATCH_SIZE]
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND hash IN ({placeholders})",  # nosec
+                [_hashes_match(batch), *batch],
+            )
+            cursor.execute(f"{INDEXED_SONGS_SQL} WHERE s.hash IN ({placeholders})", batch)  # nosec
+
+
+def index_song_if_missing(song_hash: str):
+    """Adds a song to the SQLite search index unless it's already there, cheap enough to be done on every submission."""
+    if not sqlite_search_available():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT 1 FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND hash = %s",  # nosec: no user input
+            [_hashes_match([song_hash]), song_hash],
+        )
+        if cursor.fetchone() is None:
+            cursor.execute(f"{INDEXED_SONGS_SQL} WHERE s.hash = %s", [song_hash])
+
+
+def rebuild_search_index():
+    """Rebuilds the whole SQLite search index from the ingested chart metadata."""
+    if not sqlite_search_available():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")  # nosec: no user input
+        cursor.execute(INDEXED_SONGS_SQL)
+
+
+def _hashes_match(song_hashes):
+    return "hash : (" + " OR ".join(_phrase(song_hash) for song_hash in song_hashes) + ")"
+
+
+def _phrase(text):
+    return '"' + text.replace('"', '""') + '"'
@@ -0,0 +1,92 @@
+"""Bulk updates of the redis search cache, which keeps a `song:*` hash for every song with chart info."""
+
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+from redis import Redis
+
+from boogiestats.boogie_api.chart_db import get_chart_infos
+from boogiestats.boogie_api.models import Song
+
+SEARCH_CACHE_BATCH_SIZE = 1000
+SEARCH_CACHE_RELATED = ("itg_highscore__player", "ex_highscore__player")  # shown on search results pages
+CHECKPOINT_KEY = "search-cache:checkpoint"  # hash of the last song stored by an unfinished `populate_search_cache`
+
+
+@dataclass
+class PopulateResult:
+    songs: int = 0
+    written: int = 0
+    unchanged: int = 0
+    seconds: float = 0.0
+
+    @property
+    def songs_per_second(self) -> float:
+        return self.songs / self.seconds if self.seconds else 0.0
+
+
+def populate_search_cache(
+    r: Redis, batch_size: int = SEARCH_CACHE_BATCH_SIZE, only_changed: bool = False, resume: bool = True
+) -> PopulateResult:
+    """
+    Writes search cache of all songs, ordered by their hashes and in batches of a single pipeline each.
+
+    Progress is checkpointed after every batch, so an interrupted run continues where it stopped when resumed.
+    With `only_changed`, hashes whose fingerprints match their current fields aren't rewritten.
+    """
+    start = time.perf_counter()
+    result = PopulateResult()
+    songs = Song.objects.order_by("hash").select_related(*SEARCH_CACHE_RELATED)
+    if resume and (checkpoint := r.get(CHECKPOINT_KEY)):
+        songs = songs.filter(hash__gt=checkpoint.decode())
+
+    songs = songs.iterator(chunk_size=batch_size)
+    while batch := list(itertools.islice(songs, batch_size)):
+        _write_batch(r, batch, only_changed, result)
+        result.songs += len(batch)
+
+    r.delete(CHECKPOINT_KEY)
+    result.seconds = time.perf_counter() - start
+
+    return result
+
+
+def _write_batch(r, batch, only_changed, result):
+    chart_infos = get_chart_infos(song.hash for song in batch)
+    mappings = {
+        song.hash: song.search_cache_mapping(chart_info) for song in batch if (chart_info := chart_infos[song.hash])
+    }
+    if only_changed and mappings:
+        pipeline = r.pipeline(transaction=False)
+        for song_hash in mappings:
+            pipeline.hget(f"song:{song_hash}", "fingerprint")
+        for song_hash, fingerprint in zip(list(mappings), pipeline.execute()):
+            if fingerprint is not None and fingerprint.decode() == mappings[song_hash]["fingerprint"]:
+                del mappings[song_hash]
+                result.unchanged += 1
+
+    pipeline = r.pipeline(transaction=False)
+    for song_hash, mapping in mappings.items():
+        pipeline.hset(f"song:{song_hash}", mapping=mapping)
+    pipeline.set(CHECKPOINT_KEY, batch[-1].hash)
+    pipeline.execute()
+    result.written += len(mappings)
+
+
+def update_search_cache(r: Redis, chart_hashes: Iterable[str]):
+    """Updates search cache of the given charts, the ones that are no longer in the chart database are removed."""
+    chart_hashes = sorted(chart_hashes)
+    for i in range(0, len(chart_hashes), SEARCH_CACHE_BATCH_SIZE):
+        batch = chart_hashes[i : i + SEARCH_CACHE_BATCH_SIZE]
+        songs = Song.objects.filter(hash__in=batch).select_related(*SEARCH_CACHE_RELATED).in_bulk()
+        chart_infos = get_chart_infos(batch)
+
+        pipeline = r.pipeline(transaction=False)
+        for chart_hash in batch:
+            if chart_hash in songs and (chart_info := chart_infos[chart_hash]):
+                pipeline.hset(f"song:{chart_hash}", mapping=songs[chart_hash].search_cache_mapping(chart_info))
+            else:
+                pipeline.delete(f"song:{chart_hash}")
+        pipeline.execute()
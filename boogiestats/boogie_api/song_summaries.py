@@ -0,0 +1,60 @@
+"""Rebuilding of `PlayerSongSummary` rows from current and archived scores."""
+
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, Max, Min
+
+from boogiestats.boogie_api.models import (
+    ArchivedScore,
+    Player,
+    PlayerSongSummary,
+    Score,
+)
+
+
+def players_without_song_summaries():
+    return Player.objects.filter(num_scores__gt=0, song_summaries__isnull=True)
+
+
+def rebuild_song_summaries(player_ids: Optional[Iterable[int]] = None) -> int:
+    """Rebuilds summaries of the given players, or all of them, each player in its own transaction."""
+    if player_ids is None:
+        player_ids = Player.objects.order_by("id").values_list("id", flat=True)
+
+    rebuilt = 0
+    for player_id in player_ids:
+        with transaction.atomic():
+            PlayerSongSummary.objects.filter(player_id=player_id).delete()
+            PlayerSongSummary.objects.bulk_create(_song_summaries_of(player_id))
+        rebuilt += 1
+
+    return rebuilt
+
+
+def _song_summaries_of(player_id: int) -> list[PlayerSongSummary]:
+    summaries = {}
+    for model in (Score, ArchivedScore):
+        rows = (
+            model.objects.filter(player_id=player_id)
+            .order_by()
+            .values("song_id")
+            .annotate(num_plays=Count("id"), first_played=Min("submission_date"), last_played=Max("submission_date"))
+        )
+        for row in rows:
+            if summary := summaries.get(row["song_id"]):
+                summary.num_plays += row["num_plays"]
+                summary.first_played = min(summary.first_played, row["first_played"])
+                summary.last_played = max(summary.last_played, row["last_played"])
+            else:
+                summaries[row["song_id"]] = PlayerSongSummary(player_id=player_id, **row)
+
+    for score_type in ("itg", "ex"):  # archived scores are never top
+        top_scores = Score.objects.filter(player_id=player_id, **{f"is_{score_type}_top": True}).values_list(
+            "song_id", "id", f"{score_type}_score"
+        )
+        for song_id, score_id, value in top_scores:
+            setattr(summaries[song_id], f"{score_type}_top_score_id", score_id)
+            setattr(summaries[song_id], f"best_{score_type}_score", value)
+
+    return [summaries[song_id] for song_id in sorted(summaries)]
@@ -1793,3 +1793,20 @@ def test_normalize_gs_headers():
     assert normalized["SomeHeader"] == "SomeValue"
     assert normalized["x-api-key-player-1"] == "ApiKey"
     assert "X-Api-Key-Player-1" not in normalized
+
+
+def test_local_leaderboards_are_not_modified_until_a_new_score(client, requests_mock, player, song):
+    Player.objects.filter(id=player.id).update(gs_integration=GSIntegration.SKIP)
+    url = f"/player-leaderboards.php?chartHashP1={song.hash}&maxLeaderboardResults=3"
+    headers = {"HTTP_x_api_key_player_1": "playerkey"}
+    response = client.get(url, **headers)
+    assert response.headers["Vary"] == "x-api-key-player-1"
+
+    not_modified = client.get(url, HTTP_IF_NONE_MATCH=response.headers["ETag"], **headers)
+    assert not_modified.status_code == 304
+
+    player.scores.create(song=song, itg_score=9000, comment="", rate=100)
+    modified = client.get(url, HTTP_IF_NONE_MATCH=response.headers["ETag"], **headers)
+    assert modified.status_code == 200
+    assert modified.json()["player1"]["gsLeaderboard"][0]["score"] == 9000
+    assert not requests_mock.called
@@ -0,0 +1,93 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils.timezone import now
+
+from boogiestats.boogie_api.archive import ScoreHistory, archive_scores
+from boogiestats.boogie_api.daily_activity import rebuild_daily_activity
+from boogiestats.boogie_api.managers import JUDGMENTS_MAP
+from boogiestats.boogie_api.models import ArchivedScore, GSStatus, Score, Song
+
+OLD = now() - datetime.timedelta(days=400)
+
+
+def submit_old_scores(player, song, itg_scores):
+    for itg_score in itg_scores:
+        player.scores.create(song=song, itg_score=itg_score, comment="", rate=100)
+    Score.objects.filter(player=player, song=song).update(submission_date=OLD, submission_day=OLD.date())
+    rebuild_daily_activity([player.id])  # rollups aren't aware of backdated scores
+
+
+def test_archive_scores_moves_only_superseded_scores(player, song):
+    submit_old_scores(player, song, (5000, 5100, 5200))
+    Score.objects.filter(itg_score=5100).update(gs_status=GSStatus.ERROR)
+    latest = player.scores.create(song=song, itg_score=1000, comment="", rate=100)
+    Score.objects.filter(id=latest.id).update(submission_date=OLD)
+    expected = set(Score.objects.filter(itg_score__in=(5000, 5200)).values_list("id", flat=True))
+
+    assert archive_scores(now() - datetime.timedelta(days=365), chunk_size=1) == 2
+
+    assert set(ArchivedScore.objects.values_list("id", flat=True)) == expected
+    assert not Score.objects.filter(id__in=expected).exists()
+    assert Score.objects.filter(itg_score=5100).exists()  # needs GS submission
+    assert Score.objects.filter(id=latest.id).exists()
+
+
+def test_archive_scores_keeps_judgments_and_song_counts(player, song):
+    original = player.scores.select_related("judgment_counts").get(song=song)
+    quad = {judgment: 0 for judgment in JUDGMENTS_MAP} | {"fantasticPlus": 92, "totalSteps": 92}
+    player.scores.create(song=song, itg_score=10000, comment="", rate=100, judgments=quad)
+    Score.objects.filter(id=original.id).update(submission_date=OLD)
+    song.refresh_from_db()
+    number_of_scores = song.number_of_scores
+
+    archive_scores(now() - datetime.timedelta(days=365))
+
+    archived = ArchivedScore.objects.get(id=original.id)
+    assert archived.excellents == original.excellents == 46
+    assert archived.ex_score == original.ex_score
+    song.update_number_of_players_and_scores()
+    assert song.number_of_scores == number_of_scores
+
+
+def test_score_history_merges_current_and_archived_scores(player, song):
+    submit_old_scores(player, song, range(5000, 5010))
+    archive_scores(now() - datetime.timedelta(days=365))
+    assert ArchivedScore.objects.count() == 9
+
+    history = ScoreHistory.of(player=player).order_by("-itg_score")
+
+    assert history.count() == 12
+    assert [score.itg_score for score in history[3:6]] == [5008, 5007, 5006]
+    assert [score.itg_score for score in history[:2]] == [6666, 6442]
+    assert history.count_distinct_songs() == 2
+    assert history.plays_per("song_id") == {song.hash: 11, "othersong": 1}
+    assert history.judgment_sums("excellents")["excellents"] == 76
+
+
+def test_player_pages_include_archived_scores(client, player, song):
+    submit_old_scores(player, song, (5000, 5001))
+    archive_scores(now() - datetime.timedelta(days=365))
+    archived = ArchivedScore.objects.get()
+
+    response = client.get(reverse("player_scores_by_day", kwargs={"player_id": player.id, "day": OLD.date()}))
+    assert response.context["num_scores"] == 3
+    assert response.context["excellents"] == 46
+
+    response = client.get(reverse("wrapped", kwargs={"player_id": player.id, "year": OLD.year}))
+    assert response.context["num_scores"] == 3
+
+    response = client.get(reverse("score", kwargs={"pk": archived.id}))
+    assert response.status_code == 200
+
+
+def test_archive_scores_command(player, song):
+    submit_old_scores(player, song, (5000, 5001))
+    out = StringIO()
+
+    call_command("archive_scores", "--older-than-days", "30", stdout=out)
+
+    assert "Archived 1 scores" in out.getvalue()
+    assert Song.objects.get(hash=song.hash).archived_scores.count() == 1
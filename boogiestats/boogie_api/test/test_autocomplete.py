@@ -0,0 +1,76 @@
+import pytest
+from django.core.cache import cache
+
+from boogiestats.boogie_api import autocomplete
+from boogiestats.boogie_api.autocomplete import (
+    PrefixIndex,
+    get_autocomplete_index,
+    invalidate_autocomplete_index,
+)
+from boogiestats.boogie_api.chart_metadata import ingest_chart_metadata
+from boogiestats.boogie_api.models import Song
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    invalidate_autocomplete_index()
+    cache.clear()
+    yield
+    invalidate_autocomplete_index()
+
+
+def test_prefix_index_ranks_matching_words():
+    index = PrefixIndex(
+        [
+            (("Barbie Girl", "Aqua"), 5, "barbie"),
+            (("Girl Talk",), 10, "girl talk"),
+            (("Gorillaz",), 1, "gorillaz"),
+            (("ゆめ", "Yume"), 3, "yume"),
+        ],
+        max_results=2,
+    )
+
+    assert index.lookup("gir") == ["girl talk", "barbie"]
+    assert index.lookup("G") == ["girl talk", "barbie"]
+    assert index.lookup("girl t") == ["girl talk"]
+    assert index.lookup("gorilla", limit=1) == ["gorillaz"]
+    assert index.lookup("ゆ") == index.lookup("yu") == ["yume"]
+    assert index.lookup("  ") == []
+
+
+def test_autocomplete_api(client, chart_db, player, song, other_song):
+    chart_db.add_chart(song.hash, title="Barbie Girl", artist="Aqua")
+    chart_db.add_chart(other_song.hash, title="Girl Talk")
+    ingest_chart_metadata(chart_db.path)
+    Song.objects.filter(hash=other_song.hash).update(number_of_scores=0)
+
+    response = client.get("/api/v1/autocomplete/", {"q": "GIRL", "limit": 1})
+
+    assert response.json()["songs"] == [
+        {
+            "hash": song.hash,
+            "display_name": "Aqua - Barbie Girl",
+            "num_plays": 1,
+            "url": f"/songs/{song.hash}/",
+        }
+    ]
+    response = client.get("/api/v1/autocomplete/", {"q": player.name[:2]})
+    assert [p["id"] for p in response.json()["players"]] == [player.id]
+
+
+def test_autocomplete_results_are_cached(client, player, django_assert_num_queries):
+    client.get("/api/v1/autocomplete/", {"q": player.name})
+
+    with django_assert_num_queries(0):
+        response = client.get("/api/v1/autocomplete/", {"q": player.name})
+
+    assert response.json()["players"][0]["name"] == player.name
+
+
+def test_expired_index_is_rebuilt_in_background(client, player, settings):
+    index = get_autocomplete_index()
+    settings.BS_AUTOCOMPLETE_INDEX_TTL_SECONDS = 0
+
+    assert get_autocomplete_index() is index  # stale one is served while rebuilding
+    with autocomplete._rebuild_lock:
+        assert get_autocomplete_index() is not index
@@ -0,0 +1,155 @@
+import json
+import os
+import shutil
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from boogiestats.boogie_api import chart_db
+from boogiestats.boogie_api.chart_db import (
+    ChartDBCache,
+    ChartDBFiles,
+    get_chart_info,
+    get_chart_infos,
+    get_pack_info,
+    invalidate_chart_db_cache,
+    iter_chart_hashes,
+)
+from boogiestats.boogie_api.models import Song
+
+CHART_HASH = "0123456789abcdef"
+
+
+@pytest.fixture
+def chart_db_path(tmp_path, settings):
+    (tmp_path / "charts" / CHART_HASH[:2]).mkdir(parents=True)
+    (tmp_path / "packs").mkdir()
+    write_chart(tmp_path, {"hash": CHART_HASH, "title": "Title", "diffs": [CHART_HASH]})
+    (tmp_path / "packs" / "Pack.json").write_text(json.dumps([CHART_HASH]))
+    settings.BS_CHART_DB_PATH = tmp_path
+    invalidate_chart_db_cache()
+
+    return tmp_path
+
+
+def write_chart(chart_db_path, chart_info, mtime_ns=None):
+    path = chart_db_path / "charts" / CHART_HASH[:2] / f"{CHART_HASH[2:]}.json"
+    path.write_text(json.dumps(chart_info))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_chart_info_is_read_once(chart_db_path, monkeypatch):
+    reads = []
+    read_text = chart_db.Path.read_text
+    monkeypatch.setattr(chart_db.Path, "read_text", lambda path: reads.append(path) or read_text(path))
+
+    assert get_chart_info(CHART_HASH)["title"] == "Title"
+    assert get_chart_info(CHART_HASH)["title"] == "Title"
+    assert get_pack_info("Pack") == [CHART_HASH]
+    assert get_pack_info("Missing") is None
+    assert get_pack_info("Missing") is None
+
+    assert len(reads) == 2
+
+
+def test_cached_chart_info_can_be_modified_by_callers(chart_db_path):
+    get_chart_info(CHART_HASH)["num_plays"] = 10
+
+    assert "num_plays" not in get_chart_info(CHART_HASH)
+
+
+def test_chart_info_is_revalidated_with_mtime(chart_db_path, monkeypatch):
+    monkeypatch.setattr(chart_db._cache, "revalidate_seconds", 0)
+    get_chart_info(CHART_HASH)
+
+    write_chart(chart_db_path, {"hash": CHART_HASH, "title": "New Title", "diffs": []}, mtime_ns=10**18)
+
+    assert get_chart_info(CHART_HASH)["title"] == "New Title"
+
+
+def test_invalidation_drops_cached_chart_info(chart_db_path):
+    get_chart_info(CHART_HASH)
+    write_chart(chart_db_path, {"hash": CHART_HASH, "title": "New Title", "diffs": []})
+
+    assert get_chart_info(CHART_HASH)["title"] == "Title"
+    invalidate_chart_db_cache()
+    assert get_chart_info(CHART_HASH)["title"] == "New Title"
+
+
+def test_paths_outside_of_chart_db_are_not_read(chart_db_path):
+    assert get_pack_info("../charts/01/23456789abcdef") is None
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = ChartDBCache(max_entries=2, revalidate_seconds=60)
+    source = ChartDBFiles(tmp_path)
+    (tmp_path / "packs").mkdir()
+    for name in "abc":
+        (tmp_path / "packs" / f"{name}.json").write_text(json.dumps(name))
+
+    cache.get("pack", "a", source)
+    cache.get("pack", "b", source)
+    cache.get("pack", "a", source)
+    cache.get("pack", "c", source)
+
+    assert list(name for _, _, name in cache._entries) == ["a", "c"]
+    assert cache._size == len('"a"') + len('"c"')
+
+
+@pytest.fixture
+def chart_db_index(chart_db_path, tmp_path, settings):
+    index_path = tmp_path / "index.sqlite3"
+    call_command("compile_chart_db", "--output", index_path, stdout=StringIO())
+    settings.BS_CHART_DB_INDEX_PATH = index_path
+
+    return index_path
+
+
+def test_compile_chart_db_command(chart_db_path, tmp_path):
+    out = StringIO()
+
+    call_command("compile_chart_db", "--output", tmp_path / "index.sqlite3", stdout=out)
+
+    assert "Compiled 1 charts and 1 packs" in out.getvalue()
+
+
+def test_compile_chart_db_command_fails_for_broken_files(chart_db_path, tmp_path):
+    (chart_db_path / "packs" / "Broken.json").write_text("{")
+
+    with pytest.raises(CommandError, match="Broken.json"):
+        call_command("compile_chart_db", "--output", tmp_path / "index.sqlite3")
+
+
+def test_chart_info_is_read_from_index(chart_db_index, chart_db_path):
+    shutil.rmtree(chart_db_path / "charts")
+
+    assert get_chart_info(CHART_HASH)["title"] == "Title"
+    assert get_chart_infos([CHART_HASH, "missing"]) == {CHART_HASH: get_chart_info(CHART_HASH), "missing": None}
+    assert get_pack_info("Pack") == [CHART_HASH]
+    assert list(iter_chart_hashes()) == [CHART_HASH]
+
+
+def test_replaced_index_is_picked_up(chart_db_index, chart_db_path, monkeypatch):
+    index = chart_db._source()
+    monkeypatch.setattr(index, "revalidate_seconds", 0)
+    monkeypatch.setattr(chart_db._cache, "revalidate_seconds", 0)
+    assert get_chart_info(CHART_HASH)["title"] == "Title"
+
+    write_chart(chart_db_path, {"hash": CHART_HASH, "title": "New Title", "diffs": []})
+    call_command("compile_chart_db", "--output", chart_db_index, stdout=StringIO())
+
+    assert get_chart_info(CHART_HASH)["title"] == "New Title"
+
+
+def test_prefetch_chart_infos_loads_songs_in_one_batch(chart_db_index, monkeypatch):
+    songs = [Song(hash=CHART_HASH), Song(hash="missing"), Song(hash=CHART_HASH)]
+    batches = []
+    load_many = chart_db.ChartDBIndex.load_many
+    monkeypatch.setattr(chart_db.ChartDBIndex, "load_many", lambda *args: batches.append(args[2]) or load_many(*args))
+
+    Song.prefetch_chart_infos(songs)
+
+    assert batches == [[CHART_HASH, "missing"]]
+    assert [song.chart_info and song.chart_info["title"] for song in songs] == ["Title", None, "Title"]
@@ -0,0 +1,115 @@
+import os
+import sqlite3
+from io import StringIO
+
+from django.core.management import call_command
+
+from boogiestats.boogie_api.chart_db import (
+    CHART,
+    ChartDBCache,
+    ChartDBIndex,
+    get_chart_info,
+    get_pack_info,
+)
+from boogiestats.boogie_api.chart_db_watcher import refresh_chart_db
+
+
+def touch(chart_db, chart_hash):
+    os.utime(chart_db.path / "charts" / chart_hash[:2] / f"{chart_hash[2:]}.json", ns=(10**18, 10**18))
+
+
+def test_refresh_chart_db_updates_only_changed_charts(chart_db, song, other_song, fake_redis):
+    r = fake_redis
+    chart_db.add_chart(song.hash)
+    chart_db.add_chart(other_song.hash)
+    chart_db.add_pack("Pack", [song.hash, other_song.hash])
+    refresh_chart_db(chart_db.path, redis_connection=r)
+    assert set(r.data) == {f"song:{song.hash}", f"song:{other_song.hash}"}
+    assert get_chart_info(song.hash)["title"] == song.hash
+
+    r.data.clear()
+    chart_db.add_chart(song.hash, title="New Title")
+    touch(chart_db, song.hash)
+    result = refresh_chart_db(chart_db.path, redis_connection=r)
+
+    assert result.changed_charts == {song.hash}
+    assert r.data == {f"song:{song.hash}": r.data[f"song:{song.hash}"]}
+    assert r.data[f"song:{song.hash}"]["title"] == "New Title"
+    assert get_chart_info(song.hash)["title"] == "New Title"
+
+    chart_db.remove_chart(song.hash)
+    refresh_chart_db(chart_db.path, redis_connection=r)
+
+    assert r.data == {}
+    assert get_chart_info(song.hash) is None
+
+
+def test_refresh_chart_db_updates_compiled_index(chart_db, settings, tmp_path):
+    settings.BS_CHART_DB_INDEX_PATH = tmp_path / "index.sqlite3"
+    chart_db.add_chart("aaaa")
+    chart_db.add_chart("bbbb")
+    chart_db.add_pack("Pack", ["aaaa"])
+    refresh_chart_db(chart_db.path, settings.BS_CHART_DB_INDEX_PATH)
+    assert get_pack_info("Pack") == ["aaaa"]
+
+    chart_db.add_chart("aaaa", title="New Title")
+    touch(chart_db, "aaaa")
+    chart_db.remove_chart("bbbb")
+    chart_db.add_pack("Pack", ["aaaa", "cccc"])
+    os.utime(chart_db.path / "packs" / "Pack.json", ns=(10**18, 10**18))
+    refresh_chart_db(chart_db.path, settings.BS_CHART_DB_INDEX_PATH)
+
+    assert get_chart_info("aaaa")["title"] == "New Title"
+    assert get_chart_info("bbbb") is None
+    assert get_pack_info("Pack") == ["aaaa", "cccc"]
+
+
+def test_compiled_index_is_updated_in_place_with_versions_of_entries(chart_db, tmp_path):
+    index_path = tmp_path / "index.sqlite3"
+    chart_db.add_chart("aaaa")
+    chart_db.add_chart("bbbb")
+    refresh_chart_db(chart_db.path, index_path)
+    inode = index_path.stat().st_ino
+    # a cache of another process, which isn't told about changes
+    cache, index = ChartDBCache(max_entries=10, revalidate_seconds=0), ChartDBIndex(index_path, revalidate_seconds=0)
+    cache.get_many(CHART, ["aaaa", "bbbb"], index)
+    loads = []
+    load_many = index.load_many
+    index.load_many = lambda kind, names: loads.append(names) or load_many(kind, names)
+
+    chart_db.add_chart("aaaa", title="New Title")
+    touch(chart_db, "aaaa")
+    refresh_chart_db(chart_db.path, index_path)
+
+    assert index_path.stat().st_ino == inode
+    assert cache.get_many(CHART, ["aaaa", "bbbb"], index) == {
+        "aaaa": get_chart_info("aaaa"),
+        "bbbb": get_chart_info("bbbb"),
+    }
+    assert cache.get(CHART, "aaaa", index)["title"] == "New Title"
+    assert loads == [["aaaa"]]
+
+
+def test_index_without_versions_of_entries_is_compiled_again(chart_db, tmp_path, settings):
+    settings.BS_CHART_DB_INDEX_PATH = tmp_path / "index.sqlite3"
+    chart_db.add_chart("aaaa")
+    refresh_chart_db(chart_db.path, settings.BS_CHART_DB_INDEX_PATH)
+    with sqlite3.connect(settings.BS_CHART_DB_INDEX_PATH) as connection:
+        connection.execute("PRAGMA user_version = 0")
+
+    chart_db.add_chart("aaaa", title="New Title")
+    touch(chart_db, "aaaa")
+    refresh_chart_db(chart_db.path, settings.BS_CHART_DB_INDEX_PATH)
+
+    assert get_chart_info("aaaa")["title"] == "New Title"
+
+
+def test_watch_chart_db_command(chart_db):
+    chart_db.add_chart("aaaa")
+    out = StringIO()
+
+    call_command("watch_chart_db", "--once", stdout=out)
+    call_command("watch_chart_db", "--once", stdout=out)
+
+    assert "Refreshed 1 charts and 0 packs" in out.getvalue()
+    assert "Refreshed 0 charts and 0 packs" in out.getvalue()
@@ -0,0 +1,111 @@
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from boogiestats.boogie_api import chart_metadata
+from boogiestats.boogie_api.chart_metadata import ingest_chart_metadata
+from boogiestats.boogie_api.models import ChartMetadata, PackSummary, Song
+
+
+def test_ingest_chart_metadata_only_touches_changed_charts(chart_db):
+    chart_db.add_chart("aaaa", title="Zebra", titletranslit="", diff_number="12")
+    chart_db.add_chart("bbbb", title="ゆめ", titletranslit="Yume", artist="Someone")
+    chart_db.add_chart("cccc")
+
+    assert ingest_chart_metadata(chart_db.path).upserted == 3
+    assert ChartMetadata.objects.get(song_id="aaaa").diff_number == 12
+    assert ChartMetadata.objects.get(song_id="bbbb").sort_title == "yume"
+
+    chart_db.add_chart("aaaa", title="Zebra", diff_number=13)
+    os.utime(chart_db.path / "charts" / "aa" / "aa.json", ns=(10**18, 10**18))
+    chart_db.remove_chart("cccc")
+    result = ingest_chart_metadata(chart_db.path, batch_size=1)
+
+    assert (result.upserted, result.deleted, result.unchanged) == (1, 1, 1)
+    assert ChartMetadata.objects.get(song_id="aaaa").diff_number == 13
+    assert not ChartMetadata.objects.filter(song_id="cccc").exists()
+
+
+def test_ingest_chart_db_command(chart_db):
+    chart_db.add_chart("aaaa")
+    out = StringIO()
+
+    call_command("ingest_chart_db", stdout=out)
+    call_command("ingest_chart_db", stdout=out)
+
+    assert "Upserted 1, deleted 0 and skipped 0 unchanged charts, rebuilt 0" in out.getvalue()
+    assert "Upserted 0, deleted 0 and skipped 1 unchanged charts" in out.getvalue()
+
+
+def test_songs_can_be_filtered_by_difficulty(client, chart_db, player, song, other_song):
+    chart_db.add_chart(song.hash, diff_number=13)
+    chart_db.add_chart(other_song.hash, diff_number=7)
+    ingest_chart_metadata(chart_db.path)
+
+    response = client.get(reverse("songs"), {"diff_number": 13})
+    assert list(response.context["songs"]) == [song]
+
+    response = client.get(reverse("player_highscores", kwargs={"player_id": player.id}), {"diff_number": 7})
+    assert [score.song for score in response.context["scores"]] == [other_song]
+
+
+def test_pack_view_is_sorted_by_title_and_artist(client, chart_db):
+    chart_db.add_chart("aaaa", title="b", diffs=["aaaa", "aaab"])
+    chart_db.add_chart("aaab", title="b", diffs=["aaaa", "aaab"], diff="Hard", diff_number=9)
+    chart_db.add_chart("bbbb", title="a", artist="Y")
+    chart_db.add_chart("cccc", title="A", artist="X")
+    chart_db.add_pack("Pack", ["aaaa", "aaab", "bbbb", "cccc"])
+    ingest_chart_metadata(chart_db.path)
+    Song.objects.create(hash="aaab", number_of_scores=3)
+
+    response = client.get(reverse("pack", kwargs={"pack_name": "Pack"}))
+
+    songs = response.context["songs"]
+    assert [(song["title"], song["artist"]) for song in songs] == [("A", "X"), ("a", "Y"), ("b", "Artist")]
+    diffs = songs[2]["diffs_split"]["Singles"]
+    assert [(diff["hash"], diff["number_of_scores"]) for diff in diffs] == [("aaab", 3), ("aaaa", 0)]
+
+
+def test_pack_summaries_are_rebuilt_only_for_changed_packs(chart_db):
+    chart_db.add_chart("aaaa", packs=["Pack"])
+    chart_db.add_chart("bbbb", pack_name="Other", packs=["Other"])
+    chart_db.add_pack("Pack", ["aaaa"])
+    chart_db.add_pack("Other", ["bbbb"])
+    assert ingest_chart_metadata(chart_db.path).packs_rebuilt == 2
+
+    chart_db.add_chart("bbbb", title="New Title", pack_name="Other", packs=["Other"])
+    os.utime(chart_db.path / "charts" / "bb" / "bb.json", ns=(10**18, 10**18))
+    (chart_db.path / "packs" / "Pack.json").unlink()
+    result = ingest_chart_metadata(chart_db.path)
+
+    assert (result.packs_rebuilt, result.packs_deleted) == (1, 1)
+    assert PackSummary.objects.get().songs[0]["title"] == "New Title"
+
+
+def test_interrupted_ingestion_rebuilds_packs_of_ingested_charts(chart_db, monkeypatch):
+    chart_db.add_chart("aaaa", packs=["Pack"])
+    chart_db.add_pack("Pack", ["aaaa"])
+    ingest_chart_metadata(chart_db.path)
+    chart_db.add_chart("aaaa", title="New Title", packs=["Pack"])
+    os.utime(chart_db.path / "charts" / "aa" / "aa.json", ns=(10**18, 10**18))
+
+    def interrupted(*args):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as m:
+        m.setattr(chart_metadata, "_ingest_packs", interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            ingest_chart_metadata(chart_db.path)
+    result = ingest_chart_metadata(chart_db.path)
+
+    assert (result.upserted, result.packs_rebuilt) == (0, 1)
+    assert PackSummary.objects.get().songs[0]["title"] == "New Title"
+
+
+def test_missing_pack_is_404(client, chart_db):
+    response = client.get(reverse("pack", kwargs={"pack_name": "Missing"}))
+
+    assert response.status_code == 404
@@ -0,0 +1,75 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.forms.models import model_to_dict
+from django.urls import reverse
+from django.utils.formats import date_format
+from django.utils.timezone import now
+
+from boogiestats.boogie_api.daily_activity import rebuild_daily_activity
+from boogiestats.boogie_api.managers import JUDGMENTS_MAP
+from boogiestats.boogie_api.models import PlayerDailyActivity, Score
+
+QUINT = {judgment: 0 for judgment in JUDGMENTS_MAP} | {"fantasticPlus": 92, "totalSteps": 92}
+
+
+def rollups():
+    return [
+        model_to_dict(activity, exclude=["id"]) for activity in PlayerDailyActivity.objects.order_by("player_id", "day")
+    ]
+
+
+def test_daily_activity_is_updated_on_score_creation(player, rival1, song, other_song):
+    player.scores.create(song=song, itg_score=9700, comment="", rate=100)
+    player.scores.create(song=song, itg_score=9000, comment="", rate=100)
+    player.scores.create(song=other_song, itg_score=10000, comment="", rate=100, judgments=QUINT)
+
+    activity = player.daily_activity.get()
+    assert (activity.plays, activity.charts_played, activity.one_star, activity.five_stars) == (5, 2, 1, 1)
+    assert (activity.fantastics_plus, activity.excellents, activity.steps_hit, activity.total_steps) == (
+        113,
+        76,
+        275,
+        276,
+    )
+    assert activity.first_submission < activity.last_submission
+
+    incremental = rollups()
+    rebuild_daily_activity()
+    assert rollups() == incremental
+
+
+def test_improved_score_takes_star_from_previous_day(player, song):
+    player.scores.create(song=song, itg_score=9700, comment="", rate=100)
+    yesterday = now() - datetime.timedelta(days=1)
+    Score.objects.filter(itg_score=9700).update(submission_date=yesterday, submission_day=yesterday.date())
+    rebuild_daily_activity([player.id])
+
+    player.scores.create(song=song, itg_score=9850, comment="", rate=100)
+
+    stars = {activity.day: (activity.one_star, activity.two_stars) for activity in player.daily_activity.all()}
+    assert stars == {yesterday.date(): (0, 0), now().date(): (0, 1)}
+    incremental = rollups()
+    rebuild_daily_activity()
+    assert rollups() == incremental
+
+
+def test_backfill_daily_activity_command(player, rival1):
+    PlayerDailyActivity.objects.filter(player=rival1).delete()
+    out = StringIO()
+
+    call_command("backfill_daily_activity", "--only-missing", stdout=out)
+
+    assert "Built daily activity of 1 players" in out.getvalue()
+    assert rival1.daily_activity.get().plays == 1
+
+
+def test_calendar_and_day_view_read_daily_activity(client, player):
+    PlayerDailyActivity.objects.filter(player=player).update(plays=42)
+
+    response = client.get(reverse("player", kwargs={"player_id": player.id}))
+    assert f"{date_format(now().date())}: 42" in response.context["calendar"]
+
+    response = client.get(reverse("player_scores_by_day", kwargs={"player_id": player.id, "day": now().date()}))
+    assert (response.context["num_scores"], response.context["num_charts_played"]) == (42, 2)
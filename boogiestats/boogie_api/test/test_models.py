@@ -4,7 +4,7 @@ import pytest
 from django.core.exceptions import ValidationError
 from django.db import transaction
 
-from boogiestats.boogie_api.models import Player, Score, Song
+from boogiestats.boogie_api.models import Player, Score, ScoreJudgments, Song
 
 
 @pytest.fixture
@@ -781,6 +781,39 @@ def test_gs_submission_link_with_judgments(player, song_without_scores):
     assert score.gs_submission_link == expected
 
 
+def test_judgments_are_stored_in_a_side_table(player, song_without_scores):
+    score = player.scores.create(
+        song=song_without_scores,
+        itg_score=9987,
+        comment="",
+        rate=100,
+        judgments={"fantasticPlus": 398, "fantastic": 23, "excellent": 3, "totalSteps": 424, "minesHit": 1},
+    )
+
+    judgment_counts = ScoreJudgments.objects.get(score=score)
+    assert judgment_counts.fantastics_plus == 398
+    assert judgment_counts.mines_hit == 1
+
+    score = Score.objects.get(pk=score.pk)
+    assert (score.fantastics_plus, score.fantastics, score.excellents, score.misses) == (398, 23, 3, 0)
+    assert score.ex_score == score.calculate_ex()
+
+
+def test_scores_without_judgments_dont_have_side_table_rows(player, song_without_scores):
+    score = player.scores.create(song=song_without_scores, itg_score=6_400, comment="", rate=100)
+
+    assert not ScoreJudgments.objects.filter(score=score).exists()
+    assert Score.objects.get(pk=score.pk).fantastics_plus == 0
+
+
+def test_judgments_are_deleted_with_their_score(player):
+    score = player.scores.first()
+
+    score.delete()
+
+    assert not ScoreJudgments.objects.filter(score_id=score.id).exists()
+
+
 @pytest.mark.parametrize("disable_retry", [False, True])
 def test_concurrent_score_creation(disable_retry, settings):
     """There's a possibility of two different processes would attempt to write to the database during score creation in
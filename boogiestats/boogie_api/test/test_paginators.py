@@ -0,0 +1,45 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from boogiestats.boogie_api.models import GSStatus, Score
+from boogiestats.boogie_api.paginators import (
+    EstimatedCountPaginator,
+    estimated_row_count,
+)
+
+
+def test_whole_tables_are_counted_from_statistics(settings, player, song):
+    settings.BS_ESTIMATED_COUNT_THRESHOLD = 1
+    out = StringIO()
+    call_command("analyze_db", stdout=out)
+    assert "Analyzed the database" in out.getvalue()
+    assert estimated_row_count(Score) == 2
+
+    player.scores.create(song=song, itg_score=100, comment="", rate=100)
+
+    assert EstimatedCountPaginator(Score.objects.order_by("-id"), 10).count == 2  # until it's analyzed again
+
+
+def test_filtered_querysets_above_the_threshold_are_not_cut_off(settings, player, rival1):
+    settings.BS_ESTIMATED_COUNT_THRESHOLD = 1
+    call_command("analyze_db", stdout=StringIO())
+
+    paginator = EstimatedCountPaginator(Score.objects.filter(player=player).order_by("-id"), 1)
+
+    assert paginator.count == 2  # exactly on SQLite, which has no estimates of filtered queries
+    assert [score for page in paginator.page_range for score in paginator.page(page)] == list(paginator.object_list)
+
+
+def test_small_tables_are_counted_exactly(player):
+    call_command("analyze_db", stdout=StringIO())
+
+    assert EstimatedCountPaginator(Score.objects.order_by("-id"), 10).count == 2
+
+
+def test_score_admin_changelist(admin_client, player, rival1):
+    response = admin_client.get(reverse("admin:boogie_api_score_changelist"), {"gs_status__exact": GSStatus.OK})
+
+    assert response.status_code == 200
+    assert response.context["cl"].result_count == 3
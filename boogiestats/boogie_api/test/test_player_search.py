@@ -0,0 +1,61 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from boogiestats.boogie_api.models import Player
+from boogiestats.boogie_api.player_search import player_search_q
+from boogiestats.boogie_ui.forms import PlayerDualSelector
+
+
+@pytest.fixture
+def players():
+    return [
+        Player.objects.create(gs_api_key=f"{i:032}", machine_tag=tag, name=name)
+        for i, (name, tag) in enumerate((("Boogie Man", "BOOG"), ("Stepper", "STEP"), ("Mr. Bean", "BEAN")))
+    ]
+
+
+@pytest.mark.parametrize(
+    "term, fields, expected",
+    [
+        ("oogi", ("name",), ["Boogie Man"]),
+        ("EPP", ("name",), ["Stepper"]),
+        ("m", ("name",), ["Boogie Man", "Mr. Bean"]),
+        ("be", ("name",), ["Mr. Bean"]),
+        ("bea", ("name", "machine_tag"), ["Mr. Bean"]),
+        ("st", ("machine_tag",), ["Stepper"]),
+        ("", ("name",), ["Boogie Man", "Stepper", "Mr. Bean"]),
+        ('"', ("name",), []),
+    ],
+)
+def test_player_search(players, term, fields, expected):
+    players = Player.objects.filter(player_search_q(term, fields)).order_by("id")
+
+    assert [player.name for player in players] == expected
+
+
+def test_player_search_follows_renames(players):
+    players[0].name = "Renamed"
+    players[0].save()
+
+    assert list(Player.objects.filter(player_search_q("boogie"))) == []
+    assert list(Player.objects.filter(player_search_q("renamed"))) == [players[0]]
+
+
+def test_players_list_and_rival_picker_use_search_index(client, players):
+    response = client.get(reverse("players_by_name"), {"q": "bean"})
+    assert list(response.context["players"]) == [players[2]]
+
+    query = PlayerDualSelector().build_search_query("STEP")
+    assert list(Player.objects.filter(query)) == [players[1]]
+
+
+def test_rebuild_search_index_command(players):
+    out = StringIO()
+
+    call_command("rebuild_search_index", stdout=out)
+
+    assert "Rebuilt song and player search indexes" in out.getvalue()
+    assert Player.objects.filter(player_search_q("stepper")).get() == players[1]
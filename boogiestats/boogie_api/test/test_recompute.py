@@ -0,0 +1,135 @@
+import random
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+
+from boogiestats.boogie_api.managers import JUDGMENTS_MAP
+from boogiestats.boogie_api.models import (
+    ArchivedScore,
+    Player,
+    PlayerDailyActivity,
+    Score,
+    ScoreJudgments,
+    Song,
+)
+from boogiestats.boogie_api.recompute import recompute_ex_scores, rederive_ex_tops
+from boogiestats.boogie_api.rivals import GENERATION_KEY, compare_with_rivals
+
+
+def random_judgments(rng):
+    total_steps = rng.choice([0, 1, 92, 500, 1337])
+    total_holds = rng.randint(0, 50)
+    total_rolls = rng.randint(0, 20)
+    judgments = {"totalSteps": total_steps, "totalHolds": total_holds, "totalRolls": total_rolls}
+
+    remaining = total_steps
+    for judgment in ("fantasticPlus", "fantastic", "excellent", "great", "decent", "wayOff"):
+        judgments[judgment] = rng.randint(0, remaining)
+        remaining -= judgments[judgment]
+    judgments["miss"] = remaining
+    judgments["holdsHeld"] = rng.randint(0, total_holds)
+    judgments["rollsHeld"] = rng.randint(0, total_rolls)
+    judgments["totalMines"] = rng.randint(0, 30)
+    judgments["minesHit"] = rng.randint(0, judgments["totalMines"])
+
+    return judgments
+
+
+def test_recompute_ex_scores_matches_calculate_ex():
+    rng = random.Random(2137)
+    songs = [Song.objects.create(hash=f"song{i}") for i in range(5)]
+    players = [Player.objects.create(gs_api_key=f"key{i}", machine_tag=f"P{i}") for i in range(3)]
+    for _ in range(60):
+        rng.choice(players).scores.create(
+            song=rng.choice(songs),
+            itg_score=rng.randint(0, 10_000),
+            comment="",
+            rate=100,
+            judgments=random_judgments(rng),
+        )
+
+    expected = {score.id: score.calculate_ex() for score in Score.objects.all()}
+    Score.objects.update(ex_score=0)
+
+    result = recompute_ex_scores(chunk_size=7)
+
+    assert result.processed == 60
+    assert result.changed == sum(1 for ex_score in expected.values() if ex_score)
+    assert dict(Score.objects.values_list("id", "ex_score")) == expected
+
+
+def test_recompute_ex_scores_skips_unchanged_scores(player):
+    result = recompute_ex_scores()
+
+    assert result.processed == 2
+    assert result.changed == 0
+    assert not result.affected_songs
+
+
+def test_recompute_ex_scores_skips_scores_without_judgment_counts(player):
+    score = player.scores.first()
+    ScoreJudgments.objects.filter(score=score).delete()
+    Score.objects.filter(id=score.id).update(ex_score=1)
+
+    result = recompute_ex_scores()
+
+    assert result.processed == 1
+    score.refresh_from_db()
+    assert score.has_judgments and score.ex_score == 1
+
+
+def test_recompute_ex_scores_fixes_archived_scores(player):
+    archived = ArchivedScore.from_score(player.scores.first())
+    archived.id, expected, archived.ex_score = 10**6, archived.ex_score, 0
+    archived.save()
+
+    result = recompute_ex_scores()
+
+    assert (result.processed, result.changed) == (3, 1)
+    archived.refresh_from_db()
+    assert archived.ex_score == expected
+
+
+def test_rederive_ex_tops_restores_derived_data(player, song):
+    for fantastics_plus in (10, 92, 50):
+        player.scores.create(
+            song=song,
+            itg_score=9_000,
+            comment="",
+            rate=100,
+            judgments={
+                **{judgment: 0 for judgment in JUDGMENTS_MAP},
+                "fantasticPlus": fantastics_plus,
+                "fantastic": 92 - fantastics_plus,
+                "totalSteps": 92,
+            },
+        )
+    quint = song.scores.get(ex_score=10_000)
+    Score.objects.filter(song=song).update(is_ex_top=False)
+    Song.objects.filter(hash=song.hash).update(ex_highscore=None)
+    Player.objects.filter(id=player.id).update(five_stars=0)
+    PlayerDailyActivity.objects.filter(player=player).update(five_stars=0)
+    compare_with_rivals(player, [], "ex")
+    generation = cache.get(GENERATION_KEY)
+
+    rederive_ex_tops({song.hash}, {player.id})
+
+    assert list(song.scores.filter(is_ex_top=True)) == [quint]
+    song.refresh_from_db()
+    assert song.ex_highscore == quint
+    player.refresh_from_db()
+    assert player.five_stars == 1
+    assert player.daily_activity.get(day=quint.submission_day).five_stars == 1
+    assert cache.get(GENERATION_KEY) != generation  # cached rival comparisons are dropped
+
+
+def test_recompute_ex_command_reports_throughput(player):
+    Score.objects.update(ex_score=0, is_ex_top=False)
+    out = StringIO()
+
+    call_command("recompute_ex", "--chunk-size", "1", stdout=out)
+
+    assert "Recomputed 2 scores" in out.getvalue()
+    assert "scores/s" in out.getvalue()
+    assert Score.objects.filter(is_ex_top=True).count() == 2
@@ -0,0 +1,50 @@
+from django.core.cache import cache
+from django.urls import reverse
+
+from boogiestats.boogie_api.models import Player, Song
+from boogiestats.boogie_api.rivals import compute_rivals_comparison
+
+
+def test_compute_rivals_comparison(player, rival1, song, other_song):
+    rival2 = Player.objects.create(gs_api_key="rival2key", machine_tag="RIV2")
+    rival2.scores.create(song=song, itg_score=7000, comment="", rate=100)
+    rival2.scores.create(song=other_song, itg_score=6666, comment="", rate=100)
+    rival2.scores.create(song=Song.objects.create(hash="notplayed"), itg_score=9000, comment="", rate=100)
+
+    comparison = compute_rivals_comparison([player.id, rival1.id, rival2.id], "itg")
+
+    assert [(chart.song_id, chart.delta, chart.best) for chart in comparison.charts] == [
+        (song.hash, -558, 2),
+        (other_song.hash, 0, 0),
+    ]
+    assert comparison.charts[0].scores[1][1] == 4553
+    player_vs_rival2 = comparison.matrix[0][2]
+    assert (player_vs_rival2.common_charts, player_vs_rival2.wins, player_vs_rival2.losses) == (2, 0, 1)
+    assert (player_vs_rival2.ties, player_vs_rival2.mean_delta) == (1, -279.0)
+    assert (comparison.matrix[2][1].wins, comparison.matrix[1][2].losses) == (1, 1)
+    assert comparison.matrix[1][0].common_charts == 1
+
+
+def test_rivals_comparison_is_cached_until_new_score(client, player, rival1, song, django_assert_num_queries):
+    cache.clear()
+    url = reverse("rivals_comparison_api", kwargs={"player_id": player.id})
+
+    assert client.get(url).json()["matrix"][0][1]["wins"] == 1
+    with django_assert_num_queries(2):  # the player and their rivals
+        client.get(url)
+
+    rival1.scores.create(song=song, itg_score=9000, comment="", rate=100)
+    response = client.get(url, {"limit": 1})
+    assert response.json()["matrix"][0][1]["losses"] == 1
+    [chart] = response.json()["charts"]
+    assert (chart["hash"], chart["best"], chart["delta"]) == (song.hash, rival1.id, -2558)
+    assert [score["score"] for score in chart["scores"]] == [6442, 9000]
+
+
+def test_player_rivals_page(client, player, rival1):
+    response = client.get(reverse("player_rivals", kwargs={"player_id": player.id}))
+
+    assert response.status_code == 200
+    assert [participant.id for participant in response.context["participants"]] == [player.id, rival1.id]
+    song, delta, scores = response.context["charts"][0]
+    assert (song.hash, delta, [score[2] for score in scores]) == ("somesong", 1889, [True, False])
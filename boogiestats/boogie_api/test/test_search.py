@@ -0,0 +1,108 @@
+import pytest
+from django.urls import reverse
+
+from boogiestats.boogie_api.chart_metadata import ingest_chart_metadata
+from boogiestats.boogie_api.models import Song
+from boogiestats.boogie_api.search import SearchError, SearchResult, SQLiteSearchBackend
+
+
+@pytest.fixture
+def songs(chart_db):
+    charts = {
+        "aaaa": dict(title="Barbie Girl", artist="Aqua", pack_name="Pop", diff_number=7),
+        "bbbb": dict(title="Jump", artist="Kris Kross", pack_name="ITL Online", diff_number=9),
+        "cccc": dict(title="Pump It", artist="Black Eyed Peas", steps_type="dance-double", diff_number=12),
+        "dddd": dict(title="Unplayed Girl"),
+    }
+    for chart_hash, fields in charts.items():
+        chart_db.add_chart(chart_hash, **fields)
+    for i, chart_hash in enumerate(("aaaa", "bbbb", "cccc")):
+        Song.objects.create(hash=chart_hash, number_of_scores=i)
+    ingest_chart_metadata(chart_db.path)
+
+
+def search(query, offset=0, limit=10, sort="plays"):
+    total, results = SQLiteSearchBackend().search(query, offset, limit, sort)
+    return total, [result.hash for result in results]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("%girl%", ["aaaa"]),
+        ("%ump%", ["cccc", "bbbb"]),
+        ("%ump% -'pump'", ["bbbb"]),
+        ("%aq%", ["aaaa"]),
+        ("@pack_name:itl", ["bbbb"]),
+        (r"@steps_type:{dance\-double}", ["cccc"]),
+        ("-@steps_type:{dance\\-double}", ["bbbb", "aaaa"]),
+        ("@diff_number:[7,9]", ["bbbb", "aaaa"]),
+        ("%ump% @diff_number:[(9 +inf]", ["cccc"]),
+        ("'jump*", ["bbbb"]),
+        ("", []),
+    ],
+)
+def test_sqlite_search(songs, query, expected):
+    assert search(query) == (len(expected), expected)
+
+
+def test_sqlite_search_is_paginated(songs):
+    assert search("@diff_number:[0,20]", offset=1, limit=1) == (3, ["bbbb"])
+
+
+@pytest.mark.parametrize(
+    "sort, expected",
+    [
+        ("plays", ["cccc", "bbbb", "aaaa"]),
+        ("difficulty", ["aaaa", "bbbb", "cccc"]),
+        ("title", ["aaaa", "bbbb", "cccc"]),
+    ],
+)
+def test_sqlite_search_sorting(songs, sort, expected):
+    assert search("@diff_number:[0,20]", sort=sort) == (3, expected)
+
+
+def test_sqlite_search_results_hold_highscores(songs, player, song):
+    Song.objects.filter(hash="aaaa").update(itg_highscore=player.scores.get(song=song), number_of_players=1)
+
+    _, results = SQLiteSearchBackend().search("%girl%", 0, 10)
+
+    assert results[0].display_name == "Aqua - Barbie Girl"
+    assert results[0].number_of_players == 1
+    assert (results[0].itg_highscore.itg_score, results[0].itg_highscore.player.name) == (6442, player.name)
+    assert results[0].ex_highscore is None
+
+
+def test_sqlite_search_rejects_unsupported_filters(songs):
+    with pytest.raises(SearchError):
+        search("@unknown:1")
+
+
+def test_sqlite_search_index_is_maintained(songs, chart_db, player):
+    chart_db.add_chart("dddd", title="Renamed")
+    ingest_chart_metadata(chart_db.path)
+    assert search("%renamed%") == (0, [])
+
+    song = Song.objects.create(hash="dddd")
+    player.scores.create(song=song, itg_score=5000, comment="", rate=100)
+
+    assert search("%renamed%") == (1, ["dddd"])
+
+
+def test_search_cache_mapping_holds_results(chart_db, player, song):
+    chart_info = chart_db.add_chart(song.hash, title="Title", artist="Artist")
+    song = Song.objects.select_related("itg_highscore__player", "ex_highscore__player").get(hash=song.hash)
+    fields = {key: str(value) for key, value in song.search_cache_mapping(chart_info).items()}  # as returned by redis
+
+    result = SearchResult.from_fields(song.hash, fields)
+
+    assert result.display_name == "Artist - Title"
+    assert result.number_of_scores == song.number_of_scores
+    assert result.ex_highscore.ex_score == song.ex_highscore.ex_score
+    assert result.ex_highscore.player.id == player.id
+
+
+def test_search_view_without_redis(client, songs):
+    response = client.get(reverse("search"), {"q": "girl"})
+
+    assert [song.hash for song in response.context["songs"]] == ["aaaa"]
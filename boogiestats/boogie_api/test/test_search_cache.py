@@ -0,0 +1,53 @@
+import pytest
+
+from boogiestats.boogie_api import models
+from boogiestats.boogie_api.models import Song
+from boogiestats.boogie_api.search_cache import CHECKPOINT_KEY, populate_search_cache
+
+
+@pytest.fixture
+def songs(chart_db):
+    for i in range(5):
+        chart_db.add_chart(f"aaa{i}")
+        Song.objects.create(hash=f"aaa{i}", number_of_scores=i)
+    Song.objects.create(hash="bbbb")  # not in the chart database
+
+
+def test_populate_search_cache_writes_in_batches(songs, fake_redis):
+    result = populate_search_cache(fake_redis, batch_size=2)
+
+    assert (result.songs, result.written) == (6, 5)
+    assert fake_redis.executed_pipelines == 3
+    assert fake_redis.data["song:aaa3"]["num_plays"] == 3
+    assert "song:bbbb" not in fake_redis.data
+    assert CHECKPOINT_KEY not in fake_redis.data
+
+
+def test_populate_search_cache_resumes_from_checkpoint(songs, fake_redis):
+    fake_redis.set(CHECKPOINT_KEY, "aaa2")
+
+    result = populate_search_cache(fake_redis)
+
+    assert result.songs == 3
+    assert set(fake_redis.data) == {"song:aaa3", "song:aaa4"}
+
+
+def test_populate_search_cache_only_changed(songs, fake_redis):
+    populate_search_cache(fake_redis)
+    Song.objects.filter(hash="aaa1").update(number_of_scores=100)
+
+    result = populate_search_cache(fake_redis, only_changed=True)
+
+    assert (result.written, result.unchanged) == (1, 4)
+    assert fake_redis.data["song:aaa1"]["num_plays"] == 100
+
+
+def test_renamed_highscore_holder_is_updated_in_search_cache(chart_db, player, song, fake_redis, monkeypatch):
+    chart_db.add_chart(song.hash)
+    monkeypatch.setattr(models, "get_redis", lambda: fake_redis)
+    player = models.Player.objects.get(id=player.id)
+
+    player.name = "Renamed"
+    player.save()
+
+    assert fake_redis.data[f"song:{song.hash}"]["itg_highscore_player_name"] == "Renamed"
@@ -0,0 +1,79 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import OperationalError, transaction
+from django.urls import reverse
+from django.utils.timezone import now
+
+from boogiestats.boogie_api.archive import archive_scores
+from boogiestats.boogie_api.models import Player, Score, SiteStatistics
+
+
+def statistics_tuple():
+    statistics = SiteStatistics.get()
+    return statistics.num_songs, statistics.num_scores, statistics.num_players, list(SiteStatistics.recent_players())
+
+
+def test_site_statistics_are_updated_on_creation(player, rival1, song):
+    assert statistics_tuple() == (2, 3, 2, [rival1, player])
+
+    player.scores.create(song=song, itg_score=7000, comment="", rate=100)
+
+    assert statistics_tuple() == (2, 4, 2, [player, rival1])
+
+
+def test_recent_activity_is_bounded(song):
+    players = [Player.objects.create(gs_api_key=f"key{i}", machine_tag=f"P{i}") for i in range(7)]
+    for player in players:
+        player.scores.create(song=song, itg_score=5000, comment="", rate=100)
+
+    assert list(SiteStatistics.recent_players()) == players[-5:][::-1]
+
+
+def test_site_statistics_are_updated_after_the_submission_commits(player, song):
+    expected = statistics_tuple()
+
+    with transaction.atomic():
+        player.scores.create(song=song, itg_score=7000, comment="", rate=100)
+        assert SiteStatistics.objects.get().num_scores == expected[1]
+
+    assert SiteStatistics.objects.get().num_scores == expected[1] + 1
+
+
+def test_failing_statistics_update_does_not_retry_the_submission(player, song, monkeypatch, caplog):
+    def locked(**fields):
+        raise OperationalError("database is locked")
+
+    monkeypatch.setattr(SiteStatistics, "_update", locked)
+    expected = Score.objects.count() + 1
+
+    player.scores.create(song=song, itg_score=7000, comment="", rate=100)
+
+    assert Score.objects.count() == expected
+    assert "database is locked" in caplog.text
+
+
+def test_archiving_and_recomputing_keep_site_statistics(player, song):
+    superseded = player.scores.create(song=song, itg_score=5000, comment="", rate=100)
+    Score.objects.filter(id=superseded.id).update(submission_date=now() - datetime.timedelta(days=400))
+    player.scores.create(song=song, itg_score=1000, comment="", rate=100)
+    expected = statistics_tuple()
+
+    assert archive_scores(now() - datetime.timedelta(days=365)) == 1
+    assert statistics_tuple() == expected
+
+    SiteStatistics.objects.update(num_scores=0)
+    out = StringIO()
+    call_command("recompute_site_statistics", stdout=out)
+
+    assert statistics_tuple() == expected
+    assert "Recomputed site statistics (2 songs, 4 scores, 1 players)" in out.getvalue()
+
+
+def test_index_shows_site_statistics(client, player, rival1, django_assert_max_num_queries):
+    with django_assert_max_num_queries(5):
+        response = client.get(reverse("index"))
+
+    assert (response.context["n_songs"], response.context["n_scores"], response.context["n_players"]) == (2, 3, 2)
+    assert response.context["recent_activity"] == [rival1, player]
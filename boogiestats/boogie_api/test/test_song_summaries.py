@@ -0,0 +1,82 @@
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.forms.models import model_to_dict
+from django.urls import reverse
+
+from boogiestats.boogie_api.models import PlayerSongSummary, Score
+from boogiestats.boogie_api.recompute import rederive_ex_tops
+from boogiestats.boogie_api.song_summaries import rebuild_song_summaries
+
+
+def summaries():
+    return [
+        model_to_dict(summary, exclude=["id"]) for summary in PlayerSongSummary.objects.order_by("player_id", "song_id")
+    ]
+
+
+def test_song_summaries_are_updated_on_score_creation(player, rival1, song, other_song):
+    player.scores.create(song=song, itg_score=9700, comment="", rate=100)
+    top = player.scores.create(song=song, itg_score=9800, comment="", rate=100)
+    player.scores.create(song=other_song, itg_score=5000, comment="", rate=100)
+
+    summary = player.song_summaries.get(song=song)
+    assert (summary.num_plays, summary.best_itg_score, summary.itg_top_score) == (3, 9800, top)
+    assert summary.first_played < summary.last_played
+    assert player.song_summaries.get(song=other_song).best_itg_score == 6666
+
+    incremental = summaries()
+    rebuild_song_summaries()
+    assert summaries() == incremental
+
+
+def test_rank_counts_ties_by_submission_order(player, rival1, song):
+    score = rival1.scores.create(song=song, itg_score=6442, comment="", rate=100)
+
+    assert Score.rank(score, "itg") == 2
+    assert Score.rank(Score.objects.get(player=player, song=song), "itg") == 1
+
+
+def test_most_played_uses_play_counts_of_summaries(client, player, song, other_song):
+    player.scores.create(song=other_song, itg_score=1000, comment="", rate=100)
+    player.scores.create(song=other_song, itg_score=2000, comment="", rate=100)
+
+    response = client.get(reverse("player_most_played", kwargs={"player_id": player.id}))
+
+    assert [(score.song, score.num_scores) for score in response.context["scores"]] == [(other_song, 3), (song, 1)]
+
+
+def test_rederived_ex_tops_update_summaries(player, song):
+    old_top = Score.objects.get(player=player, song=song)
+    new_top = player.scores.create(song=song, itg_score=100, comment="", rate=100)
+    Score.objects.filter(id=new_top.id).update(ex_score=9999)
+    Score.objects.filter(id=old_top.id).update(ex_score=10)
+
+    rederive_ex_tops([song.hash], [player.id])
+
+    summary = player.song_summaries.get(song=song)
+    assert (summary.ex_top_score_id, summary.best_ex_score) == (new_top.id, 9999)
+    assert summary.itg_top_score_id == old_top.id
+
+
+def test_backfill_song_summaries_command(player, rival1):
+    PlayerSongSummary.objects.filter(player=rival1).delete()
+    out = StringIO()
+
+    call_command("backfill_song_summaries", "--only-missing", stdout=out)
+
+    assert "Built song summaries of 1 players" in out.getvalue()
+    assert rival1.song_summaries.count() == 1
+
+
+def test_migration_backfills_missing_song_summaries(player, rival1, song):
+    player.scores.create(song=song, itg_score=9800, comment="", rate=100)
+    expected = summaries()
+    PlayerSongSummary.objects.filter(player=rival1).delete()
+    migration = import_module("boogiestats.boogie_api.migrations.0040_backfill_playersongsummary")
+
+    migration.backfill_song_summaries(apps, schema_editor=None)
+
+    assert summaries() == expected
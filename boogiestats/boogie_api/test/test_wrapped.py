@@ -0,0 +1,73 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils.timezone import now
+
+from boogiestats.boogie_api.daily_activity import rebuild_daily_activity
+from boogiestats.boogie_api.models import PlayerDailyActivity, Score, WrappedSnapshot
+from boogiestats.boogie_api.wrapped import (
+    compute_wrapped,
+    find_longest_streak,
+    missing_snapshots,
+)
+
+LAST_YEAR = now().year - 1
+
+
+def move_scores_to_last_year(player):
+    for i, score in enumerate(Score.objects.filter(player=player).order_by("id")):
+        submission_date = now().replace(year=LAST_YEAR, month=3, day=1) + datetime.timedelta(days=i)
+        Score.objects.filter(id=score.id).update(submission_date=submission_date, submission_day=submission_date.date())
+    rebuild_daily_activity([player.id])
+
+
+def test_find_longest_streak():
+    days = [datetime.date(2024, 1, d) for d in (1, 3, 4, 5, 8, 9, 10, 20)]
+
+    assert find_longest_streak(days) == (3, datetime.date(2024, 1, 3))
+    assert find_longest_streak([]) == (0, None)
+
+
+def test_wrapped_of_closed_year_is_stored(client, player, song):
+    player.scores.create(song=song, itg_score=9950, comment="", rate=100)
+    move_scores_to_last_year(player)
+
+    response = client.get(reverse("wrapped", kwargs={"player_id": player.id, "year": LAST_YEAR}))
+
+    context = response.context
+    assert (context["num_scores"], context["num_charts_played"], context["three_stars"]) == (3, 2, 1)
+    assert (context["played_days"], context["longest_streak"]) == (3, 3)
+    assert context["longest_streak_start"] == datetime.date(LAST_YEAR, 3, 1)
+    assert context["most_played_song"] == song
+    assert context["highest_itg_score"].itg_score == 9950
+    assert context["excellents"] == 76
+    assert WrappedSnapshot.objects.get(player=player, year=LAST_YEAR).data == compute_wrapped(player.id, LAST_YEAR)
+
+    Score.objects.filter(player=player).delete()  # snapshots aren't affected by later changes
+    response = client.get(reverse("wrapped", kwargs={"player_id": player.id, "year": LAST_YEAR}))
+    assert response.context["num_scores"] == 3
+
+
+def test_generate_wrapped_command(player, rival1):
+    move_scores_to_last_year(player)
+    move_scores_to_last_year(rival1)
+    WrappedSnapshot.objects.create(player=player, year=LAST_YEAR, data={})
+    out = StringIO()
+
+    call_command("generate_wrapped", "--workers", "1", stdout=out)
+    call_command("generate_wrapped", "--workers", "1", "--year", str(LAST_YEAR), "--force", stdout=out)
+
+    assert "Generated 1 wrapped snapshots" in out.getvalue()
+    assert "Generated 2 wrapped snapshots" in out.getvalue()
+    assert WrappedSnapshot.objects.get(player=player).data["num_scores"] == 2
+
+
+def test_snapshots_do_not_depend_on_daily_activity(player):
+    move_scores_to_last_year(player)
+    PlayerDailyActivity.objects.all().delete()  # e.g. before `backfill_daily_activity` has been run
+
+    assert missing_snapshots() == [(player.id, LAST_YEAR)]
+    data = compute_wrapped(player.id, LAST_YEAR)
+    assert (data["played_days"], data["longest_streak"]) == (2, 2)
@@ -50,6 +50,8 @@ GS = [
 
 BS_V1 = [
     path("api/v1/live-on-twitch/<int:player_id>/", v1.LiveOnTwitch.as_view()),
+    path("api/v1/autocomplete/", v1.Autocomplete.as_view(), name="autocomplete"),
+    path("api/v1/players/<int:player_id>/rivals/", v1.RivalsComparison.as_view(), name="rivals_comparison_api"),
 ]
 
 urlpatterns = GS + BS_V1
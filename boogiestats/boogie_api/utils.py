@@ -1,5 +1,3 @@
-import json
-from pathlib import Path
 from typing import TYPE_CHECKING, Optional
 
 import redis
@@ -16,9 +14,16 @@ def search_enabled() -> bool:
     return settings.BS_REDIS_HOST and settings.BS_REDIS_PORT
 
 
+_redis_clients: dict[tuple, redis.Redis] = {}
+
+
 def get_redis() -> Optional[redis.Redis]:
+    """Redis client shared by the whole process, it's thread-safe and keeps a pool of connections."""
     if search_enabled():
-        return redis.Redis(host=settings.BS_REDIS_HOST, port=settings.BS_REDIS_PORT)
+        key = settings.BS_REDIS_HOST, settings.BS_REDIS_PORT
+        if key not in _redis_clients:
+            _redis_clients[key] = redis.Redis(host=settings.BS_REDIS_HOST, port=settings.BS_REDIS_PORT)
+        return _redis_clients[key]
 
 
 def set_sentry_user(request: HttpRequest, player_instance: Optional["Player"] = None):
@@ -45,29 +50,6 @@ def score_to_star_field(score: "Score"):
     return None
 
 
-def get_chart_info(hash_v3: str) -> dict | None:
-    """Chart info based on an external (optional) chart database"""
-    if settings.BS_CHART_DB_PATH is None:
-        return None
-
-    base_path = (Path(settings.BS_CHART_DB_PATH) / "charts").resolve()
-    path = (base_path / hash_v3[:2] / f"{hash_v3[2:]}.json").resolve()
-    if path.is_relative_to(base_path) and path.exists():
-        return json.loads(path.read_text())
-    return None
-
-
-def get_pack_info(pack_name: str) -> dict | None:
-    if settings.BS_CHART_DB_PATH is None:
-        return None
-
-    base_path = (Path(settings.BS_CHART_DB_PATH) / "packs").resolve()
-    path = (base_path / f"{pack_name}.json").resolve()
-    if path.is_relative_to(base_path) and path.exists():
-        return json.loads(path.read_text())
-    return None
-
-
 def get_display_name(chart_info: dict, *, with_steps_type: bool = True) -> str:
     artist = chart_info["artisttranslit"] or chart_info["artist"]
     title = chart_info["titletranslit"] or chart_info["title"]
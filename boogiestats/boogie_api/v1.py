@@ -1,10 +1,119 @@
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import cache
 from django.http import JsonResponse
+from django.urls import reverse
 from django.views import View
 
+from boogiestats.boogie_api.autocomplete import get_autocomplete_index
 from boogiestats.boogie_api.models import Player
+from boogiestats.boogie_api.rivals import compare_with_rivals
+
+MAX_RIVALS_COMPARISON_CHARTS = 500
 
 
 class LiveOnTwitch(View):
     def get(self, request, player_id, *args, **kwargs):
         player = Player.get_or_404(id=player_id)
         return JsonResponse({"is_live": player.is_live()})
+
+
+class Autocomplete(View):
+    """Top songs (by number of plays) and players (by number of scores) with words starting with `q`"""
+
+    def get(self, request, *args, **kwargs):
+        prefix = request.GET.get("q", "")[: settings.BS_AUTOCOMPLETE_MAX_PREFIX_LENGTH]
+        try:
+            limit = min(
+                int(request.GET.get("limit", settings.BS_AUTOCOMPLETE_MAX_RESULTS)),
+                settings.BS_AUTOCOMPLETE_MAX_RESULTS,
+            )
+        except ValueError:
+            limit = settings.BS_AUTOCOMPLETE_MAX_RESULTS
+
+        cache_key = f"autocomplete-{limit}-{sha256(prefix.casefold().encode()).hexdigest()}"
+        if (results := cache.get(cache_key)) is None:
+            results = self._lookup(prefix, max(limit, 1))
+            cache.set(cache_key, results, settings.BS_AUTOCOMPLETE_CACHE_SECONDS)
+
+        return JsonResponse(results)
+
+    @staticmethod
+    def _lookup(prefix, limit):
+        index = get_autocomplete_index()
+        return {
+            "songs": [
+                {
+                    "hash": song_hash,
+                    "display_name": display_name,
+                    "num_plays": num_plays,
+                    "url": reverse("song", kwargs={"song_hash": song_hash}),
+                }
+                for song_hash, display_name, num_plays in index.songs.lookup(prefix, limit)
+            ],
+            "players": [
+                {
+                    "id": player_id,
+                    "name": name,
+                    "machine_tag": machine_tag,
+                    "num_scores": num_scores,
+                    "url": reverse("player", kwargs={"player_id": player_id}),
+                }
+                for player_id, name, machine_tag, num_scores in index.players.lookup(prefix, limit)
+            ],
+        }
+
+
+class RivalsComparison(View):
+    """
+    Head-to-head results of a player and their rivals on common charts and the charts, biggest deficits of the player
+    first. `score_type` is either `itg` (default) or `ex`, charts can be paged with `offset` and `limit`.
+    """
+
+    def get(self, request, player_id, *args, **kwargs):
+        player = Player.get_or_404(id=player_id)
+        rivals = list(player.rivals.order_by("id")[: settings.BS_RIVALS_COMPARISON_MAX_RIVALS])
+        score_type = "ex" if request.GET.get("score_type") == "ex" else "itg"
+        try:
+            offset = max(int(request.GET.get("offset", 0)), 0)
+            limit = min(max(int(request.GET.get("limit", 50)), 0), MAX_RIVALS_COMPARISON_CHARTS)
+        except ValueError:
+            return JsonResponse({"error": "offset and limit have to be integers"}, status=400)
+
+        comparison = compare_with_rivals(player, rivals, score_type)
+        participant_ids = comparison.participant_ids
+
+        return JsonResponse(
+            {
+                "score_type": score_type,
+                "participants": [{"id": p.id, "name": p.name, "machine_tag": p.machine_tag} for p in (player, *rivals)],
+                "matrix": [
+                    [
+                        (
+                            None
+                            if i == j
+                            else {
+                                "common_charts": head_to_head.common_charts,
+                                "wins": head_to_head.wins,
+                                "losses": head_to_head.losses,
+                                "ties": head_to_head.ties,
+                                "mean_delta": head_to_head.mean_delta,
+                            }
+                        )
+                        for j, head_to_head in enumerate(row)
+                    ]
+                    for i, row in enumerate(comparison.matrix)
+                ],
+                "num_charts": len(comparison.charts),
+                "charts": [
+                    {
+                        "hash": chart.song_id,
+                        "best": participant_ids[chart.best],
+                        "delta": chart.delta,
+                        "scores": [score and {"id": score[0], "score": score[1]} for score in chart.scores],
+                    }
+                    for chart in comparison.charts[offset : offset + limit]
+                ],
+            }
+        )
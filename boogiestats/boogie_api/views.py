@@ -9,11 +9,13 @@ import requests
 import sentry_sdk
 from django.conf import settings
 from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
 from django.views.decorators.csrf import csrf_exempt
 from requests import Request, Session
 
 from boogiestats import __version__ as boogiestats_version
 from boogiestats.boogie_api.choices import GSIntegration, GSStatus, LeaderboardSource
+from boogiestats.boogie_api.conditional import conditional_response, make_etag
 from boogiestats.boogie_api.metrics import (
     BS_SCORE_HANDLING_DURATION,
     GS_FREED_SCORES,
@@ -64,6 +66,7 @@ LB_SOURCE_MAPPING = {
     LeaderboardSource.BS.value: "BS",
     LeaderboardSource.GS.value: "GS",
 }
+LEADERBOARD_PLAYER_FIELDS = ("id", "name", "machine_tag", "leaderboard_source", "gs_integration")
 
 requests_session = Session()
 
@@ -178,10 +181,38 @@ def _request_leaderboards(request):
     should_attempt_gs = any(g != GSIntegration.SKIP for g in gs_integrations)
 
     if should_attempt_gs:
-        gs_response = _try_gs_get(request)
-    else:
-        gs_response = {}
+        return _make_leaderboards_response(request, players, _try_gs_get(request))
+
+    # without GS, leaderboards depend only on our data, so unchanged ones can be answered with 304 Not Modified
+    response = conditional_response(
+        request,
+        _leaderboards_etag(request, players),
+        lambda: _make_leaderboards_response(request, players, gs_response={}),
+        no_cache=True,
+    )
+    patch_vary_headers(response, [f"{API_KEY_HEADER_PREFIX}{player_index}" for player_index in sorted(players)])
+
+    return response
+
+
+def _leaderboards_etag(request, players):
+    chart_hashes = [player["chartHash"] for player in players.values()]
+    songs = dict(Song.objects.filter(hash__in=chart_hashes).values_list("hash", "number_of_scores"))
+    versions = [
+        (
+            player_index,
+            player["chartHash"],
+            songs.get(player["chartHash"]),
+            *(getattr(player["player_instance"], field) for field in LEADERBOARD_PLAYER_FIELDS),
+            sorted(player["player_instance"].rivals.values_list("id", flat=True)),
+        )
+        for player_index, player in sorted(players.items())
+    ]
+
+    return make_etag(request.GET.get("maxLeaderboardResults"), versions)
+
 
+def _make_leaderboards_response(request, players, gs_response):
     final_response = {}
     response_headers = {}
 
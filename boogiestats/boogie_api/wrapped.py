@@ -0,0 +1,161 @@
+"""
+Yearly "Wrapped" summaries of players.
+
+Summaries of closed years are stored in `WrappedSnapshot` once they've been computed, either on the first view or ahead
+of time by `generate_wrapped`. Summaries of the current year are cached for `BS_WRAPPED_CACHE_SECONDS`.
+"""
+
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models.functions import ExtractYear
+
+from boogiestats.boogie_api.archive import ScoreHistory
+from boogiestats.boogie_api.managers import DAILY_ACTIVITY_JUDGMENTS
+from boogiestats.boogie_api.models import WrappedSnapshot
+
+STARS = {
+    "one_star": {"itg_score__gte": 9600, "itg_score__lt": 9800},
+    "two_stars": {"itg_score__gte": 9800, "itg_score__lt": 9900},
+    "three_stars": {"itg_score__gte": 9900, "itg_score__lt": 10000},
+    # empirically `gte` is faster than equality for calculating four stars from all given scores
+    "four_stars": {"itg_score__gte": 10000},
+    "five_stars": {"ex_score": 10000},
+}
+GENERATE_CHUNK_SIZE = 50
+
+
+def is_closed(year: int) -> bool:
+    return year < datetime.date.today().year
+
+
+def get_wrapped(player_id: int, year: int) -> dict:
+    """Summary of a player's year, see `compute_wrapped`."""
+    if not is_closed(year):
+        cache_key = f"wrapped:{player_id}:{year}"
+        if (data := cache.get(cache_key)) is None:
+            data = compute_wrapped(player_id, year)
+            cache.set(cache_key, data, settings.BS_WRAPPED_CACHE_SECONDS)
+        return data
+
+    if snapshot := WrappedSnapshot.objects.filter(player_id=player_id, year=year).first():
+        return snapshot.data
+
+    data = compute_wrapped(player_id, year)
+    WrappedSnapshot.objects.update_or_create(player_id=player_id, year=year, defaults={"data": data})
+    return data
+
+
+def compute_wrapped(player_id: int, year: int) -> dict:
+    """
+    JSON-serializable summary of a player's year: counts, stars of all scores, judgment sums, streaks and ids of
+    the most played song and the highest scores. Stats that depend on scores are missing for years without any.
+    """
+    scores = ScoreHistory.of(player_id=player_id, submission_date__year=year)
+    data = {
+        "num_scores": scores.count(),
+        "num_charts_played": scores.count_distinct_songs(),
+        **{name: scores.filter(**condition).count() for name, condition in STARS.items()},
+        **{name: 0 for name in DAILY_ACTIVITY_JUDGMENTS},
+        "steps_hit": 0,
+        "total_steps": 0,
+    }
+    if not data["num_scores"]:
+        return data
+
+    # counted from scores rather than `PlayerDailyActivity`, snapshots mustn't depend on whether it's been backfilled
+    played_days = sorted(scores.plays_per("submission_day").items())
+    most_plays_day, most_plays = max(played_days, key=lambda day: day[1], default=(None, 0))
+    longest_streak, longest_streak_start = find_longest_streak([day for day, _ in played_days])
+    most_played_song_hash, most_played_song_plays = scores.plays_per("song_id").most_common(1)[0]
+    sums = scores.judgment_sums(*DAILY_ACTIVITY_JUDGMENTS)
+
+    data.update(
+        played_days=len(played_days),
+        most_plays={"plays": most_plays, "submission_day": _isoformat(most_plays_day)},
+        longest_streak=longest_streak,
+        longest_streak_start=_isoformat(longest_streak_start),
+        most_played_song=most_played_song_hash,
+        most_played_song_plays=most_played_song_plays,
+        highest_itg_score=scores.order_by("-itg_score", "submission_date").first().id,
+        highest_ex_score=scores.order_by("-ex_score", "submission_date").first().id,
+        total_steps=sum(sums.values()),
+        steps_hit=sum(sums.values()) - sums["misses"],
+        **sums,
+    )
+    return data
+
+
+def find_longest_streak(days: list[datetime.date]) -> tuple[int, Optional[datetime.date]]:
+    """Length and the first day of the longest run of consecutive days in a sorted list, the earliest one wins ties."""
+    longest_streak, longest_streak_start = 0, None
+    streak = 0
+    for i, day in enumerate(days):
+        if i and days[i - 1] == day - datetime.timedelta(days=1):
+            streak += 1
+        else:
+            streak, streak_start = 1, day
+
+        if streak > longest_streak:
+            longest_streak, longest_streak_start = streak, streak_start
+
+    return longest_streak, longest_streak_start
+
+
+def _isoformat(day: Optional[datetime.date]) -> Optional[str]:
+    return day.isoformat() if day else None
+
+
+def missing_snapshots(years: Optional[Iterable[int]] = None, force: bool = False) -> list[tuple[int, int]]:
+    """
+    Player ids and closed years with scores, optionally limited to the given years, that don't have snapshots.
+
+    Years are found in current and archived scores, which is slow, but it doesn't depend on `PlayerDailyActivity`
+    having been backfilled.
+    """
+    history = ScoreHistory.of()
+    played_years = set()
+    for scores in (history.current, history.archived):
+        scores = scores.annotate(year=ExtractYear("submission_day")).filter(year__lt=datetime.date.today().year)
+        if years is not None:
+            scores = scores.filter(year__in=years)
+        played_years.update(scores.order_by().values_list("player_id", "year").distinct())
+
+    existing = set() if force else set(WrappedSnapshot.objects.values_list("player_id", "year"))
+    return sorted(played_years - existing)
+
+
+def generate_wrapped_snapshots(pairs: list[tuple[int, int]], workers: int = 1) -> int:
+    """
+    Computes and stores snapshots of the given player ids and years.
+
+    With more than one worker, they're computed in parallel processes, which only read from the database,
+    and the snapshots are written by the calling process.
+    """
+    chunks = [pairs[i : i + GENERATE_CHUNK_SIZE] for i in range(0, len(pairs), GENERATE_CHUNK_SIZE)]
+    if workers > 1:
+        connections.close_all()  # forked workers must not share connections of the parent
+        # `django.setup` is required by the `spawn` start method, it's a no-op in forked workers
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+            return sum(_store(snapshots) for snapshots in executor.map(_compute_chunk, chunks))
+
+    return sum(_store(_compute_chunk(chunk)) for chunk in chunks)
+
+
+def _compute_chunk(pairs):
+    return [(player_id, year, compute_wrapped(player_id, year)) for player_id, year in pairs]
+
+
+def _store(snapshots) -> int:
+    WrappedSnapshot.objects.bulk_create(
+        [WrappedSnapshot(player_id=player_id, year=year, data=data) for player_id, year, data in snapshots],
+        update_conflicts=True,
+        unique_fields=["player", "year"],
+        update_fields=["data", "generated_at"],
+    )
+    return len(snapshots)
@@ -1,9 +1,18 @@
 from django import forms
+from django.utils.encoding import uri_to_iri
 from formset.renderers.bootstrap import FormRenderer
 from formset.utils import FormMixin
 from formset.widgets import DualSelector
 
 from boogiestats.boogie_api.models import Player
+from boogiestats.boogie_api.player_search import player_search_q
+
+
+class PlayerDualSelector(DualSelector):
+    """Searches rivals using the player search index instead of scanning all players."""
+
+    def build_search_query(self, search_term):
+        return player_search_q(uri_to_iri(search_term), fields=("name", "machine_tag"))
 
 
 class EditPlayerForm(FormMixin, forms.ModelForm):
@@ -17,7 +26,7 @@ class EditPlayerForm(FormMixin, forms.ModelForm):
     )
     rivals = forms.models.ModelMultipleChoiceField(
         queryset=Player.objects.all(),
-        widget=DualSelector(search_lookup=["name__icontains", "machine_tag__icontains"]),
+        widget=PlayerDualSelector(),
         required=False,
     )
 
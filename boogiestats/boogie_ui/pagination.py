@@ -0,0 +1,134 @@
+"""
+Keyset pagination of long lists, e.g. score histories, leaderboards and lists of players.
+
+Instead of an offset, a cursor holds the ordering values of the row that the page starts after (or ends before, when
+going backwards), so every page is a single query filtered by these values and limited to the page size, no matter how
+deep it is. Cursors are signed, so the page numbers that they carry can be trusted.
+"""
+
+import datetime
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Optional
+
+from django.core import signing
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+from django.http import Http404
+
+from boogiestats.boogie_api.archive import ScoreHistory
+
+CURSOR_PARAMETER = "cursor"
+CURSOR_SALT = "boogiestats.boogie_ui.pagination"
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime.datetime) else value  # lookups parse it back
+
+
+@dataclass(frozen=True)
+class Cursor:
+    number: int = 1
+    key: Optional[tuple] = None  # ordering values of the row next to the page, `None` for the first page
+    backwards: bool = False
+
+    def encode(self) -> str:
+        key = None if self.key is None else [_json_value(value) for value in self.key]
+        return signing.dumps([self.number, key, self.backwards], salt=CURSOR_SALT, compress=True)
+
+    @classmethod
+    def decode(cls, value: Optional[str]) -> "Cursor":
+        if not value:
+            return cls()
+
+        try:
+            number, key, backwards = signing.loads(value, salt=CURSOR_SALT)
+        except (signing.BadSignature, TypeError, ValueError):
+            raise Http404("Invalid cursor")
+
+        return cls(number, None if key is None else tuple(key), backwards)
+
+
+def _reversed(field: str) -> str:
+    return field[1:] if field.startswith("-") else f"-{field}"
+
+
+def keyset_q(ordering: Sequence[str], key: Sequence, backwards: bool = False) -> Q:
+    """Filter of rows that come after the key in the given ordering, or before it when going backwards."""
+    q = Q()
+    equal = {}
+    for field, value in zip(ordering, key):
+        name = field.lstrip("-")
+        descending = field.startswith("-") != backwards
+        q |= Q(**equal, **{f"{name}__{'lt' if descending else 'gt'}": value})
+        equal[name] = value
+
+    return q
+
+
+class KeysetPage(Sequence):
+    """Quacks like Django's `Page` for the templates, with cursors of the neighbouring pages instead of their numbers."""
+
+    is_keyset = True
+
+    def __init__(self, object_list, number, ordering, has_previous, has_next):
+        self.object_list = object_list
+        self.number = number
+        self._ordering = ordering
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+
+    def _key(self, row) -> tuple:
+        return tuple(getattr(row, field.lstrip("-")) for field in self._ordering)
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        if self._has_previous:
+            return Cursor(self.number - 1, self._key(self.object_list[0]), backwards=True).encode()
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if self._has_next:
+            return Cursor(self.number + 1, self._key(self.object_list[-1])).encode()
+
+
+def keyset_page(queryset, cursor: Cursor, per_page: int) -> KeysetPage:
+    """
+    Page of an ordered queryset, or a `ScoreHistory`, pointed to by the cursor.
+
+    The ordering must consist of plain field or annotation names and be total, i.e. end with a unique field.
+    """
+    ordering = tuple(queryset.ordering if isinstance(queryset, ScoreHistory) else queryset.query.order_by)
+    if not ordering or not all(isinstance(field, str) for field in ordering):
+        raise ImproperlyConfigured("Keyset pagination requires ordering by field names")
+
+    if cursor.key is not None:
+        queryset = queryset.filter(keyset_q(ordering, cursor.key, cursor.backwards))
+    if cursor.backwards:
+        queryset = queryset.order_by(*(_reversed(field) for field in ordering))
+
+    rows = list(queryset[: per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if not cursor.backwards:
+        return KeysetPage(rows, cursor.number, ordering, has_previous=cursor.number > 1, has_next=has_more)
+
+    rows.reverse()
+    number = cursor.number if has_more else 1  # there's nothing before, the page has become the first one
+    return KeysetPage(rows, number, ordering, has_previous=has_more, has_next=True)
@@ -0,0 +1,65 @@
+from django.urls import reverse
+
+from boogiestats.boogie_api.models import GSStatus
+
+
+def revalidate(client, url, response, **extra):
+    return client.get(url, HTTP_IF_NONE_MATCH=response.headers["ETag"], **extra)
+
+
+def test_player_page_is_not_modified_until_a_new_score(client, player, song):
+    url = reverse("player", kwargs={"player_id": player.id})
+    response = client.get(url)
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    assert revalidate(client, url, response).status_code == 304
+
+    player.scores.create(song=song, itg_score=9000, comment="", rate=100)
+    assert revalidate(client, url, response).status_code == 200
+
+
+def test_player_page_changes_with_rivals(client, player, rival1):
+    url = reverse("player", kwargs={"player_id": rival1.id})
+    response = client.get(url)
+
+    player.rivals.remove(rival1)
+
+    assert revalidate(client, url, response).status_code == 200
+
+
+def test_song_page_depends_on_leaderboard_source_and_user(client, player, song):
+    url = reverse("song", kwargs={"song_hash": song.hash})
+    response = client.get(url)
+    assert revalidate(client, url, response).status_code == 304
+
+    client.cookies["bs_leaderboard"] = "ex"
+    assert revalidate(client, url, response).status_code == 200
+
+    client.force_login(player.user)
+    assert revalidate(client, url, response).status_code == 200
+
+
+def test_song_page_depends_on_theme(client, song):
+    url = reverse("song", kwargs={"song_hash": song.hash})
+    response = client.get(url)
+
+    client.cookies["bs_theme"] = "dark"
+
+    assert revalidate(client, url, response).status_code == 200
+
+
+def test_score_page_changes_with_gs_status(client, player, song):
+    score = player.scores.create(song=song, itg_score=10, comment="", rate=100, gs_status=GSStatus.ERROR)
+    url = reverse("score", kwargs={"pk": score.id})
+    client.force_login(player.user)
+    before = client.get(url)
+
+    client.post(reverse("mark_score_as_gs_submitted", kwargs={"pk": score.id}))
+    response = revalidate(client, url, before)
+
+    assert response.status_code == 200
+    assert "Score marked as successfully submitted to GS." in response.content.decode()
+    assert "ETag" not in response.headers  # pages with messages are never reused
+    after = client.get(url)
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert revalidate(client, url, after).status_code == 304
@@ -0,0 +1,80 @@
+import threading
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from prometheus_client import REGISTRY
+
+from boogiestats.boogie_api import page_cache
+from boogiestats.boogie_api.page_cache import song_tag
+
+
+def page_cache_requests(view, result):
+    return REGISTRY.get_sample_value("boogiestats_page_cache_requests_total", {"view": view, "result": result}) or 0
+
+
+def test_song_page_is_cached_until_a_new_score(client, player, song, django_assert_max_num_queries):
+    url = reverse("song", kwargs={"song_hash": song.hash})
+    hits = page_cache_requests("song", "hit")
+    client.get(url)
+
+    with django_assert_max_num_queries(2):  # session and user lookups at most
+        response = client.get(url)
+    assert page_cache_requests("song", "hit") == hits + 1
+    assert "90.00" not in response.content.decode()
+
+    player.scores.create(song=song, itg_score=9000, comment="", rate=100)
+
+    assert "90.00" in client.get(url).content.decode()
+
+
+def test_player_page_is_invalidated_by_profile_and_rival_changes(client, player, rival1):
+    url = reverse("player", kwargs={"player_id": rival1.id})
+    client.get(url)
+
+    rival1.name = "Renamed"
+    rival1.save()
+    assert "Renamed" in client.get(url).content.decode()
+
+    misses = page_cache_requests("player", "miss")
+    player.rivals.remove(rival1)
+    client.get(url)
+    assert page_cache_requests("player", "miss") == misses + 1
+
+
+def test_pages_are_cached_per_theme(client, song):
+    url = reverse("song", kwargs={"song_hash": song.hash})
+    client.cookies["bs_theme"] = "dark"
+    client.get(url)
+
+    client.cookies["bs_theme"] = "light"
+    assert 'data-bs-theme="light"' in client.get(url).content.decode()
+    client.cookies["bs_theme"] = "dark"
+    assert 'data-bs-theme="dark"' in client.get(url).content.decode()
+
+
+def test_pages_of_signed_in_players_are_not_cached(client, player, song):
+    url = reverse("song", kwargs={"song_hash": song.hash})
+    client.get(url)
+    client.force_login(player.user)
+    hits = page_cache_requests("song", "hit")
+
+    client.get(url)
+
+    assert page_cache_requests("song", "hit") == hits
+
+
+def test_concurrent_requests_wait_for_the_page_being_rendered(client, song):
+    url = reverse("song", kwargs={"song_hash": song.hash})
+    request = RequestFactory().get(url)
+    request.resolver_match = resolve(url)
+    key = page_cache._page_key(request, [song_tag(song.hash)])
+    cache.add(f"{key}:lock", True)
+    timer = threading.Timer(0.2, cache.set, (key, HttpResponse("rendered by another request")))
+    timer.start()
+
+    response = client.get(url)
+
+    timer.join()
+    assert response.content == b"rendered by another request"
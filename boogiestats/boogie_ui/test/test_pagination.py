@@ -0,0 +1,82 @@
+import datetime
+
+from django.urls import reverse
+from django.utils.timezone import now
+
+from boogiestats.boogie_api.archive import archive_scores
+from boogiestats.boogie_api.models import ArchivedScore, Player
+from boogiestats.boogie_ui.pagination import Cursor
+from boogiestats.boogie_ui.views import ENTRIES_PER_PAGE
+
+
+def pages(client, url, direction="next"):
+    cursor = ""
+    while True:
+        response = client.get(url, {"cursor": cursor} if cursor else {})
+        yield response
+        cursor = getattr(response.context["page_obj"], f"{direction}_cursor")
+        if not cursor:
+            return
+
+
+def test_player_history_pages_cover_current_and_archived_scores(client, player, song):
+    for i in range(70):
+        player.scores.create(song=song, itg_score=i, comment="", rate=100)
+    archive_scores(now() + datetime.timedelta(days=1))
+    assert ArchivedScore.objects.exists()
+    client.force_login(player.user)
+
+    responses = list(pages(client, reverse("player", kwargs={"player_id": player.id})))
+
+    ids = [score.id for response in responses for score in response.context["scores"]]
+    assert len(ids) == 72
+    assert ids == sorted(ids, reverse=True)
+    assert [response.context["page_obj"].number for response in responses] == [1, 2, 3]
+
+    response = client.get(
+        reverse("player", kwargs={"player_id": player.id}), {"cursor": responses[2].context["page_obj"].previous_cursor}
+    )
+    assert list(response.context["scores"]) == list(responses[1].context["scores"])
+    assert response.context["page_obj"].number == 2
+
+
+def test_pages_are_stable_across_new_scores(client, player, song):
+    for i in range(ENTRIES_PER_PAGE):
+        player.scores.create(song=song, itg_score=5000, comment="", rate=100)
+    url = reverse("song", kwargs={"song_hash": song.hash})
+    first_page = client.get(url)
+
+    player.scores.create(song=song, itg_score=9999, comment="", rate=100)
+    second_page = client.get(url, {"cursor": first_page.context["page_obj"].next_cursor})
+
+    shown = [score.id for score in first_page.context["scores"]] + [score.id for score in second_page.context["scores"]]
+    assert len(shown) == len(set(shown)) == ENTRIES_PER_PAGE + 1  # the new top score is before the cursor
+
+
+def test_players_by_name_are_paginated_case_insensitively(client):
+    for i, name in enumerate(["b", "A", "a", "C"] * (ENTRIES_PER_PAGE // 2)):
+        Player.objects.create(gs_api_key=f"key{i}", machine_tag="TAG", name=name)
+
+    responses = list(pages(client, reverse("players_by_name")))
+
+    names = [player.name.lower() for response in responses for player in response.context["players"]]
+    assert names == sorted(names)
+    assert len(names) == 2 * ENTRIES_PER_PAGE
+
+
+def test_deep_pages_require_login(client, player):
+    url = reverse("player", kwargs={"player_id": player.id})
+    cursor = Cursor(number=4, key=(player.latest_score_id,)).encode()
+
+    response = client.get(url, {"cursor": cursor})
+
+    assert response.status_code == 302
+    assert response.url.startswith(reverse("login"))
+    client.force_login(player.user)
+    assert client.get(url, {"cursor": cursor}).status_code == 200
+
+
+def test_tampered_cursor_is_404(client, player):
+    response = client.get(reverse("player", kwargs={"player_id": player.id}), {"cursor": "1:abc"})
+
+    assert response.status_code == 404
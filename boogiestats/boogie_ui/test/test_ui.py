@@ -1,7 +1,11 @@
+import datetime
+
 import pytest
 from django.urls import reverse
+from django.utils.formats import date_format
 
-from boogiestats.boogie_api.models import GSStatus, Score
+from boogiestats.boogie_api.models import GSStatus, Score, Song
+from boogiestats.boogie_ui import views
 
 
 def test_successful_login(client, player):
@@ -117,3 +121,44 @@ def test_marking_score_as_submitted_to_gs_for_owned_scores(client, player):
     assert response.request["PATH_INFO"] == reverse("score", kwargs={"pk": score.pk})
     assert score.gs_status == GSStatus.OK
     assert "Score marked as successfully submitted to GS" in response.content.decode()
+
+
+def test_versus_compares_top_scores_in_sql(client, player, rival1, other_song, django_assert_max_num_queries):
+    third_song = Song.objects.create(hash="thirdsong")
+    player.scores.create(song=third_song, itg_score=9000, comment="", rate=100)
+    rival1.scores.create(song=other_song, itg_score=6666, comment="", rate=100)
+    rival1.scores.create(song=third_song, itg_score=8000, comment="", rate=100)
+    rival1.scores.create(song=third_song, itg_score=9500, comment="", rate=100)
+    client.force_login(player.user)
+
+    with django_assert_max_num_queries(12):
+        response = client.get(reverse("versus", kwargs={"p1": player.id, "p2": rival1.id}))
+
+    context = response.context
+    assert (context["common_charts"], context["p1_wins"], context["p2_wins"], context["ties"]) == (3, 1, 1, 1)
+    assert [(p1.itg_score, p2.itg_score) for p1, p2 in context["scores"]] == [(9000, 9500), (6666, 6666), (6442, 4553)]
+
+    response = client.get(reverse("versus_by_difference", kwargs={"p1": player.id, "p2": rival1.id}))
+    assert [(p1.itg_score, p2.itg_score) for p1, p2 in response.context["scores"]] == [
+        (6442, 4553),
+        (6666, 6666),
+        (9000, 9500),
+    ]
+
+
+def test_calendar_is_shared_by_subpages_until_plays_change(client, monkeypatch, player, song):
+    plays_per_day = views.plays_per_day
+    rendered = []
+    monkeypatch.setattr(views, "plays_per_day", lambda *args: rendered.append(args) or plays_per_day(*args))
+    client.force_login(player.user)  # bypasses the page cache
+
+    client.get(reverse("player", kwargs={"player_id": player.id}))
+    response = client.get(reverse("player_most_played", kwargs={"player_id": player.id}))
+    assert len(rendered) == 1
+    assert f'title="{date_format(datetime.date.today())}: 2"' in response.content.decode()
+
+    player.scores.create(song=song, itg_score=9000, comment="", rate=100)
+    response = client.get(reverse("player_highscores", kwargs={"player_id": player.id}))
+
+    assert len(rendered) == 2
+    assert f'title="{date_format(datetime.date.today())}: 3"' in response.content.decode()
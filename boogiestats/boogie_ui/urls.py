@@ -22,6 +22,7 @@ urlpatterns = [
     path("players/<int:player_id>/remove_rival", views.remove_rival, name="remove_rival"),
     path("players/<int:player_id>/day/today", views.PlayerScoresTodayView.as_view(), name="player_scores_today"),
     path("players/<int:player_id>/day/<str:day>", views.PlayerScoresByDayView.as_view(), name="player_scores_by_day"),
+    path("players/<int:player_id>/rivals", views.PlayerRivalsView.as_view(), name="player_rivals"),
     path("players/<int:p1>/vs/<int:p2>/", views.VersusView.as_view(), name="versus"),
     path(
         "players/<int:p1>/vs_by_difference/<int:p2>/",
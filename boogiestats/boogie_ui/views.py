@@ -1,4 +1,6 @@
 import datetime
+import functools
+import hashlib
 import itertools
 from collections import defaultdict
 from http.client import OK, UNAUTHORIZED
@@ -9,38 +11,63 @@ from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, Q, Sum
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db.models import Count, F, Max, Q, Sum
 from django.db.models.functions import Lower
-from django.http import HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
 from django.template.response import TemplateResponse
 from django.urls import reverse
-from django.utils.http import url_has_allowed_host_and_scheme
+from django.utils import translation
+from django.utils.functional import cached_property
+from django.utils.http import url_has_allowed_host_and_scheme, urlencode
 from django.views import generic
 from django.views.decorators.http import require_POST
 from formset.views import FormViewMixin, IncompleteSelectResponseMixin
-from redis import ResponseError
-from redis.commands.search.query import Query
-
-from boogiestats.boogie_api.models import GSStatus, Player, Score, Song
-from boogiestats.boogie_api.utils import (
-    get_chart_info,
-    get_pack_info,
-    get_redis,
-    set_sentry_user,
+
+from boogiestats.boogie_api.archive import ScoreHistory
+from boogiestats.boogie_api.chart_db import get_chart_infos
+from boogiestats.boogie_api.chart_metadata import STEPS_TYPE_MAPPING, diff_sort_key
+from boogiestats.boogie_api.conditional import conditional_response, make_etag
+from boogiestats.boogie_api.models import (
+    ArchivedScore,
+    GSStatus,
+    PackSummary,
+    Player,
+    PlayerDailyActivity,
+    Score,
+    SiteStatistics,
+    Song,
+)
+from boogiestats.boogie_api.page_cache import (
+    FEED_TAG,
+    cached_page,
+    player_tag,
+    score_tag,
+    song_tag,
 )
+from boogiestats.boogie_api.player_search import player_search_q
+from boogiestats.boogie_api.rivals import compare_with_rivals
+from boogiestats.boogie_api.search import (
+    DEFAULT_SORT,
+    SORT_OPTIONS,
+    SearchError,
+    get_search_backend,
+)
+from boogiestats.boogie_api.utils import set_sentry_user
+from boogiestats.boogie_api.wrapped import get_wrapped
 from boogiestats.boogie_ui.forms import EditPlayerForm
+from boogiestats.boogie_ui.pagination import CURSOR_PARAMETER, Cursor, keyset_page
 from boogiestats.boogiestats.exceptions import Managed404Error
 
 ENTRIES_PER_PAGE = 30
 CALENDAR_VALUES = (1, 10, 15, 20, 25, 30, 35, 40, 50, 60)
 EXTRA_CALENDAR_VALUES = (100,)
+CALENDAR_CACHE_SECONDS = 24 * 60 * 60  # fragments of outdated versions just expire
 
-STEPS_TYPE_MAPPING = {"dance-single": "Singles", "dance-double": "Doubles", "dance-couple": "Couples"}
-STEPS_TYPE_ORDER = defaultdict(lambda: 999)
-STEPS_TYPE_ORDER.update({"dance-single": 0, "dance-double": 1})
-DIFF_ORDER = defaultdict(lambda: 999)
-DIFF_ORDER.update({"Beginner": 0, "Easy": 1, "Medium": 2, "Hard": 3, "Challenge": 4, "Edit": 5})
+SUMMED_JUDGMENTS = ("fantastics_plus", "fantastics", "excellents", "greats", "decents", "way_offs", "misses")
 
 SOCIAL_LINKS = {
     "twitch_handle": "https://twitch.tv/{handle}",
@@ -54,17 +81,23 @@ CUSTOM_SOCIAL_LINKS = {
 }
 
 
-def diff_sort_key(x):
-    return STEPS_TYPE_ORDER[x["steps_type"]], int(x["diff_number"]), DIFF_ORDER[x["diff"]]
+class KeysetPaginationMixin:
+    """Paginates with cursors (`?cursor=...`) instead of page numbers, see `boogie_ui.pagination`."""
+
+    def get_cursor(self) -> Cursor:
+        return Cursor.decode(self.request.GET.get(CURSOR_PARAMETER))
 
+    def paginate_queryset(self, queryset, page_size):
+        page = keyset_page(queryset, self.get_cursor(), page_size)
+        return None, page, page.object_list, page.has_other_pages()
 
-class RequireAuthForPaginationMixin:
+
+class RequireAuthForPaginationMixin(KeysetPaginationMixin):
     PAGES_FOR_ANONYMOUS = 3
 
     def dispatch(self, request, *args, **kwargs):
-        page_num = int(request.GET.get("page", 1))
-        if page_num > self.PAGES_FOR_ANONYMOUS and not request.user.is_authenticated:
-            return redirect(f"{reverse('login')}?next={request.path}?page={page_num}")
+        if self.get_cursor().number > self.PAGES_FOR_ANONYMOUS and not request.user.is_authenticated:
+            return redirect(f"{reverse('login')}?{urlencode({'next': request.get_full_path()})}")
 
         return super().dispatch(request, *args, **kwargs)
 
@@ -90,21 +123,88 @@ class LeaderboardSourceMixin:
         return context
 
 
-def set_stars_from_top_scores(context, scores, prefix=""):
-    context[f"{prefix}one_star"] = scores.filter(is_itg_top=True, itg_score__gte=9600, itg_score__lt=9800).count()
-    context[f"{prefix}two_stars"] = scores.filter(is_itg_top=True, itg_score__gte=9800, itg_score__lt=9900).count()
-    context[f"{prefix}three_stars"] = scores.filter(is_itg_top=True, itg_score__gte=9900, itg_score__lt=10000).count()
-    context[f"{prefix}four_stars"] = scores.filter(is_itg_top=True, itg_score=10000).count()
-    context[f"{prefix}five_stars"] = scores.filter(is_ex_top=True, ex_score=10000).count()
+class PageCacheMixin:
+    """Caches pages for anonymous visitors until any of the objects named by `get_page_tags()` changes."""
+
+    def get_page_tags(self) -> list[str]:
+        raise NotImplementedError
+
+    def dispatch(self, request, *args, **kwargs):
+        get_response = functools.partial(super().dispatch, request, *args, **kwargs)
+        if (
+            not settings.BS_PAGE_CACHE_SECONDS
+            or request.method != "GET"
+            or request.user.is_authenticated
+            or get_messages(request)
+        ):
+            return get_response()
+
+        return cached_page(request, self.get_page_tags(), get_response)
+
+
+class ConditionalPageMixin:
+    """
+    Answers requests for pages that the client has seen already with 304 Not Modified, without rendering them again.
+
+    `get_page_version()` has to be cheap and change whenever the page does. Names of other players and play counts of
+    other charts aren't covered, they're refreshed with the next relevant score.
+    """
+
+    def get_page_version(self) -> tuple:
+        raise NotImplementedError
+
+    def dispatch(self, request, *args, **kwargs):
+        if get_messages(request):  # pending messages have to be rendered
+            return super().dispatch(request, *args, **kwargs)
+
+        etag = make_etag(
+            request.user.pk,
+            request.COOKIES.get("bs_leaderboard"),
+            request.COOKIES.get("bs_theme"),
+            datetime.date.today(),  # e.g. calendars end today
+            *self.get_page_version(),
+        )
+        get_response = functools.partial(super().dispatch, request, *args, **kwargs)
+
+        return conditional_response(request, etag, get_response, private=True, no_cache=True)
+
+
+class PrefetchChartInfoMixin:
+    """Loads chart info of all songs shown on a page in a single batch instead of one row at a time."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        Song.prefetch_chart_infos(self.get_page_songs(context))
+
+        return context
+
+    def get_page_songs(self, context):
+        return [score.song for score in context[self.context_object_name]]
+
 
+class DiffNumberFilterMixin:
+    """Narrows the results down to a single difficulty (`?diff_number=13`) based on ingested chart metadata."""
 
-def set_stars_from_all_scores(context, scores, prefix=""):
-    context[f"{prefix}one_star"] = scores.filter(itg_score__gte=9600, itg_score__lt=9800).count()
-    context[f"{prefix}two_stars"] = scores.filter(itg_score__gte=9800, itg_score__lt=9900).count()
-    context[f"{prefix}three_stars"] = scores.filter(itg_score__gte=9900, itg_score__lt=10000).count()
-    # empirically `gte` is faster than equality for calculating four stars from all given scores
-    context[f"{prefix}four_stars"] = scores.filter(itg_score__gte=10000).count()
-    context[f"{prefix}five_stars"] = scores.filter(ex_score=10000).count()
+    diff_number_lookup = "metadata__diff_number"
+
+    @cached_property
+    def diff_number(self):
+        try:
+            return int(self.request.GET["diff_number"])
+        except (KeyError, ValueError):
+            return None
+
+    def filter_diff_number(self, queryset):
+        if self.diff_number is None:
+            return queryset
+
+        return queryset.filter(**{self.diff_number_lookup: self.diff_number})
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["diff_number"] = self.diff_number
+
+        return context
 
 
 def set_stars_from_player(context, player, prefix=""):
@@ -120,37 +220,53 @@ class IndexView(LeaderboardSourceMixin, generic.ListView):
     context_object_name = "latest_scores"
 
     def get_queryset(self):
-        return Score.objects.order_by("-submission_date").select_related("song", "player")[:5]
+        return Score.objects.order_by("-submission_date").select_related("song", "player", "judgment_counts")[:5]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        context["n_songs"] = Song.objects.count()
-        context["n_scores"] = Score.objects.count()
-        context["n_players"] = Player.objects.count()
-        context["recent_activity"] = Player.objects.order_by("-latest_score__submission_date").select_related(
-            "latest_score", "latest_score__song"
-        )[:5]
+        statistics = SiteStatistics.get()
+        context["n_songs"] = statistics.num_songs
+        context["n_scores"] = statistics.num_scores
+        context["n_players"] = statistics.num_players
+        context["recent_activity"] = list(
+            SiteStatistics.recent_players().select_related(
+                "latest_score", "latest_score__song", "latest_score__judgment_counts"
+            )
+        )
+
+        Song.prefetch_chart_infos(
+            [score.song for score in context["latest_scores"]]
+            + [player.latest_score.song for player in context["recent_activity"] if player.latest_score]
+        )
 
         return context
 
 
-class ScoreListView(RequireAuthForPaginationMixin, LeaderboardSourceMixin, generic.ListView):
+class ScoreListView(
+    PrefetchChartInfoMixin, RequireAuthForPaginationMixin, PageCacheMixin, LeaderboardSourceMixin, generic.ListView
+):
     template_name = "boogie_ui/scores.html"
     context_object_name = "scores"
     paginate_by = ENTRIES_PER_PAGE
 
+    def get_page_tags(self):
+        return [FEED_TAG]
+
     def get_queryset(self):
-        return Score.objects.order_by("-submission_date").prefetch_related("song", "player")
+        return ScoreHistory.of().order_by("-submission_date", "-id").prefetch_related("song", "player")
 
 
-class PlayersListView(generic.ListView):
+class PlayersListView(KeysetPaginationMixin, PageCacheMixin, generic.ListView):
     template_name = "boogie_ui/players.html"
     context_object_name = "players"
     paginate_by = ENTRIES_PER_PAGE
 
+    def get_page_tags(self):
+        return [FEED_TAG]
+
     def get_queryset(self):
-        return Player.objects.filter(name__icontains=self._get_user_query()).order_by("id")
+        return Player.objects.filter(player_search_q(self._get_user_query())).order_by("id")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -168,32 +284,40 @@ class PlayersListView(generic.ListView):
 
 class PlayersByNameListView(PlayersListView):
     def get_queryset(self):
-        return Player.objects.filter(name__icontains=self._get_user_query()).order_by(Lower("name"))
+        return (
+            Player.objects.filter(player_search_q(self._get_user_query()))
+            .annotate(lower_name=Lower("name"))
+            .order_by("lower_name", "id")
+        )
 
 
 class PlayersByMachineTagListView(PlayersListView):
     def get_queryset(self):
-        return Player.objects.filter(name__icontains=self._get_user_query()).order_by(Lower("machine_tag"))
+        return (
+            Player.objects.filter(player_search_q(self._get_user_query()))
+            .annotate(lower_machine_tag=Lower("machine_tag"))
+            .order_by("lower_machine_tag", "id")
+        )
 
 
 class PlayersByScoresListView(PlayersListView):
     def get_queryset(self):
-        return Player.objects.filter(name__icontains=self._get_user_query()).order_by("-num_scores")
+        return Player.objects.filter(player_search_q(self._get_user_query())).order_by("-num_scores", "id")
 
 
 class PlayersByQuadsListView(PlayersListView):
     def get_queryset(self):
-        return Player.objects.filter(name__icontains=self._get_user_query()).order_by("-four_stars", "id")
+        return Player.objects.filter(player_search_q(self._get_user_query())).order_by("-four_stars", "id")
 
 
 class PlayersByQuintsListView(PlayersListView):
     def get_queryset(self):
-        return Player.objects.filter(name__icontains=self._get_user_query()).order_by("-five_stars", "id")
+        return Player.objects.filter(player_search_q(self._get_user_query())).order_by("-five_stars", "id")
 
 
 class PlayersBySongsListView(PlayersListView):
     def get_queryset(self):
-        return Player.objects.filter(name__icontains=self._get_user_query()).order_by("-num_songs", "id")
+        return Player.objects.filter(player_search_q(self._get_user_query())).order_by("-num_songs", "id")
 
 
 def plays_to_class(plays):
@@ -205,7 +329,7 @@ def plays_to_class(plays):
     return f"min-plays-{class_suffix}"
 
 
-class PlayerScoresByDayView(LeaderboardSourceMixin, generic.ListView):
+class PlayerScoresByDayView(PrefetchChartInfoMixin, LeaderboardSourceMixin, generic.ListView):
     template_name = "boogie_ui/scores_by_day.html"
     context_object_name = "scores"
     paginate_by = ENTRIES_PER_PAGE
@@ -216,36 +340,15 @@ class PlayerScoresByDayView(LeaderboardSourceMixin, generic.ListView):
         player_id = self.kwargs["player_id"]
         player = Player.get_or_404(id=player_id)
         day = datetime.date.fromisoformat(self.kwargs["day"])
-        scores = player.scores.filter(submission_day=day)
+        activity = player.daily_activity.filter(day=day).first() or PlayerDailyActivity(player=player, day=day)
         context["day"] = day
         context["player"] = player
-        context["num_scores"] = scores.count()
-        context["num_charts_played"] = scores.values("song").distinct().count()
-        set_stars_from_top_scores(context, scores)
-        context.update(
-            fantastics_plus=0,
-            fantastics=0,
-            excellents=0,
-            greats=0,
-            decents=0,
-            way_offs=0,
-            misses=0,
-            steps_hit=0,
-        )
-
-        if context["num_scores"]:
-            sums = scores.aggregate(
-                fantastics_plus=Sum("fantastics_plus"),
-                fantastics=Sum("fantastics"),
-                excellents=Sum("excellents"),
-                greats=Sum("greats"),
-                decents=Sum("decents"),
-                way_offs=Sum("way_offs"),
-                misses=Sum("misses"),
-            )
-            context["steps_hit"] = sum(sums.values()) - sums["misses"]
-            context["total_steps"] = sum(sums.values())
-            context.update(sums)
+        context["num_scores"] = activity.plays
+        context["num_charts_played"] = activity.charts_played
+        set_stars_from_player(context, activity)  # the rollup holds stars of top scores as well
+        context.update({name: getattr(activity, name) for name in SUMMED_JUDGMENTS})
+        context["steps_hit"] = activity.steps_hit
+        context["total_steps"] = activity.total_steps
 
         return context
 
@@ -253,7 +356,7 @@ class PlayerScoresByDayView(LeaderboardSourceMixin, generic.ListView):
         player_id = self.kwargs["player_id"]
         player = Player.get_or_404(id=player_id)
         day = datetime.date.fromisoformat(self.kwargs["day"])
-        scores = player.scores.filter(submission_day=day)
+        scores = ScoreHistory.of(player=player, submission_day=day)
 
         return scores.order_by("-submission_date").prefetch_related("song")
 
@@ -265,16 +368,37 @@ class PlayerScoresTodayView(generic.RedirectView):
         )
 
 
-def set_calendar(context, start_date, end_date, played_days):
-    calendar_days = list(
-        {"class": "min-plays-0", "plays": 0, "day": start_date + datetime.timedelta(days=i)}
-        for i in range((end_date - start_date).days + 1)
+def played_days_version(player_id, start_date, end_date):
+    """Changes whenever daily counts of plays in the range do, it's a single aggregate over the rollup."""
+    return tuple(
+        PlayerDailyActivity.objects.filter(player_id=player_id, day__range=(start_date, end_date))
+        .aggregate(Count("id"), Sum("plays"), Max("last_submission"))
+        .values()
     )
-    for day in played_days:
-        day_index = (day["submission_day"] - start_date).days
-        plays = day["plays"]
-        calendar_days[day_index]["plays"] = plays
-        calendar_days[day_index]["class"] = plays_to_class(plays)
+
+
+def plays_per_day(player_id, start_date, end_date):
+    plays = [0] * ((end_date - start_date).days + 1)
+    for day, day_plays in PlayerDailyActivity.objects.filter(
+        player_id=player_id, day__range=(start_date, end_date)
+    ).values_list("day", "plays"):
+        plays[(day - start_date).days] = day_plays
+
+    return plays
+
+
+def render_calendar(player_id, start_date, end_date):
+    """
+    Calendar of plays of a player, the fragment is cached until counts of plays in the range change, so it's shared
+    by all subpages of the player.
+    """
+    version = (translation.get_language(), played_days_version(player_id, start_date, end_date))
+    key = f"calendar:{player_id}:{start_date}:{end_date}:{hashlib.sha256(repr(version).encode()).hexdigest()}"
+    if (fragment := cache.get(key)) is not None:
+        return fragment
+
+    plays = plays_per_day(player_id, start_date, end_date)
+    classes = {count: plays_to_class(count) for count in set(plays)}
 
     # sometimes it looks better to repeat the month at both ends
     num_months = 13 if start_date.day > 4 else 12
@@ -283,25 +407,58 @@ def set_calendar(context, start_date, end_date, played_days):
     for _ in range(start_date.month - 1):
         next(months_iterator)
 
-    context.update(
+    fragment = render_to_string(
+        "boogie_ui/calendar.html",
         {
-            "start_date": start_date,
+            "player_id": player_id,
             "skip_days_range": range(start_date.timetuple().tm_wday),
-            "calendar_days": calendar_days,
+            "calendar_days": (
+                (start_date + datetime.timedelta(days=i), count, classes[count]) for i, count in enumerate(plays)
+            ),
             "months": list(next(months_iterator) for _ in range(num_months)),
             "days": ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"),
             "calendar_legend": tuple(
                 [("0", "min-plays-0")] + [(f"{number}+", f"min-plays-{number}") for number in CALENDAR_VALUES]
             ),
-        }
+        },
     )
+    cache.set(key, fragment, CALENDAR_CACHE_SECONDS)
 
+    return fragment
 
-class PlayerView(RequireAuthForPaginationMixin, LeaderboardSourceMixin, generic.ListView):
+
+class PlayerView(
+    PrefetchChartInfoMixin,
+    RequireAuthForPaginationMixin,
+    PageCacheMixin,
+    ConditionalPageMixin,
+    LeaderboardSourceMixin,
+    generic.ListView,
+):
     template_name = "boogie_ui/player.html"
     context_object_name = "scores"
     paginate_by = ENTRIES_PER_PAGE
 
+    def get_page_tags(self):
+        return [player_tag(self.kwargs["player_id"])]
+
+    def get_page_version(self):
+        player_id = self.kwargs["player_id"]
+        rivalries = Player.rivals.through.objects.filter(Q(from_player_id=player_id) | Q(to_player_id=player_id))
+        gs_statuses = (
+            Score.objects.filter(player_id=player_id)
+            .exclude(gs_status=GSStatus.OK)
+            .order_by()
+            .values_list("gs_status")
+            .annotate(Count("id"))
+        )
+
+        return (
+            Player.objects.filter(id=player_id).values().first(),  # latest score, stars and profile
+            sorted(rivalries.values_list("from_player_id", "to_player_id")),
+            sorted(gs_statuses),
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
@@ -314,13 +471,7 @@ class PlayerView(RequireAuthForPaginationMixin, LeaderboardSourceMixin, generic.
 
         today = datetime.date.today()
         a_year_ago = today - datetime.timedelta(days=365)  # today.replace(year=today.year - 1) fails for leap years
-        played_days = (
-            player.scores.values("submission_day")
-            .filter(submission_day__gte=a_year_ago)
-            .annotate(plays=Count("submission_day"))
-            .all()
-        )
-        set_calendar(context, a_year_ago, today, played_days)
+        context["calendar"] = render_calendar(player.id, a_year_ago, today)
 
         if hasattr(self.request.user, "player"):
             context["is_rival"] = self.request.user.player.rivals.filter(id=player_id).exists()
@@ -348,52 +499,37 @@ class PlayerView(RequireAuthForPaginationMixin, LeaderboardSourceMixin, generic.
     def get_queryset(self):
         player_id = self.kwargs["player_id"]
 
-        return Score.objects.filter(player__id=player_id).order_by("-id").prefetch_related("song")
+        return ScoreHistory.of(player_id=player_id).order_by("-id").prefetch_related("song")
+
 
+class PlayerHighscoresView(DiffNumberFilterMixin, PlayerView):
+    diff_number_lookup = "song__metadata__diff_number"
 
-class PlayerHighscoresView(PlayerView):
     def get_queryset(self):
         player_id = self.kwargs["player_id"]
         player = Player.get_or_404(id=player_id)
 
         return (
-            player.scores.filter(**{f"is_{self.lb_source}_top": True})
-            .order_by(f"-{self.lb_attribute}")
+            self.filter_diff_number(Score.objects.filter(**{f"{self.lb_source}_top_summary__player": player}))
+            .annotate(best_score=F(f"{self.lb_source}_top_summary__best_{self.lb_attribute}"))
+            .order_by("-best_score", "id")
+            .select_related("judgment_counts")
             .prefetch_related("song")
         )
 
 
 class PlayerMostPlayedView(PlayerView):
     def get_queryset(self):
-        return None
-
-    def get_context_data(self, **kwargs):
-        self.paginate_by = None  # automatic pagination fails, we do it manually in this case because of aggregation
-        context = super().get_context_data(**kwargs)
-
-        player = context["player"]
-        songs_by_plays = player.scores.values("song").annotate(num_scores=Count("song")).order_by("-num_scores")
-        paginator, page, songs_by_plays_page, is_paginated = self.paginate_queryset(songs_by_plays, ENTRIES_PER_PAGE)
-
-        songs = [song["song"] for song in songs_by_plays_page]
-        songs_plays = {song["song"]: song["num_scores"] for song in songs_by_plays_page}
-        scores = player.scores.filter(**{f"is_{self.lb_source}_top": True, "song__hash__in": songs}).prefetch_related(
-            "song"
-        )
-
-        scores = sorted(scores, key=lambda x: songs.index(x.song.hash))
-        for score in scores:
-            setattr(score, "num_scores", songs_plays[score.song.hash])
+        player_id = self.kwargs["player_id"]
+        top_summary = f"{self.lb_source}_top_summary"
 
-        context.update(
-            {
-                "paginator": paginator,
-                "page_obj": page,
-                "is_paginated": is_paginated,
-                "scores": scores,
-            }
+        return (
+            Score.objects.filter(**{f"{top_summary}__player_id": player_id})
+            .annotate(num_scores=F(f"{top_summary}__num_plays"))
+            .order_by("-num_scores", "song_id")
+            .select_related("judgment_counts")
+            .prefetch_related("song")
         )
-        return context
 
 
 class PlayerGSFailedView(PlayerView):
@@ -401,7 +537,12 @@ class PlayerGSFailedView(PlayerView):
         player_id = self.kwargs["player_id"]
         player = Player.get_or_404(id=player_id)
 
-        return player.scores.filter(gs_status=GSStatus.ERROR).order_by("-id").prefetch_related("song")
+        return (
+            player.scores.filter(gs_status=GSStatus.ERROR)
+            .order_by("-id")
+            .select_related("judgment_counts")
+            .prefetch_related("song")
+        )
 
 
 class PlayerGSSkippedView(PlayerView):
@@ -409,7 +550,12 @@ class PlayerGSSkippedView(PlayerView):
         player_id = self.kwargs["player_id"]
         player = Player.get_or_404(id=player_id)
 
-        return player.scores.filter(gs_status=GSStatus.SKIPPED).order_by("-id").prefetch_related("song")
+        return (
+            player.scores.filter(gs_status=GSStatus.SKIPPED)
+            .order_by("-id")
+            .select_related("judgment_counts")
+            .prefetch_related("song")
+        )
 
 
 class PlayerStatsView(generic.base.TemplateView):
@@ -429,76 +575,143 @@ class PlayerStatsView(generic.base.TemplateView):
 class VersusView(LoginRequiredMixin, LeaderboardSourceMixin, generic.ListView):
     login_url = "/login/"
     template_name = "boogie_ui/versus.html"
+    context_object_name = "scores"
+    paginate_by = ENTRIES_PER_PAGE
 
-    def sort_key(self, x):
-        return getattr(x[0], self.lb_attribute)
+    def order_by_expression(self):
+        return F(self.lb_attribute)
 
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        p1, p2 = self.get_players()
-        p1_scores_qs = (
-            p1.scores.filter(**{f"is_{self.lb_source}_top": True}).order_by("-itg_score").all().select_related("song")
-        )
-        p2_scores_qs = p2.scores.filter(
-            **{f"is_{self.lb_source}_top": True}, song__hash__in=[score.song_id for score in p1_scores_qs]
-        )
-        p2_scores_dict = {score.song_id: score for score in p2_scores_qs}
-        scores = sorted(
-            [
-                (p1_score, p2_scores_dict[p1_score.song_id])
-                for p1_score in p1_scores_qs
-                if p1_score.song_id in p2_scores_dict
-            ],
-            key=self.sort_key,
-            reverse=True,
+        p1, p2 = self.players
+        self.totals = self.get_common_scores().aggregate(
+            common_charts=Count("id"),
+            p1_wins=Count("id", filter=Q(**{f"{self.lb_attribute}__gt": F("p2_value")})),
+            p2_wins=Count("id", filter=Q(**{f"{self.lb_attribute}__lt": F("p2_value")})),
         )
-        paginator, page, score_page, is_paginated = self.paginate_queryset(scores, ENTRIES_PER_PAGE)
+        context = super().get_context_data(**kwargs)
 
-        context["p1_wins"] = sum(
-            (1 for x in scores if getattr(x[0], self.lb_attribute) > getattr(x[1], self.lb_attribute))
-        )
-        set_stars_from_player(context, p1, prefix="p1_")
+        p1_scores = context["scores"]
+        p2_scores = Score.objects.in_bulk([score.p2_score_id for score in p1_scores])
+        context["scores"] = [(score, p2_scores[score.p2_score_id]) for score in p1_scores]
+        Song.prefetch_chart_infos(score.song for score in p1_scores)
 
-        context["p2_wins"] = sum(
-            (1 for x in scores if getattr(x[0], self.lb_attribute) < getattr(x[1], self.lb_attribute))
-        )
+        context.update(self.totals)
+        context["ties"] = self.totals["common_charts"] - self.totals["p1_wins"] - self.totals["p2_wins"]
+        set_stars_from_player(context, p1, prefix="p1_")
         set_stars_from_player(context, p2, prefix="p2_")
-
-        context["ties"] = len(scores) - context["p1_wins"] - context["p2_wins"]
-        context["common_charts"] = len(scores)
-
-        context.update(
-            {
-                "paginator": paginator,
-                "page_obj": page,
-                "is_paginated": is_paginated,
-                "scores": score_page,
-                "p1": p1,
-                "p2": p2,
-            }
-        )
+        context["p1"] = p1
+        context["p2"] = p2
 
         return context
 
-    def get_players(self):
+    @cached_property
+    def players(self):
         p1 = Player.get_or_404(id=self.kwargs["p1"])
         p2 = Player.get_or_404(id=self.kwargs["p2"])
         return p1, p2
 
+    def get_common_scores(self):
+        """Top scores of p1 on charts that p2 has played too, with the matching top scores of p2 joined in SQL."""
+        p1, p2 = self.players
+        top_summary = f"{self.lb_source}_top_summary"
+        p2_summaries = f"{top_summary}__song__player_summaries"
+        return Score.objects.filter(
+            **{
+                f"{top_summary}__player": p1,
+                f"{p2_summaries}__player": p2,
+                f"{p2_summaries}__{self.lb_source}_top_score__isnull": False,
+            }
+        ).annotate(
+            p2_score_id=F(f"{p2_summaries}__{self.lb_source}_top_score"),
+            p2_value=F(f"{p2_summaries}__best_{self.lb_attribute}"),
+        )
+
     def get_queryset(self):
-        return None
+        return (
+            self.get_common_scores()
+            .order_by(self.order_by_expression().desc(), "-itg_score", "id")
+            .select_related("song")
+        )
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        paginator = super().get_paginator(queryset, per_page, **kwargs)
+        paginator.count = self.totals["common_charts"]  # it's been counted with the totals already
+        return paginator
 
 
 class VersusByDifferenceView(VersusView):
-    def sort_key(self, x):
-        return getattr(x[0], self.lb_attribute) - getattr(x[1], self.lb_attribute)
+    def order_by_expression(self):
+        return F(self.lb_attribute) - F("p2_value")
+
+
+class PlayerRivalsView(LeaderboardSourceMixin, generic.ListView):
+    template_name = "boogie_ui/player_rivals.html"
+    context_object_name = "charts"
+    paginate_by = ENTRIES_PER_PAGE
+
+    @cached_property
+    def participants(self):
+        player = Player.get_or_404(id=self.kwargs["player_id"])
+        return [player, *player.rivals.order_by("id")[: settings.BS_RIVALS_COMPARISON_MAX_RIVALS]]
+
+    @cached_property
+    def comparison(self):
+        player, *rivals = self.participants
+        return compare_with_rivals(player, rivals, self.lb_source)
+
+    def get_queryset(self):
+        return self.comparison.charts
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["player"] = self.participants[0]
+        context["participants"] = self.participants
+        context["matrix"] = [
+            (participant, [None if i == j else head_to_head for j, head_to_head in enumerate(row)])
+            for i, (participant, row) in enumerate(zip(self.participants, self.comparison.matrix))
+        ]
 
+        songs = Song.objects.in_bulk([chart.song_id for chart in context["charts"]])
+        Song.prefetch_chart_infos(songs.values())
+        context["charts"] = [
+            (
+                songs[chart.song_id],
+                chart.delta,
+                [score and (*score, i == chart.best) for i, score in enumerate(chart.scores)],
+            )
+            for chart in context["charts"]
+        ]
 
-class SongView(RequireAuthForPaginationMixin, LeaderboardSourceMixin, generic.ListView):
+        return context
+
+
+class SongView(
+    PrefetchChartInfoMixin,
+    RequireAuthForPaginationMixin,
+    PageCacheMixin,
+    ConditionalPageMixin,
+    LeaderboardSourceMixin,
+    generic.ListView,
+):
     template_name = "boogie_ui/song.html"
     context_object_name = "scores"
     paginate_by = ENTRIES_PER_PAGE
 
+    def get_page_tags(self):
+        return [song_tag(self.kwargs["song_hash"])]
+
+    def get_page_version(self):
+        song = (
+            Song.objects.filter(hash=self.kwargs["song_hash"])
+            .values_list("number_of_scores", "number_of_players", "gs_ranked", "metadata__fingerprint")
+            .first()
+        )
+        rivals = None
+        if hasattr(self.request.user, "player"):
+            rivals = sorted(self.request.user.player.rivals.values_list("id", flat=True))
+
+        return song, rivals
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
@@ -507,7 +720,7 @@ class SongView(RequireAuthForPaginationMixin, LeaderboardSourceMixin, generic.Li
         context["song"] = song
         if hasattr(self.request.user, "player"):
             player = self.request.user.player
-            context["my_scores"] = Score.objects.filter(song__hash=song_hash, player=player).count()
+            context["my_scores"] = ScoreHistory.of(song__hash=song_hash, player=player).count()
             context["rival_scores"] = Score.objects.filter(
                 Q(player__in=player.rivals.all()) | Q(player=player),
                 song__hash=song_hash,
@@ -519,7 +732,7 @@ class SongView(RequireAuthForPaginationMixin, LeaderboardSourceMixin, generic.Li
 
         if chart_info := song.chart_info:
             diffs_hashes = chart_info["diffs"]
-            diffs = [get_chart_info(x) for x in diffs_hashes]
+            diffs = [diff for diff in get_chart_infos(diffs_hashes).values() if diff is not None]
             context["packs"] = sorted(chart_info["packs"])
             diffs = sorted(
                 diffs,
@@ -538,7 +751,7 @@ class SongView(RequireAuthForPaginationMixin, LeaderboardSourceMixin, generic.Li
     def get_queryset(self):
         song_hash = self.kwargs["song_hash"]
         return (
-            Score.objects.filter(song__hash=song_hash)
+            ScoreHistory.of(song__hash=song_hash)
             .order_by(f"-{self.lb_attribute}", "submission_date")
             .select_related("song", "player")
         )
@@ -548,15 +761,34 @@ class SongByDateView(SongView):
     def get_queryset(self):
         song_hash = self.kwargs["song_hash"]
         return (
-            Score.objects.filter(song__hash=song_hash)
+            ScoreHistory.of(song__hash=song_hash)
             .order_by("-submission_date", f"-{self.lb_attribute}")
             .select_related("song", "player")
         )
 
 
-class ScoreView(LeaderboardSourceMixin, generic.DetailView):
+class ScoreView(PageCacheMixin, ConditionalPageMixin, LeaderboardSourceMixin, generic.DetailView):
     template_name = "boogie_ui/score.html"
-    model = Score
+    context_object_name = "score"
+    queryset = Score.objects.select_related("song", "player", "judgment_counts")
+
+    def get_page_tags(self):
+        return [score_tag(self.kwargs["pk"])]
+
+    def get_page_version(self):
+        fields = ("gs_status", "ex_score", "player__name", "player__machine_tag", "song__metadata__fingerprint")
+        pk = self.kwargs["pk"]
+
+        return (
+            Score.objects.filter(pk=pk).values_list(*fields).first()
+            or ArchivedScore.objects.filter(pk=pk).values_list(*fields).first(),
+        )
+
+    def get_object(self, queryset=None):
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            return get_object_or_404(ArchivedScore.objects.select_related("song", "player"), pk=self.kwargs["pk"])
 
 
 class SongHighscoresView(SongView):
@@ -565,8 +797,8 @@ class SongHighscoresView(SongView):
         return (
             Score.objects.filter(song__hash=song_hash)
             .filter(**{f"is_{self.lb_source}_top": True})
-            .order_by(f"-{self.lb_attribute}", "submission_date")
-            .select_related("song", "player")
+            .order_by(f"-{self.lb_attribute}", "submission_date", "id")
+            .select_related("song", "player", "judgment_counts")
         )
 
 
@@ -574,7 +806,7 @@ class SongByPlayerView(SongView):
     def get_queryset(self):
         song_hash = self.kwargs["song_hash"]
         return (
-            Score.objects.filter(song__hash=song_hash, player_id=self.kwargs["player_id"])
+            ScoreHistory.of(song__hash=song_hash, player_id=self.kwargs["player_id"])
             .order_by(f"-{self.lb_attribute}", "submission_date")
             .select_related("song", "player")
         )
@@ -589,26 +821,45 @@ class SongByRivalsView(SongView):
             .filter(Q(player__in=player.rivals.all()) | Q(player=player), **{f"is_{self.lb_source}_top": True})
             .order_by(f"-{self.lb_source}_score", "submission_date", "id")
             .all()
-            .select_related("song", "player")
+            .select_related("song", "player", "judgment_counts")
         )
 
 
-class SongsListView(RequireAuthForPaginationMixin, LeaderboardSourceMixin, generic.ListView):
+class SongsListView(
+    DiffNumberFilterMixin,
+    PrefetchChartInfoMixin,
+    RequireAuthForPaginationMixin,
+    PageCacheMixin,
+    LeaderboardSourceMixin,
+    generic.ListView,
+):
     template_name = "boogie_ui/songs.html"
     context_object_name = "songs"
     paginate_by = ENTRIES_PER_PAGE
 
+    def get_page_tags(self):
+        return [FEED_TAG]
+
+    def get_page_songs(self, context):
+        return context["songs"]
+
     def get_queryset(self):
-        return Song.objects.order_by("-number_of_scores").prefetch_related(
-            f"{self.lb_source}_highscore",
-            f"{self.lb_source}_highscore__player",
+        return (
+            self.filter_diff_number(Song.objects.all())
+            .order_by("-number_of_scores", "hash")
+            .prefetch_related(
+                f"{self.lb_source}_highscore",
+                f"{self.lb_source}_highscore__player",
+            )
         )
 
 
 class SongsByPlayersListView(SongsListView):
     def get_queryset(self):
-        return Song.objects.order_by("-number_of_players").prefetch_related(
-            f"{self.lb_source}_highscore", f"{self.lb_source}_highscore__player"
+        return (
+            self.filter_diff_number(Song.objects.all())
+            .order_by("-number_of_players", "hash")
+            .prefetch_related(f"{self.lb_source}_highscore", f"{self.lb_source}_highscore__player")
         )
 
 
@@ -795,50 +1046,25 @@ class SearchView(LeaderboardSourceMixin, generic.ListView):
         context = super().get_context_data(**kwargs)
         set_sentry_user(self.request)
 
-        r = get_redis()
-        if not r:
+        backend = get_search_backend()
+        if backend is None:
             return context
 
-        index = r.ft("idx:song")
         user_query = self.request.GET.get("q", "")
         processed_query = self._process_query(user_query)
+        offset = (int(self.request.GET.get("page", 1)) - 1) * ENTRIES_PER_PAGE
+
+        sort = self.request.GET.get("sort")
+        if sort not in SORT_OPTIONS:
+            sort = DEFAULT_SORT
 
-        q = (
-            Query(processed_query)
-            .paging((int(self.request.GET.get("page", 1)) - 1) * ENTRIES_PER_PAGE, ENTRIES_PER_PAGE)
-            .sort_by("num_plays", asc=False)
-        )
         n_results = 0
-        results = []
+        songs = []
         try:
-            redis_search_results = index.search(q)
-            n_results = redis_search_results.total
-            results = redis_search_results.docs
-        except ResponseError as e:
+            n_results, songs = backend.search(processed_query, offset, ENTRIES_PER_PAGE, sort)
+        except SearchError as e:
             sentry_sdk.capture_exception(e)
-            if "no such index" in str(e):
-                message = "BoogieStats instance seems to be misconfigured. Consider letting your admin know about this."
-            else:
-                message = "Query syntax error. Consider removing/escaping special characters."
-            messages.error(
-                self.request,
-                message,
-                extra_tags="alert-danger",
-            )
-
-        hashes = []
-        for result in results:
-            song_hash = result.id.removeprefix("song:")
-            hashes.append(song_hash)
-
-        songs = (
-            Song.objects.filter(hash__in=hashes)
-            .prefetch_related(
-                f"{self.lb_source}_highscore",
-                f"{self.lb_source}_highscore__player",
-            )
-            .order_by("-number_of_scores", f"-{self.lb_source}_highscore__{self.lb_source}_score")
-        )
+            messages.error(self.request, str(e), extra_tags="alert-danger")
 
         paginator, page, _, is_paginated = self.paginate_queryset(range(n_results), ENTRIES_PER_PAGE)
 
@@ -849,6 +1075,8 @@ class SearchView(LeaderboardSourceMixin, generic.ListView):
                 "is_paginated": is_paginated,
                 "songs": songs,
                 "user_query": user_query,
+                "sort": sort,
+                "sort_options": SORT_OPTIONS,
             }
         )
 
@@ -869,85 +1097,33 @@ class PlayerWrappedView(generic.base.TemplateView):
         player = Player.get_or_404(id=player_id)
         context["player"] = player
         context["year"] = year
-        scores = player.scores.filter(submission_date__year=year)
-        context["num_scores"] = scores.count()
-        context["num_charts_played"] = scores.values("song").distinct().count()
-        set_stars_from_all_scores(context, scores)
+        context["wrapped_years"] = range(player.join_date.year, datetime.date.today().year + 1)
 
         end_of_year = datetime.date(year=year, month=12, day=31)
         start_of_year = datetime.date(year=year, month=1, day=1)
+        context["calendar"] = render_calendar(player.id, start_of_year, end_of_year)
 
-        played_days = (
-            player.scores.values("submission_day")
-            .filter(submission_day__year=year)
-            .annotate(plays=Count("submission_day"))
-            .all()
-        )
-        set_calendar(context, start_of_year, end_of_year, played_days)
-        context.update(
-            fantastics_plus=0,
-            fantastics=0,
-            excellents=0,
-            greats=0,
-            decents=0,
-            way_offs=0,
-            misses=0,
-            steps_hit=0,
-            total_steps=0,
-        )
-        context["wrapped_years"] = range(player.join_date.year, datetime.date.today().year + 1)
-
-        if not context["num_scores"]:
+        wrapped = get_wrapped(player.id, year)
+        context.update(wrapped)
+        if not wrapped["num_scores"]:
             return context
-        most_played_song_data = scores.values("song_id").annotate(plays=Count("song_id")).order_by("-plays").first()
-        most_played_song = Song.objects.get(hash=most_played_song_data["song_id"])
-        most_played_song_plays = most_played_song_data["plays"]
-
-        previous_day = (played_days[0]["submission_day"] - start_of_year).days
-        streak = 1
-        longest_streak = 1
-        first_day = first_day_candidate = played_days[0]
-        for day in played_days:
-            day_index = (day["submission_day"] - start_of_year).days
-
-            if previous_day == day_index - 1:
-                previous_day = day_index
-                streak += 1
-                if streak > longest_streak:
-                    longest_streak = streak
-                    first_day = first_day_candidate
-            else:
-                previous_day = day_index
-                first_day_candidate = day
-                streak = 1
-
-        context["played_days"] = len(played_days)
-        context["most_plays"] = max(played_days, key=lambda x: x["plays"], default={"plays": 0, "submission_day": "-"})
-        context["longest_streak"] = longest_streak
-        if first_day is not None:
-            context["longest_streak_start"] = first_day["submission_day"]
-        context["most_played_song"] = most_played_song
-        context["most_played_song_plays"] = most_played_song_plays
-        context["highest_itg_score"] = scores.order_by("-itg_score", "submission_date").first()
-        context["highest_ex_score"] = scores.order_by("-ex_score", "submission_date").first()
-
-        sums = scores.aggregate(
-            fantastics_plus=Sum("fantastics_plus"),
-            fantastics=Sum("fantastics"),
-            excellents=Sum("excellents"),
-            greats=Sum("greats"),
-            decents=Sum("decents"),
-            way_offs=Sum("way_offs"),
-            misses=Sum("misses"),
-        )
-        context["total_steps"] = sum(sums.values())
-        context["steps_hit"] = context["total_steps"] - sums["misses"]
 
-        context.update(sums)
+        context["most_plays"] = {
+            "plays": wrapped["most_plays"]["plays"],
+            "submission_day": _parse_day(wrapped["most_plays"]["submission_day"]) or "-",
+        }
+        context["longest_streak_start"] = _parse_day(wrapped["longest_streak_start"])
+        context["most_played_song"] = Song.objects.filter(hash=wrapped["most_played_song"]).first()
+        context["highest_itg_score"] = ScoreHistory.of(id=wrapped["highest_itg_score"]).first()
+        context["highest_ex_score"] = ScoreHistory.of(id=wrapped["highest_ex_score"]).first()
 
         return context
 
 
+def _parse_day(day):
+    return datetime.date.fromisoformat(day) if day else None
+
+
 @require_POST
 @login_required(login_url="/login/")
 def mark_score_as_gs_submitted(request, pk):
@@ -976,69 +1152,19 @@ class PackView(LeaderboardSourceMixin, generic.TemplateView):
         context = super().get_context_data(**kwargs)
 
         pack_name = self.kwargs["pack_name"]
-        pack_charts = get_pack_info(pack_name)
+        summary = PackSummary.objects.filter(name=pack_name).first()
 
-        if not pack_charts:
+        if summary is None:
             raise Managed404Error("Requested pack does not exist.")
 
-        max_num_charts = 1_000
-        if len(pack_charts) > max_num_charts:
-            context["missing_data"] = len(pack_charts) - max_num_charts
-
-        pack_info = {hash: get_chart_info(hash) for hash in pack_charts[:max_num_charts]}
-        songs, used_hashes = self.get_songs_and_hashes(pack_info)
-
-        playcounts = {song.hash: song.number_of_scores for song in Song.objects.filter(hash__in=used_hashes)}
-
-        songs.sort(
-            key=lambda diffs: (
-                diffs[0]["titletranslit"].lower() or diffs[0]["title"].lower(),
-                diffs[0]["artisttranslit"].lower() or diffs[0]["artist"].lower(),
-            )
+        charts = [chart for song in summary.songs for diffs in song["diffs_split"].values() for chart in diffs]
+        playcounts = dict(
+            Song.objects.filter(hash__in=[chart["hash"] for chart in charts]).values_list("hash", "number_of_scores")
         )
-
-        songs_diffs_split = []
-        for diffs in songs:
-            diffs_split = defaultdict(list)
-            for diff in diffs:
-                steps_type_name = STEPS_TYPE_MAPPING.get(diff["steps_type"], diff["steps_type"])
-                diff["number_of_scores"] = playcounts.get(diff["hash"], 0)
-                diffs_split[steps_type_name].append(diff)
-            songs_diffs_split.append(dict(diffs_split))
-
-        display_names = [
-            (
-                diffs[0]["titletranslit"] or diffs[0]["title"],
-                diffs[0]["artisttranslit"] or diffs[0]["artist"],
-            )
-            for diffs in songs
-        ]
+        for chart in charts:
+            chart["number_of_scores"] = playcounts.get(chart["hash"], 0)
 
         context["pack_name"] = pack_name
-        context["songs_diffs_split"] = zip(display_names, songs_diffs_split)
+        context["songs"] = summary.songs
 
         return context
-
-    def get_songs_and_hashes(self, pack_info):
-        used_hashes = set()
-        songs = []
-        for chart_info in pack_info.values():
-            if chart_info["hash"] in used_hashes:
-                continue
-
-            used_hashes.add(chart_info["hash"])
-            diffs = []
-            diffs.append(chart_info)
-            for other_diff_hash in chart_info["diffs"]:
-                if other_diff_hash in used_hashes:
-                    continue
-                try:
-                    diffs.append(pack_info[other_diff_hash])
-                    used_hashes.add(other_diff_hash)
-                except KeyError:
-                    pass  # the other diff can exist in other pack
-
-            diffs.sort(key=diff_sort_key)
-            songs.append(diffs)
-
-        return songs, used_hashes
@@ -162,6 +162,40 @@ BS_ICONS_CUSTOM_PATH = "custom-icons"
 # When provided, UI will try to utilize it to display information about charts.
 # When it's set to None, the charts will only be identified by their hashes.
 BS_CHART_DB_PATH: Optional[os.PathLike] = None
+# Optional path to the chart database compiled with `django-admin compile_chart_db`. When it's set, chart info is read
+# from this single file instead of BS_CHART_DB_PATH.
+BS_CHART_DB_INDEX_PATH: Optional[os.PathLike] = None
+# Parsed chart database entries are cached in each process. Cached entries are checked for changes on disk
+# at most every BS_CHART_DB_CACHE_REVALIDATE_SECONDS.
+BS_CHART_DB_CACHE_SIZE: int = 50_000
+BS_CHART_DB_CACHE_REVALIDATE_SECONDS: float = 60.0
+# `django-admin watch_chart_db` checks the chart database for changes every BS_CHART_DB_WATCH_INTERVAL_SECONDS.
+BS_CHART_DB_WATCH_INTERVAL_SECONDS: float = 60.0
+
+# Autocomplete API serves up to BS_AUTOCOMPLETE_MAX_RESULTS songs and players from in-memory indexes, which are rebuilt
+# every BS_AUTOCOMPLETE_INDEX_TTL_SECONDS. Responses are cached per prefix for BS_AUTOCOMPLETE_CACHE_SECONDS.
+BS_AUTOCOMPLETE_MAX_RESULTS: int = 10
+BS_AUTOCOMPLETE_MAX_PREFIX_LENGTH: int = 64
+BS_AUTOCOMPLETE_INDEX_TTL_SECONDS: float = 300.0
+BS_AUTOCOMPLETE_CACHE_SECONDS: float = 60.0
+
+# Wrapped pages of closed years are stored once they've been computed, see `django-admin generate_wrapped`.
+# Wrapped pages of the current year are cached for BS_WRAPPED_CACHE_SECONDS.
+BS_WRAPPED_CACHE_SECONDS: float = 300.0
+
+# Players are compared with up to BS_RIVALS_COMPARISON_MAX_RIVALS of their rivals at once. Comparisons are cached
+# for BS_RIVALS_COMPARISON_CACHE_SECONDS or until any of the participants submits a new score.
+BS_RIVALS_COMPARISON_MAX_RIVALS: int = 20
+BS_RIVALS_COMPARISON_CACHE_SECONDS: float = 3600.0
+
+# Pages are cached for anonymous visitors for up to BS_PAGE_CACHE_SECONDS (0 disables it) or until the players, songs
+# or scores that they show change. Changes invalidate cached pages of other processes only when `CACHES` are shared
+# between them, e.g. with `django.core.cache.backends.redis.RedisCache`.
+BS_PAGE_CACHE_SECONDS: float = 60.0
+
+# Paginators of huge tables, e.g. scores in the admin, count rows exactly only up to BS_ESTIMATED_COUNT_THRESHOLD.
+# Bigger tables are counted from statistics of the database, see `django-admin analyze_db`.
+BS_ESTIMATED_COUNT_THRESHOLD: int = 10_000
 
 BS_LOGO_PATH: Optional[os.PathLike] = None  # static path to a logo
 BS_LOGO_CREDITS: Optional[str] = None  # credits for a logo, will be shown in the footer
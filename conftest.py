@@ -1,6 +1,10 @@
+import json
+
 import pytest
+from django.core.cache import cache
 from django.core.management import call_command
 
+from boogiestats.boogie_api.chart_db import invalidate_chart_db_cache
 from boogiestats.boogie_api.models import Player, Song
 
 
@@ -9,6 +13,11 @@ def enable_db_access_for_all_tests(transactional_db):
     pass
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()  # e.g. cached pages, which would outlive the database of a test
+
+
 @pytest.fixture(scope="session", autouse=True)
 def collect_static_files():
     call_command("collectstatic", "--noinput")
@@ -97,3 +106,96 @@ def rival1(player, song):
     player.rivals.add(rival)
     player.save()
     return rival
+
+
+class ChartDB:
+    """Minimal chart database in the format of https://github.com/florczakraf/stepmania-chart-db"""
+
+    def __init__(self, path):
+        self.path = path
+        (path / "charts").mkdir()
+        (path / "packs").mkdir()
+
+    def add_chart(self, chart_hash, **fields):
+        chart_info = {
+            "hash": chart_hash,
+            "title": chart_hash,
+            "titletranslit": "",
+            "subtitle": "",
+            "subtitletranslit": "",
+            "artist": "Artist",
+            "artisttranslit": "",
+            "pack_name": "Pack",
+            "packs": ["Pack"],
+            "steps_type": "dance-single",
+            "diff": "Challenge",
+            "diff_number": 10,
+            "diffs": [chart_hash],
+            **fields,
+        }
+        path = self.path / "charts" / chart_hash[:2] / f"{chart_hash[2:]}.json"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(json.dumps(chart_info))
+
+        return chart_info
+
+    def remove_chart(self, chart_hash):
+        (self.path / "charts" / chart_hash[:2] / f"{chart_hash[2:]}.json").unlink()
+
+    def add_pack(self, pack_name, chart_hashes):
+        (self.path / "packs" / f"{pack_name}.json").write_text(json.dumps(chart_hashes))
+
+
+@pytest.fixture
+def chart_db(tmp_path, settings):
+    settings.BS_CHART_DB_PATH = tmp_path / "chart-db"
+    settings.BS_CHART_DB_PATH.mkdir()
+    invalidate_chart_db_cache()
+    yield ChartDB(settings.BS_CHART_DB_PATH)
+    invalidate_chart_db_cache()
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis used by the search cache"""
+
+    def __init__(self):
+        self.data = {}
+        self.executed_pipelines = 0
+
+    def get(self, name):
+        return self.data.get(name)
+
+    def set(self, name, value):
+        self.data[name] = str(value).encode()
+
+    def hget(self, name, key):
+        value = self.data.get(name, {}).get(key)
+        return None if value is None else str(value).encode()
+
+    def hset(self, name, mapping):
+        self.data.setdefault(name, {}).update(mapping)
+
+    def delete(self, *names):
+        for name in names:
+            self.data.pop(name, None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        self.redis.executed_pipelines += 1
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
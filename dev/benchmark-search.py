@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# flake8: noqa
+
+import django
+
+django.setup()
+
+import argparse
+import statistics
+import time
+
+from boogiestats.boogie_api.search import RedisSearchBackend, SQLiteSearchBackend
+from boogiestats.boogie_api.utils import get_redis
+from boogiestats.boogie_ui.views import ENTRIES_PER_PAGE, SearchView
+
+QUERIES = (
+    "girl",
+    "barbie gurl",
+    "basshunter -dota",
+    "'jump'",
+    "'warning*",
+    "@pack_name:itl",
+    r"@steps_type:{dance\-double}",
+    "anubis @diff_number:[7,7]",
+)
+
+parser = argparse.ArgumentParser(description="Compares latencies of song search backends on the current database")
+parser.add_argument("--repeat", type=int, default=20)
+args = parser.parse_args()
+
+backends = {"sqlite": SQLiteSearchBackend()}
+if r := get_redis():
+    backends["redis"] = RedisSearchBackend(r)
+else:
+    print("Redis is not configured, only the SQLite backend will be measured.")
+
+for query in QUERIES:
+    processed_query = SearchView()._process_query(query)
+    for name, backend in backends.items():
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            total, _ = backend.search(processed_query, 0, ENTRIES_PER_PAGE)
+            timings.append(time.perf_counter() - start)
+
+        print(
+            f"{name:>6} {query!r:<32} {total:>6} results"
+            f"  median {statistics.median(timings) * 1000:7.2f}ms  max {max(timings) * 1000:7.2f}ms"
+        )
@@ -13,9 +13,15 @@ from uuid import uuid4
 
 from django.conf import settings
 
-from boogiestats.boogie_api.models import Player, Score, Song
+from boogiestats.boogie_api.chart_db import iter_chart_hashes
+from boogiestats.boogie_api.models import Player, Score, ScoreJudgments, Song
 
-if settings.BS_CHART_DB_PATH:
+if settings.BS_CHART_DB_INDEX_PATH:
+
+    def hash_generator():
+        yield from iter_chart_hashes()
+
+elif settings.BS_CHART_DB_PATH:
 
     def hash_generator():
         jsons = (Path(settings.BS_CHART_DB_PATH) / "charts").rglob("*.json")
@@ -54,7 +60,7 @@ print("Creating scores...")
 for i, song in enumerate(Song.objects.all()):
     players = Player.objects.all().order_by("?")[: randint(PLAYERS_PER_SONG, PLAYERS_PER_SONG + 2)]
     for player in players:
-        song.scores.bulk_create(
+        scores = song.scores.bulk_create(
             [
                 Score(
                     song=song,
@@ -64,13 +70,13 @@ for i, song in enumerate(Song.objects.all()):
                     comment="foo",
                     used_cmod=False,
                     has_judgments=True,
-                    fantastics=123,
-                    greats=77,
-                    total_steps=200,
                 )
                 for _ in range(randint(SCORES_PER_SONG_PER_PLAYER, SCORES_PER_SONG_PER_PLAYER + 2))
             ]
         )
+        ScoreJudgments.objects.bulk_create(
+            [ScoreJudgments(score=score, fantastics=123, greats=77, total_steps=200) for score in scores]
+        )
         itg_score = song.scores.filter(player=player).order_by("-itg_score").first()
         itg_score.is_itg_top = True
         itg_score.save()
@@ -6,10 +6,12 @@ export PYTHONPATH="/data"
 
 django-admin collectstatic --no-input
 django-admin migrate
+django-admin backfill_daily_activity --only-missing
+django-admin backfill_song_summaries --only-missing
 
-# populate redis search cache; delay it in order to lower perceived app startup time
-# if redis uses persistent cache, this won't make any difference
-/bin/bash -c 'sleep 30; /app/docker/populate-redis.py'&
+# ingest chart metadata and populate redis search cache in the background, only changes are written after the first run
+# afterwards, keep watching the chart database for changes and apply only them
+/bin/bash -c 'django-admin ingest_chart_db; /app/docker/populate-redis.py --only-changed; exec django-admin watch_chart_db'&
 
 exec gunicorn \
   --bind 0.0.0.0:55523 \
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+import argparse
+
 import django
 from redis import ResponseError
 from redis.commands.search.field import NumericField, TagField, TextField
@@ -27,21 +29,28 @@ def setup_index(r):
             raise
 
 
-def populate_cache(r):
-    from boogiestats.boogie_api.models import Song
-
-    songs = Song.objects.all()
+def populate_cache(r, args):
+    from boogiestats.boogie_api.search_cache import populate_search_cache
 
-    n = 0
-    for song in songs:
-        cache_updated = song.update_search_cache(redis_connection=r)
-        if cache_updated:
-            n += 1
+    result = populate_search_cache(
+        r, batch_size=args.batch_size, only_changed=args.only_changed, resume=not args.from_scratch
+    )
 
-    print(f"Added {n} out of {songs.count()} songs to the redis index")
+    print(
+        f"Added {result.written} out of {result.songs} songs to the redis index ({result.unchanged} unchanged)"
+        f" in {result.seconds:.2f}s, {result.songs_per_second:.0f} songs/s"
+    )
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Populates redis search index with all songs")
+    parser.add_argument("--batch-size", type=int, default=1000, help="songs written in a single pipeline")
+    parser.add_argument(
+        "--only-changed", action="store_true", help="skip songs whose cached chart info and plays haven't changed"
+    )
+    parser.add_argument("--from-scratch", action="store_true", help="ignore the checkpoint of an interrupted run")
+    args = parser.parse_args()
+
     django.setup()
 
     from boogiestats.boogie_api.utils import get_redis
@@ -52,7 +61,7 @@ def main():
         return
 
     setup_index(r)
-    populate_cache(r)
+    populate_cache(r, args)
 
 
 if __name__ == "__main__":